@@ -0,0 +1,17 @@
+# moteur de breakthrough sans dépendance à pygame : règles, états, recherche
+from .rules import (
+    BOARD_SIZE, MAX_BOARD_SIZE, MIN_BOARD_SIZE, BoardTables, board_from_string, board_to_string, board_tables,
+    check_win, get_valid_moves, has_moves, init_board,
+)
+from .zobrist import ZOBRIST_BLACK_TO_MOVE, ZOBRIST_KEYS, zobrist_hash, zobrist_keys
+from .state import BreakthroughAction, BreakthroughState
+from .bitboard import BitboardBreakthroughState
+from .search import (
+    DIFFICULTY_BUDGETS, MAX_SEARCH_DEPTH, SEARCH_MODES, BreakthroughMinMaxSearcher, SearchTimeout,
+    TranspositionTable, action_key, measure_parallel_speedup,
+)
+from .mcts import BreakthroughMCTSSearcher
+from .background import BackgroundSearcher
+from .instrumentation import SearchInstrumentation
+from .positions import PositionReader, PositionWriter, record_state
+from .weights import DEFAULT_WEIGHTS, WEIGHT_NAMES, current_weights, load_weights, save_weights, set_weights
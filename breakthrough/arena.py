@@ -0,0 +1,288 @@
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from itertools import combinations
+from typing import Optional
+
+from .bitboard import BitboardBreakthroughState
+from .mcts import LEAF_EVALUATIONS, BreakthroughMCTSSearcher
+from .positions import PositionWriter
+from .rules import BOARD_SIZE, init_board
+from .search import DIFFICULTY_BUDGETS, MAX_SEARCH_DEPTH, SEARCH_MODES, BreakthroughMinMaxSearcher
+from .weights import DEFAULT_WEIGHTS, WEIGHTS_ENV
+
+# ----- arène : parties moteur contre moteur sans interface -----
+# une configuration est un dict d'arguments de BreakthroughMinMaxSearcher, plus un "name" ;
+# avec "engine": "mcts", ce sont les arguments de BreakthroughMCTSSearcher
+ENGINE_KEYS = ("max_depth", "time_limit", "node_limit", "search_mode", "tt_size_mb", "weights")
+MCTS_KEYS = ("time_limit", "playout_limit", "batch_size", "leaf_evaluation", "exploration")
+SPEC_KEYS = {"depth": "max_depth", "time": "time_limit", "nodes": "node_limit",
+             "mode": "search_mode", "tt": "tt_size_mb", "weights": "weights", "engine": "engine",
+             "playouts": "playout_limit", "batch": "batch_size", "leaf": "leaf_evaluation", "c": "exploration"}
+ENGINES = ("alphabeta", "mcts")
+ARENA_TT_SIZE_MB = 4  # petite table : allouée à chaque partie, dans chaque processus
+MAX_GAME_PLIES = 300  # garde-fou : au-delà, la partie est nulle
+ELO_Z = 1.96  # intervalle de confiance à 95 %
+
+# "easy", "hard", "depth=3,nodes=2000,mode=negamax,weights=weights.json"
+# ou "engine=mcts,time=0.5,leaf=eval" ; "name=..." donne un nom au moteur
+def parse_engine(spec: str) -> dict:
+    if spec in DIFFICULTY_BUDGETS:
+        return {"name": spec, "max_depth": MAX_SEARCH_DEPTH, **DIFFICULTY_BUDGETS[spec]}
+    config = {"name": spec, "max_depth": MAX_SEARCH_DEPTH}
+    for item in spec.split(","):
+        key, _, value = item.partition("=")
+        if key == "name":
+            config["name"] = value
+        elif key not in SPEC_KEYS:
+            raise ValueError(f"paramètre de moteur inconnu : {key}")
+        elif key == "mode":
+            if value not in SEARCH_MODES:
+                raise ValueError(f"mode de recherche inconnu : {value}")
+            config["search_mode"] = value
+        elif key == "engine":
+            if value not in ENGINES:
+                raise ValueError(f"moteur inconnu : {value}")
+            config["engine"] = value
+        elif key == "leaf":
+            if value not in LEAF_EVALUATIONS:
+                raise ValueError(f"évaluation des feuilles inconnue : {value}")
+            config["leaf_evaluation"] = value
+        elif key == "weights":
+            config["weights"] = value
+        elif key in ("time", "tt", "c"):
+            config[SPEC_KEYS[key]] = float(value)
+        else:
+            config[SPEC_KEYS[key]] = int(value)
+    if config.get("engine") == "mcts":
+        if config.get("time_limit") is None and config.get("playout_limit") is None:
+            raise ValueError(f"moteur mcts sans limite de temps ni de parties : {spec}")
+    elif config.get("time_limit") is None and config.get("node_limit") is None and config["max_depth"] == MAX_SEARCH_DEPTH:
+        raise ValueError(f"moteur sans limite de profondeur, de temps ni de noeuds : {spec}")
+    return config
+
+def make_searcher(config: dict):
+    if config.get("engine") == "mcts":
+        return BreakthroughMCTSSearcher(**{key: config[key] for key in MCTS_KEYS if key in config})
+    options = {key: config[key] for key in ENGINE_KEYS if key in config}
+    options.setdefault("tt_size_mb", ARENA_TT_SIZE_MB)
+    # poids explicites : les deux moteurs d'une partie partagent le processus
+    options.setdefault("weights", os.environ.get(WEIGHTS_ENV) or DEFAULT_WEIGHTS)
+    return BreakthroughMinMaxSearcher(**options)
+
+# ouverture aléatoire : plies coups tirés au hasard, sans donner de coup gagnant ;
+# renvoie le plateau et le camp au trait
+def random_opening(plies: int, seed: int, size: int = BOARD_SIZE):
+    rng = random.Random(seed)
+    state = BitboardBreakthroughState(init_board(size), "W")
+    for _ in range(plies):
+        actions = []
+        for action in state.get_actions():
+            state.apply_action(action)
+            if not state.is_terminal():
+                actions.append(action)
+            state.undo_action(action)
+        if not actions:
+            break
+        state.apply_action(rng.choice(actions))
+    return state.to_board(), state.current_player
+
+# record : garde chaque position cherchée (occupations, camp au trait, score) pour PositionWriter
+def play_game(white: dict, black: dict, board=None, max_plies: int = MAX_GAME_PLIES, record: bool = False,
+              player: str = "W") -> dict:
+    state = BitboardBreakthroughState(board if board is not None else init_board(), player)
+    searchers = {"W": make_searcher(white), "B": make_searcher(black)}
+    move_time = {"W": 0.0, "B": 0.0}
+    moves = {"W": 0, "B": 0}
+    positions = []
+    winner = None
+    plies = 0
+    while plies < max_plies:
+        player = state.current_player
+        opponent = "B" if player == "W" else "W"
+        searcher = searchers[player]
+        start = time.perf_counter()
+        action = searcher.find_best_action(state)
+        move_time[player] += time.perf_counter() - start
+        if action is None:
+            # plus aucun coup : le joueur au trait perd
+            winner = opponent
+            break
+        if record:
+            positions.append((state.white, state.black, player, searcher.best_value))
+        state.apply_action(action)
+        moves[player] += 1
+        plies += 1
+        if state.has_winner():
+            winner = player
+            break
+    result = {
+        "winner": winner,
+        "plies": plies,
+        "move_time": move_time,
+        "moves": moves,
+        "nodes": {player: searcher.nodes_explored for player, searcher in searchers.items()},
+    }
+    if record:
+        result["positions"] = positions
+    return result
+
+# ----- exécution dans le pool -----
+def _play_task(task):
+    first, second, white_index, board, player, max_plies, record = task
+    white, black = (first, second) if white_index == 0 else (second, first)
+    result = play_game(white, black, board, max_plies, record, player)
+    result["white"] = white["name"]
+    result["black"] = black["name"]
+    return result
+
+# chaque ouverture est jouée deux fois par paire de moteurs, en échangeant les couleurs
+def schedule_games(engines: list, games_per_pair: int, opening_plies: int = 0, seed: int = 0,
+                   max_plies: int = MAX_GAME_PLIES, record: bool = False, board_size: int = BOARD_SIZE) -> list:
+    tasks = []
+    for first, second in combinations(engines, 2):
+        for game in range(games_per_pair):
+            if game % 2 == 0:
+                opening_seed = seed + game // 2
+                board, player = random_opening(opening_plies, opening_seed, board_size)
+            tasks.append((first, second, game % 2, board, player, max_plies, record))
+    return tasks
+
+def run_arena(engines: list, games_per_pair: int = 100, opening_plies: int = 4, seed: int = 0,
+              workers: Optional[int] = None, max_plies: int = MAX_GAME_PLIES,
+              record_path: Optional[str] = None, board_size: int = BOARD_SIZE) -> dict:
+    names = [engine["name"] for engine in engines]
+    if len(set(names)) != len(names):
+        raise ValueError("les moteurs de l'arène doivent avoir des noms distincts")
+    if record_path is not None and board_size != BOARD_SIZE:
+        raise ValueError(f"les fichiers de positions sont réservés au plateau {BOARD_SIZE}x{BOARD_SIZE}")
+    tasks = schedule_games(engines, games_per_pair, opening_plies, seed, max_plies, record_path is not None,
+                           board_size)
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_play_task(task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # par paquets : une partie rapide coûte moins cher que son aller-retour entre processus
+            chunksize = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 8))
+            results = list(pool.map(_play_task, tasks, chunksize=chunksize))
+    wall_time = time.perf_counter() - start
+    if record_path is not None:
+        record_games(record_path, results)
+    report = summarize(names, results)
+    report["games"] = len(results)
+    report["board_size"] = board_size
+    report["opening_plies"] = opening_plies
+    report["seconds"] = wall_time
+    report["games_per_second"] = len(results) / wall_time if wall_time else 0.0
+    return report
+
+# positions des parties, étiquetées avec le résultat final, ajoutées au fichier de positions
+def record_games(path: str, results: list) -> int:
+    with PositionWriter(path) as writer:
+        for result in results:
+            for white, black, player, score in result.pop("positions"):
+                writer.append(white, black, player, result["winner"], score)
+        return writer.count
+
+# ----- statistiques -----
+# écart Elo et intervalle de confiance à partir du score moyen et de sa variance par partie ;
+# sans partie l'intervalle n'est pas borné (None, null en JSON)
+def elo_estimate(wins: int, losses: int, draws: int) -> dict:
+    games = wins + losses + draws
+    if not games:
+        return {"elo": 0.0, "low": None, "high": None}
+    score = (wins + 0.5 * draws) / games
+    variance = (wins * (1 - score) ** 2 + losses * score ** 2 + draws * (0.5 - score) ** 2) / games
+    margin = ELO_Z * math.sqrt(variance / games)
+    return {
+        "elo": _elo_from_score(score, games),
+        "low": _elo_from_score(score - margin, games),
+        "high": _elo_from_score(score + margin, games),
+    }
+
+# un score de 0 ou 1 (toutes les parties perdues ou gagnées) donnerait un écart infini :
+# il est ramené à une demi-partie des bornes
+def _elo_from_score(score: float, games: int) -> float:
+    score = min(1 - 0.5 / games, max(0.5 / games, score))
+    return 400 * math.log10(score / (1 - score))
+
+def _empty_record() -> dict:
+    return {"wins": 0, "losses": 0, "draws": 0, "games": 0, "moves": 0, "move_time": 0.0, "nodes": 0}
+
+def summarize(names: list, results: list) -> dict:
+    engines = {name: _empty_record() for name in names}
+    pairs = {}
+    for result in results:
+        for player, opponent in (("W", "B"), ("B", "W")):
+            name = result["white"] if player == "W" else result["black"]
+            opponent_name = result["white"] if opponent == "W" else result["black"]
+            for record in (engines[name], pairs.setdefault((name, opponent_name), _empty_record())):
+                record["games"] += 1
+                if result["winner"] == player:
+                    record["wins"] += 1
+                elif result["winner"] is None:
+                    record["draws"] += 1
+                else:
+                    record["losses"] += 1
+                record["moves"] += result["moves"][player]
+                record["move_time"] += result["move_time"][player]
+                record["nodes"] += result["nodes"][player]
+
+    def finish(record):
+        games = record["games"]
+        moves = record.pop("moves")
+        move_time = record.pop("move_time")
+        nodes = record.pop("nodes")
+        record["avg_move_time"] = move_time / moves if moves else 0.0
+        record["nodes_per_game"] = nodes / games if games else 0.0
+        record.update(elo_estimate(record["wins"], record["losses"], record["draws"]))
+        return record
+
+    return {
+        # Elo de chaque moteur par rapport à l'ensemble de ses adversaires
+        "engines": {name: finish(record) for name, record in engines.items()},
+        # Elo du premier moteur de la paire par rapport au second
+        "pairs": [
+            {"engine": name, "opponent": opponent, **finish(record)}
+            for (name, opponent), record in pairs.items() if names.index(name) < names.index(opponent)
+        ],
+        "white_wins": sum(1 for result in results if result["winner"] == "W"),
+        "avg_plies": sum(result["plies"] for result in results) / len(results) if results else 0.0,
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Parties moteur contre moteur en parallèle")
+    parser.add_argument("engines", nargs="+",
+                        help='"easy", "medium", "hard", "depth=3,nodes=2000,mode=negamax,name=d3" '
+                             'ou "engine=mcts,time=0.5,name=uct"')
+    parser.add_argument("--games", type=int, default=100, help="parties par paire de moteurs")
+    parser.add_argument("--opening-plies", type=int, default=4, help="coups aléatoires avant la partie")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="processus (par défaut : nombre de coeurs)")
+    parser.add_argument("--max-plies", type=int, default=MAX_GAME_PLIES)
+    parser.add_argument("--board-size", type=int, default=BOARD_SIZE, help="taille du plateau (6, 10, 12...)")
+    parser.add_argument("--output", help="fichier JSON de sortie (stdout par défaut)")
+    parser.add_argument("--record", help="ajoute les positions jouées à ce fichier de positions binaire")
+    args = parser.parse_args(argv)
+    if len(args.engines) < 2:
+        parser.error("il faut au moins deux moteurs")
+
+    report = run_arena([parse_engine(spec) for spec in args.engines], args.games, args.opening_plies,
+                       args.seed, args.workers, args.max_plies, args.record, args.board_size)
+    text = json.dumps(report, indent=2, allow_nan=False)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import threading
+from typing import Optional, Tuple
+
+from .bitboard import BitboardBreakthroughState
+from .search import BreakthroughMinMaxSearcher, action_key
+from .state import BreakthroughAction, move_to_action
+from .zobrist import zobrist_hash
+
+# ----- recherche en arrière-plan -----
+PONDER_REPLIES = 3
+
+# fait tourner le searcher dans un thread pour que la boucle pygame continue de tourner ;
+# pendant le tour de l'humain, les réponses les plus probables sont cherchées à l'avance
+class BackgroundSearcher:
+    def __init__(self, searcher: BreakthroughMinMaxSearcher, ponder: bool = True):
+        self.searcher = searcher
+        self.searcher.stop_event = threading.Event()
+        self.ponder = ponder
+        self.ponder_hits = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._jobs = []
+        self._current = None
+        self._results = {}
+        self._pending = None
+
+    # appelé quand c'est au tour de l'IA ; le coup est ensuite récupéré avec poll()
+    def request_move(self, board, current_player: str) -> None:
+        key = zobrist_hash(board, current_player)
+        with self._lock:
+            self._pending = key
+            if key in self._results:
+                self.ponder_hits += 1
+                return
+            if self._current == key:
+                # la position était déjà en cours d'analyse : on garde cette recherche
+                self.ponder_hits += 1
+                self._jobs = []
+                return
+        self.stop()
+        self._start([(key, [row[:] for row in board], current_player)])
+
+    # (terminé, coup) ; le coup peut être None si l'IA n'a aucun coup
+    def poll(self) -> Tuple[bool, Optional[BreakthroughAction]]:
+        with self._lock:
+            if self._pending is None or self._pending not in self._results:
+                return False, None
+            move = self._results.pop(self._pending)
+            self._pending = None
+            self._results.clear()
+        return True, BreakthroughAction(*move) if move is not None else None
+
+    # appelé après le coup de l'IA : cherche les réponses aux coups humains les plus probables
+    def start_pondering(self, board, human_player: str) -> None:
+        if not self.ponder:
+            return
+        self.stop()
+        state = BitboardBreakthroughState(board, human_player)
+        if state.is_terminal():
+            return
+        sign = 1 if human_player == "W" else -1
+        replies = sorted(state.iter_actions(),
+                         key=lambda action: -sign * self.searcher.evaluate_action(state, action))
+        predicted = None
+        if self.searcher.transposition_table is not None:
+            entry = self.searcher.transposition_table.probe(state.hash)
+            if entry is not None and entry[3] is not None:
+                predicted = action_key(move_to_action(entry[3], state.size))
+        if predicted is not None:
+            replies.sort(key=lambda action: action_key(action) != predicted)
+        jobs = []
+        for action in replies[:PONDER_REPLIES]:
+            state.apply_action(action)
+            jobs.append((state.hash, state.to_board(), state.current_player))
+            state.undo_action(action)
+        self._start(jobs)
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            with self._lock:
+                self._jobs = []
+            self.searcher.stop_event.set()
+            self._thread.join()
+            self._thread = None
+        self.searcher.stop_event.clear()
+
+    def _start(self, jobs) -> None:
+        with self._lock:
+            self._jobs = list(jobs)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._jobs:
+                    self._current = None
+                    return
+                key, board, player = self._jobs.pop(0)
+                self._current = key
+            action = self.searcher.find_best_action(BitboardBreakthroughState(board, player))
+            if self.searcher.stop_event.is_set():
+                with self._lock:
+                    self._current = None
+                return
+            with self._lock:
+                self._results[key] = action_key(action) if action is not None else None
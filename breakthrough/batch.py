@@ -0,0 +1,218 @@
+import numpy as np
+
+from .bitboard import (
+    CENTRAL_MASK, FULL_MASK, NOT_FILE_A, NOT_FILE_H, ROW_MASKS, BitboardBreakthroughState,
+)
+from .rules import BOARD_SIZE
+from .state import WIN_VALUE
+from .weights import WEIGHT_NAMES, current_weights
+
+# ----- évaluation vectorisée d'un lot de positions -----
+# module optionnel (numpy n'est pas nécessaire au reste du moteur) ; mêmes termes et mêmes scores
+# que BitboardBreakthroughState.evaluate, calculés sur des tableaux de N mots de 64 bits par camp,
+# avec les poids du processus (current_weights) ou ceux passés en argument ; plateau BOARD_SIZE seulement
+
+def _mask(value: int):
+    return np.uint64(value)
+
+FULL = _mask(FULL_MASK)
+NOT_A = _mask(NOT_FILE_A)
+NOT_H = _mask(NOT_FILE_H)
+CENTRAL = _mask(CENTRAL_MASK)
+ROWS = [_mask(mask) for mask in ROW_MASKS]
+SHIFTS = {shift: np.uint64(shift) for shift in range(BOARD_SIZE * BOARD_SIZE)}
+FEATURE = {name: index for index, name in enumerate(WEIGHT_NAMES)}
+
+# popcount : np.bitwise_count (numpy >= 2.0), sinon table des 256 octets
+if hasattr(np, "bitwise_count"):
+    def _count(bits):
+        return np.bitwise_count(bits).astype(np.int64)
+else:
+    _BYTE_COUNTS = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.int64)
+
+    def _count(bits):
+        return _BYTE_COUNTS[np.ascontiguousarray(bits).view(np.uint8).reshape(-1, 8)].sum(axis=1)
+
+def _up(bits, shift: int):
+    return bits << SHIFTS[shift]
+
+def _down(bits, shift: int):
+    return bits >> SHIFTS[shift]
+
+# mobilité et prises d'un camp, comme BitboardBreakthroughState._move_sources
+def _moves(own, opponent, empty, white: bool):
+    not_own = FULL & ~own
+    if white:
+        forward = own & _up(empty, BOARD_SIZE)
+        left = own & NOT_A & _up(not_own, BOARD_SIZE + 1)
+        right = own & NOT_H & _up(not_own, BOARD_SIZE - 1)
+        attacks = _count(left & _up(opponent, BOARD_SIZE + 1)) + _count(right & _up(opponent, BOARD_SIZE - 1))
+    else:
+        forward = own & _down(empty, BOARD_SIZE)
+        left = own & NOT_A & _down(not_own, BOARD_SIZE - 1)
+        right = own & NOT_H & _down(not_own, BOARD_SIZE + 1)
+        attacks = _count(left & _down(opponent, BOARD_SIZE - 1)) + _count(right & _down(opponent, BOARD_SIZE + 1))
+    return _count(forward) + _count(left) + _count(right), attacks
+
+def _columns(bits):
+    occupied = bits & ROWS[0]
+    for row in range(1, BOARD_SIZE):
+        occupied |= _down(bits, row * BOARD_SIZE) & ROWS[0]
+    return _count(occupied)
+
+def _lowest_bit(bits):
+    return bits & (~bits + np.uint64(1))
+
+# caractéristiques de chaque position (différences blanc - noir), colonnes dans l'ordre de WEIGHT_NAMES :
+# l'évaluation d'une position non gagnée est le produit scalaire avec le vecteur de poids
+def extract_features(white, black):
+    white = np.asarray(white, dtype=np.uint64)
+    black = np.asarray(black, dtype=np.uint64)
+    features = np.empty((len(white), len(WEIGHT_NAMES)), dtype=np.int64)
+    white_pawns = _count(white)
+    black_pawns = _count(black)
+    features[:, FEATURE["piece"]] = white_pawns - black_pawns
+
+    advance = np.zeros(len(white), dtype=np.int64)
+    for row in range(BOARD_SIZE):
+        advance += (BOARD_SIZE - 1 - row) * _count(white & ROWS[row]) - row * _count(black & ROWS[row])
+    features[:, FEATURE["advance"]] = advance
+    features[:, FEATURE["central"]] = _count(white & CENTRAL) - _count(black & CENTRAL)
+
+    white_protected = _count(white & NOT_A & _down(white, BOARD_SIZE - 1)) \
+        + _count(white & NOT_H & _down(white, BOARD_SIZE + 1))
+    black_protected = _count(black & NOT_A & _up(black, BOARD_SIZE + 1)) \
+        + _count(black & NOT_H & _up(black, BOARD_SIZE - 1))
+    features[:, FEATURE["protection"]] = white_protected - black_protected
+
+    empty = FULL & ~(white | black)
+    white_mobility, white_attacks = _moves(white, black, empty, True)
+    black_mobility, black_attacks = _moves(black, white, empty, False)
+    features[:, FEATURE["mobility"]] = white_mobility - black_mobility
+    features[:, FEATURE["attack"]] = white_attacks - black_attacks
+    features[:, FEATURE["pair"]] = _count(white & NOT_A & _up(white, 1)) - _count(black & NOT_A & _up(black, 1))
+    features[:, FEATURE["column_control"]] = _columns(white) - _columns(black)
+    features[:, FEATURE["almost_win"]] = _count(white & ROWS[1]) - _count(black & ROWS[BOARD_SIZE - 2])
+
+    defense = np.where((white_pawns > black_pawns) & (black_pawns < 4), 4 - black_pawns, 0)
+    defense -= np.where((black_pawns > white_pawns) & (white_pawns < 4), 4 - white_pawns, 0)
+    features[:, FEATURE["defense"]] = defense
+    return features
+
+# vainqueur de chaque position : 1 blanc, -1 noir, 0 partie en cours ;
+# comme _winner, la première colonne trouvée l'emporte, blanc avant noir
+def winners(white, black):
+    white_row = np.asarray(white, dtype=np.uint64) & ROWS[0]
+    black_row = _down(np.asarray(black, dtype=np.uint64) & ROWS[BOARD_SIZE - 1], (BOARD_SIZE - 1) * BOARD_SIZE)
+    white_first = np.where(white_row != 0, _lowest_bit(white_row), np.uint64(1 << BOARD_SIZE))
+    black_first = np.where(black_row != 0, _lowest_bit(black_row), np.uint64(1 << BOARD_SIZE))
+    result = np.where((white_row != 0) & (white_first <= black_first), 1, 0)
+    return np.where((black_row != 0) & (black_first < white_first), -1, result)
+
+def weight_vector(weights=None):
+    weights = current_weights() if weights is None else weights
+    return np.array([weights[name] for name in WEIGHT_NAMES], dtype=np.float64)
+
+def evaluate_bitboards(white, black, weights=None):
+    scores = extract_features(white, black) @ weight_vector(weights)
+    winner = winners(white, black)
+    return np.where(winner == 0, scores, winner * WIN_VALUE)
+
+# plans booléens N x 8 x 8 (une case par élément) vers les mots d'occupation (bit row * 8 + col)
+def planes_to_bitboards(planes):
+    planes = np.asarray(planes, dtype=bool).reshape(-1, BOARD_SIZE * BOARD_SIZE)
+    return np.packbits(planes, axis=1, bitorder="little").view("<u8").reshape(-1).astype(np.uint64)
+
+def evaluate_planes(white, black):
+    return evaluate_bitboards(planes_to_bitboards(white), planes_to_bitboards(black))
+
+# tableau N x 8 x 8 de "W", "B" et None, ou liste de plateaux
+def evaluate_boards(boards):
+    boards = np.asarray(boards, dtype=object)
+    return evaluate_planes(boards == "W", boards == "B")
+
+def evaluate_states(states):
+    white = []
+    black = []
+    for state in states:
+        if not isinstance(state, BitboardBreakthroughState):
+            state = BitboardBreakthroughState(state.to_board(), state.current_player)
+        white.append(state.white)
+        black.append(state.black)
+    return evaluate_bitboards(np.array(white, dtype=np.uint64), np.array(black, dtype=np.uint64))
+
+# score de toutes les positions obtenues après chaque coup, en un seul lot
+def evaluate_actions(state, actions):
+    children = []
+    for action in actions:
+        state.apply_action(action)
+        children.append(state.to_board())
+        state.undo_action(action)
+    return evaluate_boards(children)
+
+# ----- parties aléatoires en lot -----
+# chaque plateau est vu du camp au trait, qui avance vers la ligne 0 comme les blancs : les plateaux noirs
+# sont retournés (inverser les octets d'un mot inverse l'ordre des lignes) et chaque coup retourne le plateau.
+# Un coup est tiré uniformément parmi les coups légaux, sauf si un pion peut atteindre la dernière ligne
+# (la partie est alors gagnée) ou si un pion adverse menaçant peut être pris (une de ces prises est tirée) ;
+# même politique que mcts._random_playout
+_BYTE_POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.int64)
+# position du k-ième bit à 1 de chaque octet
+_BYTE_SELECT = np.zeros((256, 8), dtype=np.int64)
+for _byte in range(256):
+    for _rank, _bit in enumerate(bit for bit in range(8) if _byte >> bit & 1):
+        _BYTE_SELECT[_byte, _rank] = _bit
+# décalage vers la case d'arrivée pour les trois masques de départ (tout droit, diagonale gauche, droite)
+_MOVE_SHIFTS = np.array([BOARD_SIZE, BOARD_SIZE + 1, BOARD_SIZE - 1], dtype=np.uint64)
+
+# vainqueur de chaque partie jouée au hasard depuis les positions données : 1 blanc, -1 noir ;
+# white_to_move est un tableau de booléens, rng une graine ou un numpy.random.Generator
+def random_playouts(white, black, white_to_move, rng=None):
+    rng = np.random.default_rng(rng)
+    white = np.asarray(white, dtype=np.uint64)
+    black = np.asarray(black, dtype=np.uint64)
+    white_to_move = np.asarray(white_to_move, dtype=bool)
+    mover = np.where(white_to_move, white, black.byteswap())
+    other = np.where(white_to_move, black, white.byteswap())
+    # 1 si le camp au trait dans la position de départ gagne, -1 sinon
+    result = np.zeros(len(white), dtype=np.int64)
+    active = np.arange(len(white))
+    sign = 1
+    while len(active):
+        own = mover[active]
+        opponent = other[active]
+        not_own = FULL & ~own
+        forward = own & _up(FULL & ~(own | opponent), BOARD_SIZE)
+        left = own & NOT_A & _up(not_own, BOARD_SIZE + 1)
+        right = own & NOT_H & _up(not_own, BOARD_SIZE - 1)
+        winning = ((forward | left | right) & ROWS[1]) != 0
+        # pions adverses qui menacent d'atteindre la ligne du camp au trait : ils sont pris en priorité
+        threats = opponent & ROWS[BOARD_SIZE - 2]
+        left_defense = left & _up(threats, BOARD_SIZE + 1)
+        right_defense = right & _up(threats, BOARD_SIZE - 1)
+        defending = (left_defense | right_defense) != 0
+        forward = np.where(defending, np.uint64(0), forward)
+        left = np.where(defending, left_defense, left)
+        right = np.where(defending, right_defense, right)
+        # octets des trois masques à la suite : 8 octets (lignes) par direction
+        sources = np.stack([forward, left, right], axis=1).view(np.uint8).reshape(len(active), 3 * BOARD_SIZE)
+        cumulative = np.cumsum(_BYTE_POPCOUNT[sources], axis=1)
+        total = cumulative[:, -1]
+        blocked = total == 0
+        finished = winning | blocked
+        result[active[finished]] = np.where(winning[finished], sign, -sign)
+
+        playing = ~finished
+        rows = np.nonzero(playing)[0]
+        choice = (rng.random(len(rows)) * total[rows]).astype(np.int64)
+        byte_index = (cumulative[rows] <= choice[:, None]).sum(axis=1)
+        before = np.where(byte_index > 0, cumulative[rows, np.maximum(byte_index - 1, 0)], 0)
+        bit = _BYTE_SELECT[sources[rows, byte_index], choice - before]
+        source = np.left_shift(np.uint64(1), ((byte_index % BOARD_SIZE) * BOARD_SIZE + bit).astype(np.uint64))
+        target = source >> _MOVE_SHIFTS[byte_index // BOARD_SIZE]
+        active = active[rows]
+        # coup joué puis plateau retourné pour l'adversaire
+        mover[active] = (opponent[rows] & ~target).byteswap()
+        other[active] = (own[rows] ^ source ^ target).byteswap()
+        sign = -sign
+    return np.where(white_to_move, result, -result)
@@ -0,0 +1,192 @@
+import argparse
+import json
+import platform
+import sys
+import time
+
+from .bitboard import BitboardBreakthroughState
+from .instrumentation import SearchInstrumentation
+from .mcts import LEAF_EVALUATIONS, BreakthroughMCTSSearcher
+from .rules import board_from_string, board_to_string, init_board
+from .search import SEARCH_MODES, BreakthroughMinMaxSearcher
+from .state import BreakthroughState
+
+# ----- benchmark : perft et recherche à profondeur fixe -----
+# lancer avec : python -m breakthrough.bench --output resultats.json
+
+BACKENDS = {
+    "list": BreakthroughState,
+    "bitboard": BitboardBreakthroughState,
+}
+
+# positions de référence (plateau, trait) et nombre de feuilles attendu pour chaque profondeur de perft
+BENCH_POSITIONS = [
+    {
+        "name": "initial",
+        "board": board_to_string(init_board()),
+        "player": "W",
+        "perft": {1: 22, 2: 484, 3: 11132, 4: 256036},
+    },
+    {
+        "name": "midgame-10",
+        "board": "BBBBBBBB/BB.B.BBB/..B...../......../......../.WW.WB.W/.WW.WWW./WWWWW.WW",
+        "player": "W",
+        "perft": {1: 25, 2: 622, 3: 16107, 4: 416298},
+    },
+    {
+        "name": "midgame-16",
+        "board": "BBBBB.BB/B.B..B.B/.BB....B/..B...B./.......W/..WW.W../WWWWWW.W/W.W.W.WW",
+        "player": "W",
+        "perft": {1: 24, 2: 642, 3: 15936, 4: 429967},
+    },
+    {
+        "name": "midgame-24",
+        "board": ".B.BBBBB/B.BBB..B/..BB..../......WB/.B..B.../W.WWW..W/W.WW.WWW/WW.W.W..",
+        "player": "W",
+        "perft": {1: 26, 2: 718, 3: 18811, 4: 524064},
+    },
+]
+
+# positions de départ des autres tailles de plateau (--board-size), avec leur perft quand il est connu
+SIZE_PERFT = {
+    6: {1: 16, 2: 256, 3: 4308},
+    10: {1: 28, 2: 784, 3: 22736},
+    12: {1: 34, 2: 1156, 3: 40460},
+}
+
+def size_positions(sizes) -> list:
+    return [{"name": f"initial-{size}x{size}", "board": board_to_string(init_board(size)), "player": "W",
+             "perft": SIZE_PERFT.get(size, {})} for size in sizes]
+
+# nombre de feuilles à la profondeur donnée ; une position gagnée n'a pas de successeur
+def perft(state, depth: int) -> int:
+    if depth == 0:
+        return 1
+    if state.has_winner():
+        return 0
+    nodes = 0
+    for action in state.get_actions():
+        state.apply_action(action)
+        nodes += perft(state, depth - 1)
+        state.undo_action(action)
+    return nodes
+
+def run_perft(positions, max_depth: int, backend: str) -> list:
+    results = []
+    for position in positions:
+        for depth in range(1, max_depth + 1):
+            state = BACKENDS[backend](board_from_string(position["board"]), position["player"])
+            start = time.perf_counter()
+            nodes = perft(state, depth)
+            seconds = time.perf_counter() - start
+            expected = position["perft"].get(depth)
+            results.append({
+                "position": position["name"],
+                "backend": backend,
+                "depth": depth,
+                "nodes": nodes,
+                "expected": expected,
+                "ok": expected is None or nodes == expected,
+                "seconds": seconds,
+                "nodes_per_second": nodes / seconds if seconds else 0.0,
+            })
+    return results
+
+def run_search(positions, depth: int, backend: str, search_mode: str, trace_path=None) -> list:
+    results = []
+    for position in positions:
+        state = BACKENDS[backend](board_from_string(position["board"]), position["player"])
+        instrumentation = SearchInstrumentation(trace_path) if trace_path else None
+        searcher = BreakthroughMinMaxSearcher(max_depth=depth, search_mode=search_mode,
+                                              instrumentation=instrumentation)
+        start = time.perf_counter()
+        action = searcher.find_best_action(state)
+        seconds = time.perf_counter() - start
+        results.append({
+            "position": position["name"],
+            "backend": backend,
+            "mode": search_mode,
+            "depth": depth,
+            "nodes": searcher.nodes_explored,
+            "seconds": seconds,
+            "nodes_per_second": searcher.nodes_explored / seconds if seconds else 0.0,
+            "time_to_depth": [
+                {"depth": entry["depth"], "seconds": entry["seconds"], "nodes": entry["nodes"]}
+                for entry in searcher.iteration_log
+            ],
+            "move": [action.src_row, action.src_col, action.dst_row, action.dst_col] if action else None,
+            "score": searcher.best_value,
+        })
+        if instrumentation is not None:
+            results[-1]["profile"] = instrumentation.last_report
+    return results
+
+# parties simulées par seconde de la recherche Monte-Carlo, à budget de parties fixe
+def run_mcts(positions, playouts: int, leaf_evaluation: str, workers: int = 1) -> list:
+    results = []
+    searcher = BreakthroughMCTSSearcher(playout_limit=playouts, leaf_evaluation=leaf_evaluation, workers=workers,
+                                        seed=0)
+    try:
+        for position in positions:
+            state = BitboardBreakthroughState(board_from_string(position["board"]), position["player"])
+            action = searcher.find_best_action(state)
+            results.append({
+                "position": position["name"],
+                **searcher.search_stats,
+                "move": [action.src_row, action.src_col, action.dst_row, action.dst_col] if action else None,
+                "score": searcher.best_value,
+            })
+    finally:
+        searcher.close()
+    return results
+
+def run_benchmark(perft_depth: int = 3, search_depth: int = 4, backends=("bitboard",),
+                  search_modes=("minmax",), trace_path=None, mcts_playouts: int = 0,
+                  leaf_evaluations=("rollout",), mcts_workers: int = 1, board_sizes=()) -> dict:
+    positions = BENCH_POSITIONS + size_positions(board_sizes)
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "perft": [],
+        "search": [],
+    }
+    for backend in backends:
+        report["perft"].extend(run_perft(positions, perft_depth, backend))
+        for search_mode in search_modes:
+            report["search"].extend(run_search(positions, search_depth, backend, search_mode, trace_path))
+    if mcts_playouts:
+        report["mcts"] = []
+        for leaf_evaluation in leaf_evaluations:
+            report["mcts"].extend(run_mcts(positions, mcts_playouts, leaf_evaluation, mcts_workers))
+    report["perft_ok"] = all(result["ok"] for result in report["perft"])
+    return report
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark perft et recherche du moteur breakthrough")
+    parser.add_argument("--perft-depth", type=int, default=3)
+    parser.add_argument("--search-depth", type=int, default=4)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), action="append")
+    parser.add_argument("--mode", choices=SEARCH_MODES, action="append")
+    parser.add_argument("--output", help="fichier JSON de sortie (stdout par défaut)")
+    parser.add_argument("--trace", help="active l'instrumentation et ajoute une ligne JSONL par coup à ce fichier")
+    parser.add_argument("--mcts-playouts", type=int, default=0, help="parties par position de la recherche Monte-Carlo")
+    parser.add_argument("--mcts-leaf", choices=LEAF_EVALUATIONS, action="append")
+    parser.add_argument("--mcts-workers", type=int, default=1)
+    parser.add_argument("--board-size", type=int, action="append",
+                        help="ajoute la position de départ de cette taille de plateau (6, 10, 12...)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.perft_depth, args.search_depth,
+                           tuple(args.backend or ["bitboard"]), tuple(args.mode or ["minmax"]), args.trace,
+                           args.mcts_playouts, tuple(args.mcts_leaf or ["rollout"]), args.mcts_workers,
+                           tuple(args.board_size or ()))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+    return 0 if report["perft_ok"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
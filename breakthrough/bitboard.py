@@ -0,0 +1,333 @@
+from typing import Dict, List, Optional
+
+from .rules import BOARD_SIZE, board_tables, runaway_race
+from .state import (
+    EVALUATION_WEIGHTS, MOVE_CAPTURE, MOVE_DST_SHIFT, MOVE_GOAL, MOVE_SQUARE_MASK, WIN_VALUE,
+    BreakthroughAction, action_to_move, move_to_action, new_move_buffer,
+)
+from .zobrist import ZOBRIST_BLACK_TO_MOVE, zobrist_hash, zobrist_keys
+
+# ----- version bitboard de l'état -----
+# une case (row, col) correspond au bit row * size + col, un entier par camp ; les masques de chaque
+# taille sont dans board_tables(size), ceux de la taille par défaut restent exportés ici (module batch)
+_DEFAULT_TABLES = board_tables(BOARD_SIZE)
+FULL_MASK = _DEFAULT_TABLES.full_mask
+FILE_A = _DEFAULT_TABLES.file_a
+FILE_H = _DEFAULT_TABLES.file_h
+NOT_FILE_A = _DEFAULT_TABLES.not_file_a
+NOT_FILE_H = _DEFAULT_TABLES.not_file_h
+ROW_MASKS = _DEFAULT_TABLES.row_masks
+CENTRAL_MASK = _DEFAULT_TABLES.central_mask
+
+
+def _columns_occupied(bits: int, size: int, first_row: int) -> int:
+    # replie toutes les lignes sur la première pour savoir quelles colonnes sont occupées
+    occupied = 0
+    while bits:
+        occupied |= bits & first_row
+        bits >>= size
+    return occupied
+
+
+class BitboardBreakthroughState:
+    def __init__(self, board: List[List[Optional[str]]], current_player: str):
+        self._set_size(len(board))
+        size = self.size
+        self.white = 0
+        self.black = 0
+        for row in range(size):
+            for col in range(size):
+                if board[row][col] == "W":
+                    self.white |= 1 << (row * size + col)
+                elif board[row][col] == "B":
+                    self.black |= 1 << (row * size + col)
+        self.current_player = current_player
+        self.hash = zobrist_hash(board, current_player)
+        # coups joués (avec l'indicateur de prise), dépilés par undo_move
+        self._undo_stack = []
+        self.weights = EVALUATION_WEIGHTS
+
+    # reconstruit un état à partir des deux mots d'occupation (lecture des fichiers de positions)
+    @classmethod
+    def from_bitboards(cls, white: int, black: int, current_player: str,
+                       size: int = BOARD_SIZE) -> "BitboardBreakthroughState":
+        state = cls.__new__(cls)
+        state._set_size(size)
+        state.white = white
+        state.black = black
+        state.current_player = current_player
+        state.hash = zobrist_hash(state.to_board(), current_player)
+        state._undo_stack = []
+        state.weights = EVALUATION_WEIGHTS
+        return state
+
+    # tables et clés de Zobrist partagées par les états de cette taille
+    def _set_size(self, size: int) -> None:
+        self.size = size
+        self.tables = board_tables(size)
+        self._zobrist_keys = zobrist_keys(size)
+
+    # poids propres à cet état (ceux d'un searcher), lus à chaque évaluation
+    def use_weights(self, weights: Dict[str, float]) -> None:
+        self.weights = weights
+
+    def to_board(self) -> List[List[Optional[str]]]:
+        size = self.size
+        board = [[None for _ in range(size)] for _ in range(size)]
+        for row in range(size):
+            for col in range(size):
+                bit = 1 << (row * size + col)
+                if self.white & bit:
+                    board[row][col] = "W"
+                elif self.black & bit:
+                    board[row][col] = "B"
+        return board
+
+    # renvoie les cases de départ (avant, diag gauche, diag droite, prise gauche, prise droite)
+    # ainsi que les décalages correspondants vers la case d'arrivée
+    def _move_sources(self, player: str):
+        tables = self.tables
+        size = tables.size
+        full = tables.full_mask
+        empty = full & ~(self.white | self.black)
+        if player == "W":
+            own, opp = self.white, self.black
+            not_own = full & ~own
+            forward = own & (empty << size)
+            left = own & tables.not_file_a & (not_own << (size + 1))
+            right = own & tables.not_file_h & (not_own << (size - 1))
+            left_capture = left & (opp << (size + 1))
+            right_capture = right & (opp << (size - 1))
+            shifts = (-size, -size - 1, -size + 1)
+        else:
+            own, opp = self.black, self.white
+            not_own = full & ~own
+            forward = own & (empty >> size)
+            left = own & tables.not_file_a & (not_own >> (size - 1))
+            right = own & tables.not_file_h & (not_own >> (size + 1))
+            left_capture = left & (opp >> (size - 1))
+            right_capture = right & (opp >> (size + 1))
+            shifts = (size, size - 1, size + 1)
+        return forward, left, right, left_capture, right_capture, shifts
+
+    # écrit dans buffer, à partir de count, les coups des cases de départ dans l'ordre de lecture ;
+    # pour chaque case, les coups (masque, décalage, indicateurs) sont essayés dans l'ordre donné
+    @staticmethod
+    def _write_moves(buffer, count: int, sources: int, moves) -> int:
+        while sources:
+            bit = sources & -sources
+            sources ^= bit
+            square = bit.bit_length() - 1
+            for mask, shift, flags in moves:
+                if mask & bit:
+                    buffer[count] = square | (square + shift) << MOVE_DST_SHIFT | flags
+                    count += 1
+        return count
+
+    # même ordre que BreakthroughState.get_actions : prises d'abord, puis cases dans l'ordre de lecture
+    def get_actions(self) -> List[BreakthroughAction]:
+        forward, left, right, left_capture, right_capture, shifts = self._move_sources(self.current_player)
+        forward_shift, left_shift, right_shift = shifts
+        left ^= left_capture
+        right ^= right_capture
+        buffer = new_move_buffer()
+        count = self._write_moves(buffer, 0, left_capture | right_capture,
+                                  ((left_capture, left_shift, MOVE_CAPTURE), (right_capture, right_shift, MOVE_CAPTURE)))
+        count = self._write_moves(buffer, count, forward | left | right,
+                                  ((forward, forward_shift, 0), (left, left_shift, 0), (right, right_shift, 0)))
+        return [move_to_action(move, self.size) for move in buffer[:count]]
+
+    # coups gagnants, puis prises, puis coups calmes, écrits dans buffer ; renvoie le nombre de coups
+    def generate_moves(self, buffer) -> int:
+        forward, left, right, left_capture, right_capture, shifts = self._move_sources(self.current_player)
+        forward_shift, left_shift, right_shift = shifts
+        tables = self.tables
+        goal = tables.row_masks[tables.goal_rows[self.current_player]]
+        not_goal = tables.full_mask ^ goal
+        left ^= left_capture
+        right ^= right_capture
+        count = self._write_moves(buffer, 0, (forward | left | right | left_capture | right_capture) & goal,
+                                  ((forward, forward_shift, MOVE_GOAL),
+                                   (left_capture, left_shift, MOVE_GOAL | MOVE_CAPTURE), (left, left_shift, MOVE_GOAL),
+                                   (right_capture, right_shift, MOVE_GOAL | MOVE_CAPTURE), (right, right_shift, MOVE_GOAL)))
+        count = self._write_moves(buffer, count, (left_capture | right_capture) & not_goal,
+                                  ((left_capture, left_shift, MOVE_CAPTURE), (right_capture, right_shift, MOVE_CAPTURE)))
+        return self._write_moves(buffer, count, (forward | left | right) & not_goal,
+                                 ((forward, forward_shift, 0), (left, left_shift, 0), (right, right_shift, 0)))
+
+    def iter_actions(self):
+        buffer = new_move_buffer()
+        count = self.generate_moves(buffer)
+        for index in range(count):
+            yield move_to_action(buffer[index], self.size)
+
+    def has_actions(self) -> bool:
+        forward, left, right, _, _, _ = self._move_sources(self.current_player)
+        return bool(forward | left | right)
+
+    def is_capture(self, action: BreakthroughAction) -> bool:
+        return bool((self.white | self.black) & (1 << (action.dst_row * self.size + action.dst_col)))
+
+    def is_legal(self, action: BreakthroughAction) -> bool:
+        size = self.size
+        if not (0 <= action.src_row < size and 0 <= action.src_col < size
+                and 0 <= action.dst_row < size and 0 <= action.dst_col < size):
+            return False
+        return self.is_legal_move(action_to_move(action, size))
+
+    def is_legal_move(self, move: int) -> bool:
+        src = move & MOVE_SQUARE_MASK
+        dst = (move >> MOVE_DST_SHIFT) & MOVE_SQUARE_MASK
+        tables = self.tables
+        if src >= tables.squares or dst >= tables.squares:
+            return False
+        own = self.white if self.current_player == "W" else self.black
+        rows, cols = tables.square_rows, tables.square_cols
+        src_bit = 1 << src
+        dst_bit = 1 << dst
+        if not own & src_bit or own & dst_bit or rows[dst] != rows[src] + tables.directions[self.current_player]:
+            return False
+        if cols[dst] == cols[src]:
+            return not (self.white | self.black) & dst_bit
+        return abs(cols[dst] - cols[src]) == 1
+
+    def apply_action(self, action: BreakthroughAction) -> None:
+        self.apply_move(action_to_move(action, self.size))
+
+    # annule le dernier coup joué (pile d'annulation)
+    def undo_action(self, action: BreakthroughAction) -> None:
+        self.undo_move()
+
+    def apply_move(self, move: int) -> None:
+        src = move & MOVE_SQUARE_MASK
+        dst = (move >> MOVE_DST_SHIFT) & MOVE_SQUARE_MASK
+        src_bit = 1 << src
+        dst_bit = 1 << dst
+        zobrist_keys = self._zobrist_keys
+        if self.white & src_bit:
+            keys = zobrist_keys["W"]
+            captured = self.black & dst_bit
+            if captured:
+                self.black ^= dst_bit
+                self.hash ^= zobrist_keys["B"][dst]
+            self.white ^= src_bit | dst_bit
+        else:
+            keys = zobrist_keys["B"]
+            captured = self.white & dst_bit
+            if captured:
+                self.white ^= dst_bit
+                self.hash ^= zobrist_keys["W"][dst]
+            self.black ^= src_bit | dst_bit
+        self._undo_stack.append(move | MOVE_CAPTURE if captured else move & ~MOVE_CAPTURE)
+        self.current_player = "B" if self.current_player == "W" else "W"
+        self.hash ^= keys[src] ^ keys[dst] ^ ZOBRIST_BLACK_TO_MOVE
+
+    def undo_move(self) -> None:
+        move = self._undo_stack.pop()
+        src = move & MOVE_SQUARE_MASK
+        dst = (move >> MOVE_DST_SHIFT) & MOVE_SQUARE_MASK
+        src_bit = 1 << src
+        dst_bit = 1 << dst
+        zobrist_keys = self._zobrist_keys
+        if self.white & dst_bit:
+            self.white ^= src_bit | dst_bit
+            keys = zobrist_keys["W"]
+            if move & MOVE_CAPTURE:
+                self.black |= dst_bit
+                self.hash ^= zobrist_keys["B"][dst]
+        else:
+            self.black ^= src_bit | dst_bit
+            keys = zobrist_keys["B"]
+            if move & MOVE_CAPTURE:
+                self.white |= dst_bit
+                self.hash ^= zobrist_keys["W"][dst]
+        self.current_player = "B" if self.current_player == "W" else "W"
+        self.hash ^= keys[src] ^ keys[dst] ^ ZOBRIST_BLACK_TO_MOVE
+
+    def _winner(self) -> Optional[str]:
+        # comme check_win : la première colonne trouvée l'emporte, blanc avant noir
+        size = self.size
+        row_masks = self.tables.row_masks
+        white_row = self.white & row_masks[0]
+        black_row = (self.black & row_masks[size - 1]) >> ((size - 1) * size)
+        if not white_row and not black_row:
+            return None
+        if not black_row:
+            return "W"
+        if not white_row:
+            return "B"
+        return "W" if (white_row & -white_row) <= (black_row & -black_row) else "B"
+
+    def evaluate(self) -> float:
+        winner = self._winner()
+        if winner == "W":
+            return WIN_VALUE
+        if winner == "B":
+            return -WIN_VALUE
+
+        white, black = self.white, self.black
+        weights = self.weights
+        tables = self.tables
+        size = tables.size
+        row_masks = tables.row_masks
+        not_file_a, not_file_h = tables.not_file_a, tables.not_file_h
+        score = 0
+        white_pawns = white.bit_count()
+        black_pawns = black.bit_count()
+
+        advance = weights["advance"]
+        for row in range(size):
+            score += (size - 1 - row) * advance * (white & row_masks[row]).bit_count()
+            score -= row * advance * (black & row_masks[row]).bit_count()
+
+        central = tables.central_mask
+        score += ((white & central).bit_count() - (black & central).bit_count()) * weights["central"]
+
+        # protection : un pion est protégé par les pions de son camp situés en diagonale derrière lui
+        white_protected = (white & not_file_a & (white >> (size - 1))).bit_count() \
+            + (white & not_file_h & (white >> (size + 1))).bit_count()
+        black_protected = (black & not_file_a & (black << (size + 1))).bit_count() \
+            + (black & not_file_h & (black << (size - 1))).bit_count()
+        score += (white_protected - black_protected) * weights["protection"]
+
+        forward, left, right, left_capture, right_capture, _ = self._move_sources("W")
+        white_mobility = forward.bit_count() + left.bit_count() + right.bit_count()
+        white_attacks = left_capture.bit_count() + right_capture.bit_count()
+        forward, left, right, left_capture, right_capture, _ = self._move_sources("B")
+        black_mobility = forward.bit_count() + left.bit_count() + right.bit_count()
+        black_attacks = left_capture.bit_count() + right_capture.bit_count()
+        score += (white_mobility - black_mobility) * weights["mobility"]
+        score += (white_attacks - black_attacks) * weights["attack"]
+
+        score += (_columns_occupied(white, size, row_masks[0]).bit_count()
+                  - _columns_occupied(black, size, row_masks[0]).bit_count()) * weights["column_control"]
+        score += ((white & not_file_a & (white << 1)).bit_count()
+                  - (black & not_file_a & (black << 1)).bit_count()) * weights["pair"]
+
+        score += (white & row_masks[1]).bit_count() * weights["almost_win"]
+        score -= (black & row_masks[size - 2]).bit_count() * weights["almost_win"]
+
+        score += (white_pawns - black_pawns) * weights["piece"]
+
+        if white_pawns > black_pawns and black_pawns < 4:
+            score += weights["defense"] * (4 - black_pawns)
+        elif black_pawns > white_pawns and white_pawns < 4:
+            score -= weights["defense"] * (4 - white_pawns)
+
+        return score
+
+    def has_winner(self) -> bool:
+        row_masks = self.tables.row_masks
+        return bool(self.white & row_masks[0] or self.black & row_masks[self.size - 1])
+
+    def pawn_count(self) -> int:
+        return (self.white | self.black).bit_count()
+
+    def bitboards(self):
+        return self.white, self.black
+
+    def runaway(self):
+        return runaway_race(self.white, self.black, self.current_player, self.size)
+
+    def is_terminal(self) -> bool:
+        return self.has_winner() or not self.has_actions()
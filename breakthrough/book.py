@@ -0,0 +1,168 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Optional
+
+from .bitboard import BitboardBreakthroughState
+from .rules import BOARD_SIZE, init_board
+from .state import BreakthroughAction
+
+# ----- bibliothèque d'ouvertures -----
+# en-tête : signature, version, taille d'une entrée ; puis les entrées triées par clé
+# entrée (16 octets) : hash zobrist de la position, coup (src_row, src_col, dst_row, dst_col),
+# score de la recherche du point de vue des blancs ; uniquement pour le plateau de taille BOARD_SIZE
+MAGIC = b"BTBK"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+ENTRY = struct.Struct("<QBBBBi")
+KEY = struct.Struct("<Q")
+BOOK_ENV = "BREAKTHROUGH_BOOK"
+
+class OpeningBook:
+    # le fichier est projeté en mémoire et consulté par recherche dichotomique :
+    # l'ouverture ne lit que l'en-tête
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER.size:
+            self._file.close()
+            raise ValueError(f"bibliothèque d'ouvertures invalide : {path}")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, entry_size = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or entry_size != ENTRY.size:
+            self.close()
+            raise ValueError(f"bibliothèque d'ouvertures invalide ou d'une autre version : {path}")
+        self._count = (size - HEADER.size) // ENTRY.size
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _find(self, key: int):
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * ENTRY.size
+            (entry_key,) = KEY.unpack_from(self._map, offset)
+            if entry_key < key:
+                low = middle + 1
+            elif entry_key > key:
+                high = middle
+            else:
+                return ENTRY.unpack_from(self._map, offset)
+        return None
+
+    # coup de la bibliothèque et son score, ou None ; le coup est vérifié sur la position
+    # pour écarter une collision de hash
+    def probe(self, state):
+        entry = self._find(state.hash) if state.size == BOARD_SIZE else None
+        if entry is not None:
+            _, src_row, src_col, dst_row, dst_col, score = entry
+            action = BreakthroughAction(src_row, src_col, dst_row, dst_col)
+            if state.is_legal(action):
+                self.hits += 1
+                return action, score
+        self.misses += 1
+        return None
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+            self._file.close()
+
+def write_book(path: str, entries: dict) -> None:
+    # entries : hash -> (coup, score)
+    with open(path, "wb") as book_file:
+        book_file.write(HEADER.pack(MAGIC, VERSION, ENTRY.size))
+        for key in sorted(entries):
+            move, score = entries[key]
+            book_file.write(ENTRY.pack(key, *move, round(score)))
+
+def open_book(book) -> Optional[OpeningBook]:
+    # chemin, OpeningBook, ou None : fichier désigné par BREAKTHROUGH_BOOK s'il existe
+    if book is None:
+        book = os.environ.get(BOOK_ENV) or None
+    if isinstance(book, str):
+        return OpeningBook(book)
+    return book
+
+# ----- construction -----
+# search importe ce module pour la lecture : le searcher n'est importé que pour construire
+
+# recherche d'une position de la bibliothèque, exécutée dans le pool
+def _search_position(task):
+    from .search import BreakthroughMinMaxSearcher, action_key
+
+    board, player, config = task
+    searcher = BreakthroughMinMaxSearcher(**config)
+    state = BitboardBreakthroughState(board, player)
+    action = searcher.find_best_action(state)
+    if action is None:
+        return None
+    # coups développés : le meilleur, puis les autres dans l'ordre de evaluate_action
+    others = sorted((candidate for candidate in state.get_actions() if action_key(candidate) != action_key(action)),
+                    key=lambda candidate: searcher.evaluate_action(state, candidate), reverse=True)
+    return action_key(action), searcher.best_value, [action_key(action)] + [action_key(other) for other in others]
+
+# parcours en largeur des plies premiers demi-coups : à chaque position, le meilleur coup trouvé
+# est enregistré et les width premiers coups (tous si width vaut None) sont développés
+def build_book(plies: int, config: dict, width: Optional[int] = None, workers: Optional[int] = None,
+               log=None) -> dict:
+    from concurrent.futures import ProcessPoolExecutor
+
+    entries = {}
+    root = BitboardBreakthroughState(init_board(), "W")
+    level = {root.hash: root}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for ply in range(plies):
+            states = [state for key, state in level.items() if key not in entries]
+            tasks = [(state.to_board(), state.current_player, config) for state in states]
+            start = time.perf_counter()
+            next_level = {}
+            for state, result in zip(states, pool.map(_search_position, tasks)):
+                if result is None:
+                    continue
+                move, score, order = result
+                entries[state.hash] = (move, score)
+                if ply + 1 == plies:
+                    continue
+                for candidate in order[:width]:
+                    action = BreakthroughAction(*candidate)
+                    state.apply_action(action)
+                    if not state.is_terminal():
+                        child = BitboardBreakthroughState(state.to_board(), state.current_player)
+                        next_level.setdefault(child.hash, child)
+                    state.undo_action(action)
+            if log is not None:
+                log(f"demi-coup {ply} : {len(states)} positions en {time.perf_counter() - start:.1f} s")
+            level = next_level
+    return entries
+
+def main(argv=None) -> int:
+    from .search import MAX_SEARCH_DEPTH, SEARCH_MODES
+
+    parser = argparse.ArgumentParser(description="Construction de la bibliothèque d'ouvertures")
+    parser.add_argument("--output", default="opening_book.bin")
+    parser.add_argument("--plies", type=int, default=3, help="profondeur de la bibliothèque en demi-coups")
+    parser.add_argument("--width", type=int, help="coups développés par position (tous par défaut)")
+    parser.add_argument("--depth", type=int, default=6, help="profondeur de recherche par position")
+    parser.add_argument("--time", type=float, help="temps de recherche par position")
+    parser.add_argument("--mode", choices=SEARCH_MODES, default="negamax")
+    parser.add_argument("--workers", type=int, help="processus (par défaut : nombre de coeurs)")
+    args = parser.parse_args(argv)
+
+    config = {"max_depth": args.depth if args.time is None else MAX_SEARCH_DEPTH,
+              "time_limit": args.time, "search_mode": args.mode}
+    entries = build_book(args.plies, config, args.width, args.workers,
+                         log=lambda message: print(message, file=sys.stderr))
+    write_book(args.output, entries)
+    print(f"{len(entries)} positions dans {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
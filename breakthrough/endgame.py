@@ -0,0 +1,228 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from itertools import combinations
+from math import comb
+from typing import Optional
+
+from .bitboard import BitboardBreakthroughState
+from .rules import BOARD_SIZE
+from .state import MOVE_GOAL, WIN_VALUE, new_move_buffer
+
+# ----- tables de finales -----
+# toutes les positions d'au plus max_pawns pions, chaque camp au trait, résolues exactement :
+# gain ou perte du camp au trait et nombre de demi-coups jusqu'à la fin de la partie
+# (un camp sans coup possible a perdu). Chaque coup fait avancer un pion, le graphe des positions
+# est donc sans cycle : chaque position est résolue après ses successeurs, en partant des positions
+# finales, sans avoir à générer de coups inverses.
+#
+# fichier : en-tête (signature, version, max_pawns) puis un octet signé par position ;
+# 0 position absente (déjà gagnée ou cases communes), d > 0 gain en d demi-coups,
+# d < 0 perte en -d - 1 demi-coups. Les positions sont rangées par matériel (nombre de pions
+# blancs, nombre de pions noirs), puis par rang combinatoire des cases blanches et des cases noires.
+# Les tables sont calculées pour le plateau de taille BOARD_SIZE ; les autres tailles n'y sont jamais cherchées.
+MAGIC = b"BTTB"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+SQUARES = BOARD_SIZE * BOARD_SIZE
+DEFAULT_MAX_PAWNS = 3
+TABLEBASE_ENV = "BREAKTHROUGH_TABLEBASE"
+SIDES = ("W", "B")
+
+# binomiaux utilisés pour le rang des combinaisons de cases
+BINOMIALS = [[comb(n, k) for k in range(SQUARES + 1)] for n in range(SQUARES + 1)]
+
+def material_offsets(max_pawns: int):
+    offsets = {}
+    offset = 0
+    for white_pawns in range(max_pawns + 1):
+        for black_pawns in range(max_pawns + 1 - white_pawns):
+            if white_pawns + black_pawns == 0:
+                continue
+            offsets[(white_pawns, black_pawns)] = offset
+            offset += BINOMIALS[SQUARES][white_pawns] * BINOMIALS[SQUARES][black_pawns] * 2
+    return offsets, offset
+
+def _rank(bits: int):
+    # rang combinatoire des cases occupées (cases croissantes) et nombre de cases
+    rank = 0
+    count = 0
+    while bits:
+        low = bits & -bits
+        count += 1
+        rank += BINOMIALS[low.bit_length() - 1][count]
+        bits ^= low
+    return rank, count
+
+def _index(offsets: dict, white: int, black: int, player: str) -> int:
+    white_rank, white_pawns = _rank(white)
+    black_rank, black_pawns = _rank(black)
+    block = BINOMIALS[SQUARES][black_pawns]
+    return offsets[(white_pawns, black_pawns)] + (white_rank * block + black_rank) * 2 + (player == "B")
+
+def _decode(value: int) -> Optional[int]:
+    # distance signée vue du camp au trait : d > 0 gain en d demi-coups, d < 0 perte en -d
+    if value > 127:
+        value -= 256
+    if value == 0:
+        return None
+    return value if value > 0 else value + 1
+
+class Tablebase:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, max_pawns = HEADER.unpack_from(self._map, 0)
+        self.max_pawns = max_pawns
+        self._offsets, size = material_offsets(max_pawns)
+        if magic != MAGIC or version != VERSION or len(self._map) != HEADER.size + size:
+            self.close()
+            raise ValueError(f"table de finales invalide ou d'une autre version : {path}")
+        self.hits = 0
+
+    # distance signée vue du camp au trait, ou None si la position n'est pas dans la table
+    def distance(self, state) -> Optional[int]:
+        if state.size != BOARD_SIZE or state.pawn_count() > self.max_pawns:
+            return None
+        white, black = state.bitboards()
+        return _decode(self._map[HEADER.size + _index(self._offsets, white, black, state.current_player)])
+
+    # score du point de vue des blancs : un gain plus rapide vaut plus
+    def probe(self, state) -> Optional[float]:
+        distance = self.distance(state)
+        if distance is None:
+            return None
+        self.hits += 1
+        value = WIN_VALUE - abs(distance) if distance > 0 else abs(distance) - WIN_VALUE
+        return value if state.current_player == "W" else -value
+
+    # meilleur coup d'après la table (gain le plus rapide, ou perte la plus lente) et score, ou None
+    def best_action(self, state):
+        if state.size != BOARD_SIZE or state.pawn_count() > self.max_pawns or state.has_winner():
+            return None
+        goal_row = 0 if state.current_player == "W" else BOARD_SIZE - 1
+        best = None
+        for action in state.get_actions():
+            if action.dst_row == goal_row:
+                return action, self.probe(state)
+            state.apply_action(action)
+            distance = self.distance(state)
+            state.undo_action(action)
+            if distance is None:
+                return None
+            # classement vu du camp qui joue : gain (perte adverse) court d'abord, perte longue ensuite
+            key = (0, -distance) if distance <= 0 else (1, -distance)
+            if best is None or key < best[0]:
+                best = (key, action)
+        if best is None:
+            return None
+        return best[1], self.probe(state)
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+            self._file.close()
+
+def open_tablebase(tablebase) -> Optional[Tablebase]:
+    # chemin, Tablebase, ou None : fichier désigné par BREAKTHROUGH_TABLEBASE s'il existe
+    if tablebase is None:
+        tablebase = os.environ.get(TABLEBASE_ENV) or None
+    if isinstance(tablebase, str):
+        return Tablebase(tablebase)
+    return tablebase
+
+# ----- génération -----
+def _encode(distance: int) -> int:
+    value = distance if distance > 0 else distance - 1
+    return value & 0xFF
+
+class _Generator:
+    def __init__(self, max_pawns: int):
+        self.max_pawns = max_pawns
+        self.offsets, size = material_offsets(max_pawns)
+        self.table = bytearray(size)
+        # état de travail : seules les occupations et le camp au trait servent aux coups
+        self.scratch = BitboardBreakthroughState.from_bitboards(0, 0, "W")
+        self.buffer = new_move_buffer()
+        self.solved = 0
+
+    # distance signée vue du camp au trait ; les successeurs sont résolus d'abord (récursion bornée
+    # par le nombre de coups restants, au plus 7 par pion)
+    def solve(self, white: int, black: int, player: str) -> int:
+        index = _index(self.offsets, white, black, player)
+        stored = _decode(self.table[index])
+        if stored is not None:
+            return stored
+        scratch = self.scratch
+        scratch.white, scratch.black, scratch.current_player = white, black, player
+        buffer = self.buffer
+        children = []
+        distance = None
+        # les coups gagnants sont générés en premier
+        for move_index in range(scratch.generate_moves(buffer)):
+            move = buffer[move_index]
+            if move & MOVE_GOAL:
+                distance = 1
+                break
+            scratch.apply_move(move)
+            children.append((scratch.white, scratch.black))
+            scratch.undo_move()
+        if distance is None:
+            opponent = "B" if player == "W" else "W"
+            # sans coup : perte immédiate ; sinon gain le plus court ou perte la plus longue
+            distance = 0
+            for child_white, child_black in children:
+                child = self.solve(child_white, child_black, opponent)
+                if child <= 0:
+                    candidate = 1 - child
+                    if distance <= 0 or candidate < distance:
+                        distance = candidate
+                elif distance <= 0 and -(child + 1) < distance:
+                    distance = -(child + 1)
+        self.table[index] = _encode(distance)
+        self.solved += 1
+        return distance
+
+    def run(self, log=None) -> bytearray:
+        white_goal = (1 << BOARD_SIZE) - 1
+        black_goal = white_goal << (SQUARES - BOARD_SIZE)
+        for (white_pawns, black_pawns) in self.offsets:
+            start = time.perf_counter()
+            for white_squares in combinations(range(SQUARES), white_pawns):
+                white = sum(1 << sq for sq in white_squares)
+                if white & white_goal:
+                    continue
+                for black_squares in combinations(range(SQUARES), black_pawns):
+                    black = sum(1 << sq for sq in black_squares)
+                    if black & white or black & black_goal:
+                        continue
+                    for player in SIDES:
+                        self.solve(white, black, player)
+            if log is not None:
+                log(f"{white_pawns} blancs, {black_pawns} noirs : {time.perf_counter() - start:.1f} s")
+        return self.table
+
+def build_tablebase(path: str, max_pawns: int = DEFAULT_MAX_PAWNS, log=None) -> int:
+    generator = _Generator(max_pawns)
+    table = generator.run(log)
+    with open(path, "wb") as table_file:
+        table_file.write(HEADER.pack(MAGIC, VERSION, max_pawns))
+        table_file.write(table)
+    return generator.solved
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Génération des tables de finales")
+    parser.add_argument("--pawns", type=int, default=DEFAULT_MAX_PAWNS, help="nombre total de pions maximal")
+    parser.add_argument("--output", default="endgame.bin")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    solved = build_tablebase(args.output, args.pawns, log=lambda message: print(message, file=sys.stderr))
+    print(f"{solved} positions résolues en {time.perf_counter() - start:.1f} s, table dans {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+import argparse
+import sys
+import threading
+import time
+from typing import List
+
+from .bitboard import BitboardBreakthroughState
+from .rules import BOARD_SIZE, MAX_BOARD_SIZE, board_from_string, board_to_string, init_board
+from .search import MAX_SEARCH_DEPTH, SEARCH_MODES, BreakthroughMinMaxSearcher, TranspositionTable
+from .state import BreakthroughAction
+
+# ----- moteur en ligne de commande (protocole texte inspiré d'UCI) -----
+# un processus par partie : le searcher, sa table de transposition et son historique restent
+# chauds d'un coup à l'autre. Une commande par ligne sur stdin, réponses sur stdout :
+#   isready                                   -> readyok
+#   newgame                                   vide les tables, position de départ
+#   position startpos [moves b2b3 ...]        position de départ suivie de coups
+#   position <plateau> <W|B> [moves ...]      plateau au format board_to_string ("BBBBBBBB/.../WWWWWWWW"),
+#                                             de n'importe quelle taille prise en charge
+#   go [depth N] [time S] [nodes N] [infinite] recherche dans un thread, puis
+#                                             -> info depth D score S nodes N time T (une ligne par itération)
+#                                             -> bestmove b2b3 score S depth D nodes N time T
+#   stop                                      interrompt la recherche (bestmove avec la dernière itération finie)
+#   setoption name <Nom> value <valeur>       Mode, Hash (Mo), Depth, Threads, Weights, Book, Tablebase
+#   show                                      -> position <plateau> <W|B>
+#   quit
+# les scores sont du point de vue du camp au trait ; un coup s'écrit case de départ puis case d'arrivée,
+# colonnes a-h de gauche à droite et rangées 1-8 du bas (côté blanc) vers le haut (a-l et 1-12 en 12x12)
+DEFAULT_DEPTH = 5
+FILES = "abcdefghijklmnop"[:MAX_BOARD_SIZE]
+
+def action_to_text(action: BreakthroughAction, size: int = BOARD_SIZE) -> str:
+    return (f"{FILES[action.src_col]}{size - action.src_row}"
+            f"{FILES[action.dst_col]}{size - action.dst_row}")
+
+def _parse_square(text: str, size: int):
+    if len(text) < 2 or text[0] not in FILES[:size] or not text[1:].isdigit():
+        raise ValueError(f"case invalide : {text}")
+    row = size - int(text[1:])
+    if not 0 <= row < size:
+        raise ValueError(f"case invalide : {text}")
+    return row, FILES.index(text[0])
+
+def text_to_action(text: str, size: int = BOARD_SIZE) -> BreakthroughAction:
+    # la case d'arrivée commence à la deuxième lettre
+    split = next((index for index in range(1, len(text)) if text[index].isalpha()), None)
+    try:
+        if split is None:
+            raise ValueError(text)
+        return BreakthroughAction(*_parse_square(text[:split], size), *_parse_square(text[split:], size))
+    except ValueError:
+        raise ValueError(f"coup invalide : {text}") from None
+
+class EngineProtocol:
+    def __init__(self, output=None, **searcher_options):
+        self.output = output if output is not None else sys.stdout
+        self._output_lock = threading.Lock()
+        searcher_options.setdefault("max_depth", DEFAULT_DEPTH)
+        self.options = searcher_options
+        self.searcher = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._base = None
+        self._moves = []
+        self.state = None
+        self._set_position(board_to_string(init_board()), "W", [])
+
+    def send(self, line: str) -> None:
+        with self._output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    # searcher créé à la première recherche puis conservé ; une option modifiée le recrée
+    def _get_searcher(self) -> BreakthroughMinMaxSearcher:
+        if self.searcher is None:
+            self.searcher = BreakthroughMinMaxSearcher(**self.options)
+            self.searcher.stop_event = self._stop_event
+        return self.searcher
+
+    # renvoie False pour quit
+    def handle(self, line: str) -> bool:
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == "quit":
+            self.stop()
+            if self.searcher is not None:
+                self.searcher.close()
+            return False
+        if command == "isready":
+            self.send("readyok")
+            return True
+        if command == "stop":
+            self.stop()
+            return True
+        # les autres commandes attendent la fin de la recherche en cours
+        self.wait()
+        try:
+            if command == "newgame":
+                self.new_game()
+            elif command == "position":
+                self.position(args)
+            elif command == "go":
+                self.go(args)
+            elif command == "setoption":
+                self.set_option(args)
+            elif command == "show":
+                self.send(f"position {board_to_string(self.state.to_board())} {self.state.current_player}")
+            else:
+                self.send(f"info string commande inconnue : {command}")
+        except ValueError as error:
+            self.send(f"info string {error}")
+        return True
+
+    def new_game(self) -> None:
+        if self.searcher is not None and self.searcher.transposition_table is not None:
+            self.searcher.transposition_table.clear()
+        self._set_position(board_to_string(init_board()), "W", [])
+
+    def position(self, args: List[str]) -> None:
+        if args[:1] == ["startpos"]:
+            board, player, rest = board_to_string(init_board()), "W", args[1:]
+            size = BOARD_SIZE
+        elif len(args) >= 2 and args[1] in ("W", "B"):
+            board, player, rest = args[0], args[1], args[2:]
+            size = len(board_from_string(board))
+        else:
+            raise ValueError("position attendue : startpos ou <plateau> <W|B>")
+        if rest and rest[0] != "moves":
+            raise ValueError(f"mot inattendu : {rest[0]}")
+        actions = [text_to_action(text, size) for text in rest[1:]]
+        previous = (self._base, list(self._moves))
+        try:
+            self._set_position(board, player, rest[1:], actions)
+        except ValueError:
+            # position refusée : on revient à la précédente
+            self._set_position(*previous[0], previous[1])
+            raise
+
+    # même plateau de départ : on garde l'état, on annule les coups qui diffèrent et on joue les nouveaux
+    def _set_position(self, board: str, player: str, moves: List[str], actions=None) -> None:
+        if (board, player) != self._base:
+            self.state = BitboardBreakthroughState(board_from_string(board), player)
+            self._base = (board, player)
+            self._moves = []
+        common = 0
+        while common < min(len(moves), len(self._moves)) and moves[common] == self._moves[common]:
+            common += 1
+        while len(self._moves) > common:
+            self.state.undo_move()
+            self._moves.pop()
+        for index in range(common, len(moves)):
+            text = moves[index]
+            action = actions[index] if actions is not None else text_to_action(text, self.state.size)
+            if self.state.has_winner() or not self.state.is_legal(action):
+                raise ValueError(f"coup illégal : {text}")
+            self.state.apply_action(action)
+            self._moves.append(text)
+
+    def go(self, args: List[str]) -> None:
+        limits = {"max_depth": None, "time_limit": None, "node_limit": None}
+        index = 0
+        while index < len(args):
+            word = args[index]
+            if word == "infinite":
+                limits["max_depth"] = MAX_SEARCH_DEPTH
+                index += 1
+                continue
+            if word not in ("depth", "time", "nodes") or index + 1 >= len(args):
+                raise ValueError(f"paramètre de go invalide : {word}")
+            value = args[index + 1]
+            if word == "depth":
+                limits["max_depth"] = int(value)
+            elif word == "time":
+                limits["time_limit"] = float(value)
+            else:
+                limits["node_limit"] = int(value)
+            index += 2
+        if limits["max_depth"] is None:
+            # limite de temps ou de noeuds seule : profondeur libre
+            has_budget = limits["time_limit"] is not None or limits["node_limit"] is not None
+            limits["max_depth"] = MAX_SEARCH_DEPTH if has_budget else self.options["max_depth"]
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._search, args=(limits,), daemon=True)
+        self._thread.start()
+
+    def _search(self, limits: dict) -> None:
+        searcher = self._get_searcher()
+        state = self.state
+        sign = 1 if state.current_player == "W" else -1
+        searcher.max_depth = limits["max_depth"]
+        start_nodes = searcher.nodes_explored
+        start = time.perf_counter()
+        action = searcher.find_best_action(state, limits["time_limit"], limits["node_limit"])
+        seconds = time.perf_counter() - start
+        for entry in searcher.iteration_log:
+            self.send(f"info depth {entry['depth']} score {sign * round(entry['value'])} "
+                      f"nodes {entry['nodes']} time {entry['seconds']:.3f}")
+        move = action_to_text(action, state.size) if action is not None else "none"
+        self.send(f"bestmove {move} score {sign * round(searcher.best_value)} depth {searcher.completed_depth} "
+                  f"nodes {searcher.nodes_explored - start_nodes} time {seconds:.3f}")
+
+    def set_option(self, args: List[str]) -> None:
+        if len(args) < 4 or args[0] != "name" or "value" not in args:
+            raise ValueError("setoption attendu : name <Nom> value <valeur>")
+        split = args.index("value")
+        name = " ".join(args[1:split]).lower()
+        value = " ".join(args[split + 1:])
+        if name == "mode":
+            if value not in SEARCH_MODES:
+                raise ValueError(f"mode de recherche inconnu : {value}")
+            self.options["search_mode"] = value
+            # la table de transposition garde des scores du point de vue des blancs (minmax) ou du camp
+            # au trait (negamax) : elle ne survit pas à un changement de mode, le searcher est reconstruit
+            if self.searcher is not None and self.searcher.search_mode != value:
+                self.searcher.close()
+                self.searcher = None
+        elif name == "hash":
+            self.options["tt_size_mb"] = float(value)
+            if self.searcher is not None:
+                self.searcher.tt_size_mb = self.options["tt_size_mb"]
+                self.searcher.transposition_table = TranspositionTable(self.options["tt_size_mb"]) \
+                    if self.options["tt_size_mb"] > 0 else None
+        elif name == "depth":
+            self.options["max_depth"] = int(value)
+        elif name in ("threads", "weights", "book", "tablebase"):
+            key = {"threads": "workers", "weights": "weights", "book": "book", "tablebase": "tablebase"}[name]
+            self.options[key] = int(value) if key == "workers" else value or None
+            # ces options sont lues à la construction du searcher
+            if self.searcher is not None:
+                self.searcher.close()
+                self.searcher = None
+        else:
+            raise ValueError(f"option inconnue : {name}")
+
+    def wait(self) -> None:
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.wait()
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Moteur breakthrough en ligne de commande (stdin/stdout)")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH, help="profondeur de go sans limite")
+    parser.add_argument("--mode", choices=SEARCH_MODES, default="negamax")
+    parser.add_argument("--hash", type=float, default=16, help="taille de la table de transposition en Mo")
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--weights")
+    parser.add_argument("--book")
+    parser.add_argument("--tablebase")
+    args = parser.parse_args(argv)
+
+    engine = EngineProtocol(max_depth=args.depth, search_mode=args.mode, tt_size_mb=args.hash,
+                            workers=args.threads, weights=args.weights, book=args.book, tablebase=args.tablebase)
+    for line in sys.stdin:
+        if not engine.handle(line):
+            break
+    else:
+        engine.stop()
+        if engine.searcher is not None:
+            engine.searcher.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
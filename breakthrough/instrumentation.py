@@ -0,0 +1,192 @@
+import json
+import time
+
+from .rules import board_to_string
+
+# ----- instrumentation optionnelle de la recherche -----
+# les méthodes de l'état et du searcher ne sont enveloppées, sur les instances, que pendant une
+# recherche instrumentée : sans instrumentation, le searcher n'exécute que les méthodes d'origine.
+# En mode parallèle, seuls la racine et le processus principal sont mesurés.
+
+# méthode enveloppée -> phase mesurée ; un appel fait depuis une autre méthode mesurée (has_winner dans
+# evaluate ou is_terminal...) reste compté dans la phase de l'appel extérieur : les phases ne se recouvrent pas
+STATE_PHASES = {
+    "generate_moves": "move_generation",
+    "get_actions": "move_generation",
+    "iter_actions": "move_generation",
+    "evaluate": "evaluation",
+    "is_terminal": "is_terminal",
+    "has_winner": "is_terminal",
+    "has_actions": "is_terminal",
+}
+GENERATOR_METHODS = ("iter_actions",)
+PHASES = ("move_generation", "evaluation", "is_terminal", "evaluate_action")
+
+class SearchInstrumentation:
+    def __init__(self, trace_path=None):
+        # trace_path : fichier JSONL auquel une ligne est ajoutée par coup cherché
+        self.trace_path = trace_path
+        self.searches = 0
+        self.last_report = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self.phase_calls = {phase: 0 for phase in PHASES}
+        self.phase_seconds = {phase: 0.0 for phase in PHASES}
+        self.nodes_by_depth = {}
+        self.children_by_depth = {}
+        self.cutoffs_by_index = {}
+        self.cutoffs = 0
+        self._wrapped = []
+        self._measuring = False
+
+    def _record_node(self, depth: int, children: int, cutoff_index) -> None:
+        self.nodes_by_depth[depth] = self.nodes_by_depth.get(depth, 0) + 1
+        self.children_by_depth[depth] = self.children_by_depth.get(depth, 0) + children
+        if cutoff_index is not None:
+            self.cutoffs += 1
+            self.cutoffs_by_index[cutoff_index] = self.cutoffs_by_index.get(cutoff_index, 0) + 1
+
+    def begin_search(self, searcher, state) -> None:
+        self._reset()
+        self._board = board_to_string(state.to_board())
+        self._player = state.current_player
+        self._start = time.perf_counter()
+        self._start_nodes = searcher.nodes_explored
+        table = searcher.transposition_table
+        self._start_table = (table.probes, table.hits, table.collisions) if table is not None else None
+        for name, phase in STATE_PHASES.items():
+            if hasattr(state, name):
+                self._wrap(state, name, phase)
+        self._wrap(searcher, "evaluate_move", "evaluate_action")
+        self._track_depth(state)
+        # générateur de coups des noeuds intérieurs
+        ordering = "_negamax_moves" if searcher.search_mode == "negamax" else "_ordered_moves"
+        self._track_children(searcher, ordering)
+
+    def end_search(self, searcher, state, action) -> None:
+        seconds = time.perf_counter() - self._start
+        for target, name in self._wrapped:
+            delattr(target, name)
+        self._wrapped = []
+        self.searches += 1
+
+        nodes = searcher.nodes_explored - self._start_nodes
+        report = {
+            "timestamp": time.time(),
+            "board": self._board,
+            "player": self._player,
+            "move": [action.src_row, action.src_col, action.dst_row, action.dst_col] if action else None,
+            "score": searcher.best_value,
+            "depth": searcher.completed_depth,
+            "nodes": nodes,
+            "seconds": seconds,
+            "nodes_per_second": nodes / seconds if seconds else 0.0,
+            "phases": {
+                phase: {"calls": self.phase_calls[phase], "seconds": self.phase_seconds[phase]}
+                for phase in PHASES
+            },
+            "cutoff_rate": self.cutoffs / sum(self.nodes_by_depth.values()) if self.nodes_by_depth else 0.0,
+            "cutoffs_by_move_index": {
+                index: count / self.cutoffs for index, count in sorted(self.cutoffs_by_index.items())
+            },
+            "branching_factor_by_depth": {
+                depth: self.children_by_depth[depth] / count for depth, count in sorted(self.nodes_by_depth.items())
+            },
+        }
+        table = searcher.transposition_table
+        if table is not None:
+            probes = table.probes - self._start_table[0]
+            hits = table.hits - self._start_table[1]
+            report["transposition_table"] = {
+                "probes": probes,
+                "hits": hits,
+                "collisions": table.collisions - self._start_table[2],
+                "hit_rate": hits / probes if probes else 0.0,
+            }
+        self.last_report = report
+        if self.trace_path is not None:
+            with open(self.trace_path, "a") as trace:
+                trace.write(json.dumps(report) + "\n")
+
+    # profondeur courante (en demi-coups depuis la racine) suivie par apply_move/undo_move,
+    # par lesquels passent aussi apply_action/undo_action
+    def _track_depth(self, state) -> None:
+        apply_move = state.apply_move
+        undo_move = state.undo_move
+        self._depth = 0
+
+        def tracked_apply(move):
+            self._depth += 1
+            return apply_move(move)
+
+        def tracked_undo():
+            self._depth -= 1
+            return undo_move()
+
+        state.apply_move = tracked_apply
+        state.undo_move = tracked_undo
+        self._wrapped.extend([(state, "apply_move"), (state, "undo_move")])
+
+    # compte les coups parcourus à chaque noeud : si la boucle du searcher s'arrête avant
+    # la fin du générateur (coupure), celui-ci est fermé et le dernier coup donné est la coupure
+    def _track_children(self, searcher, name) -> None:
+        method = getattr(searcher, name)
+
+        def wrapper(*args, **kwargs):
+            depth = self._depth
+            children = 0
+            finished = False
+            try:
+                for move in method(*args, **kwargs):
+                    children += 1
+                    yield move
+                finished = True
+            finally:
+                # noeud sans coup : position terminale, pas un noeud intérieur
+                if children:
+                    self._record_node(depth, children, None if finished else children - 1)
+
+        setattr(searcher, name, wrapper)
+        self._wrapped.append((searcher, name))
+
+    # remplace la méthode par une version chronométrée, sur l'instance uniquement
+    def _wrap(self, target, name, phase) -> None:
+        method = getattr(target, name)
+        calls = self.phase_calls
+        seconds = self.phase_seconds
+        perf_counter = time.perf_counter
+
+        if name in GENERATOR_METHODS:
+            def wrapper(*args, **kwargs):
+                if self._measuring:
+                    yield from method(*args, **kwargs)
+                    return
+                calls[phase] += 1
+                iterator = method(*args, **kwargs)
+                while True:
+                    self._measuring = True
+                    start = perf_counter()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        seconds[phase] += perf_counter() - start
+                        self._measuring = False
+                    yield item
+        else:
+            def wrapper(*args, **kwargs):
+                if self._measuring:
+                    return method(*args, **kwargs)
+                calls[phase] += 1
+                self._measuring = True
+                start = perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    seconds[phase] += perf_counter() - start
+                    self._measuring = False
+
+        setattr(target, name, wrapper)
+        self._wrapped.append((target, name))
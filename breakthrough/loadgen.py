@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from .bitboard import BitboardBreakthroughState
+from .engine import action_to_text
+from .rules import board_from_string
+from .server import DEFAULT_MAX_QUEUE, start_server, summarize_latencies
+
+# ----- générateur de charge pour le serveur de parties -----
+# chaque client joue des parties en boucle contre le serveur (coups humains tirés au hasard) et mesure
+# le temps de réponse de chaque coup de l'IA ; avec --workers, un serveur est démarré pour chaque nombre
+# de processus et le débit obtenu est comparé
+BUSY_RETRY = 0.05
+MAX_PLIES = 200
+
+async def _request(reader, writer, request: dict) -> dict:
+    writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+async def _client(host: str, port: int, deadline: float, options: dict, rng: random.Random, totals: dict) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            game = await _request(reader, writer, {"op": "new", "difficulty": options["difficulty"], "human": "W"})
+            plies = 0
+            while game.get("winner") is None and plies < MAX_PLIES and time.perf_counter() < deadline:
+                state = BitboardBreakthroughState(board_from_string(game["board"]), game["player"])
+                move = action_to_text(rng.choice(state.get_actions()), state.size)
+                request = {"op": "play", "game": game["game"], "move": move}
+                if options["time"] is not None:
+                    request["time"] = options["time"]
+                # une requête refusée (busy) ne change pas la partie : elle est renvoyée telle quelle
+                while True:
+                    start = time.perf_counter()
+                    response = await _request(reader, writer, request)
+                    if response.get("error") != "busy":
+                        break
+                    totals["busy"] += 1
+                    await asyncio.sleep(BUSY_RETRY)
+                if "error" in response:
+                    totals["errors"] += 1
+                    break
+                totals["latencies"].append(time.perf_counter() - start)
+                game = response
+                plies += 2
+            totals["games"] += 1
+            await _request(reader, writer, {"op": "close", "game": game["game"]})
+    finally:
+        writer.close()
+
+async def run_load(host: str, port: int, clients: int, duration: float, options: dict, seed: int = 0) -> dict:
+    totals = {"latencies": [], "busy": 0, "errors": 0, "games": 0}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(_client(host, port, deadline, options, random.Random(seed + index), totals)
+                           for index in range(clients)))
+    elapsed = time.perf_counter() - start
+    return {
+        "clients": clients,
+        "seconds": elapsed,
+        "requests": len(totals["latencies"]),
+        "throughput": len(totals["latencies"]) / elapsed,
+        "games": totals["games"],
+        "busy": totals["busy"],
+        "errors": totals["errors"],
+        "latency": summarize_latencies(totals["latencies"]),
+    }
+
+# un serveur local par nombre de processus, sur un port libre
+async def scaling(worker_counts, clients: int, duration: float, options: dict, max_queue: int) -> list:
+    results = []
+    for workers in worker_counts:
+        game_server, server = await start_server("127.0.0.1", 0, workers, max_queue)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            result = await run_load("127.0.0.1", port, clients, duration, options)
+        finally:
+            server.close()
+            await server.wait_closed()
+            game_server.scheduler.close()
+        result["workers"] = workers
+        result["server"] = game_server.scheduler.stats()
+        results.append(result)
+        print(f"{workers} processus : {result['throughput']:.1f} coups/s, "
+              f"latence p50 {result['latency']['p50'] * 1000:.0f} ms p99 {result['latency']['p99'] * 1000:.0f} ms, "
+              f"file max {result['server']['max_queue_depth']}, busy {result['busy']}", file=sys.stderr)
+    return results
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Générateur de charge pour breakthrough.server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="serveur déjà démarré (sinon un serveur local par --workers)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="nombres de processus comparés")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="durée de chaque mesure en secondes")
+    parser.add_argument("--difficulty", choices=("easy", "medium", "hard"), default="hard")
+    parser.add_argument("--time", type=float, default=0.1, help="budget de temps par coup de l'IA")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE)
+    parser.add_argument("--output", help="résultats au format JSON")
+    args = parser.parse_args(argv)
+
+    options = {"difficulty": args.difficulty, "time": args.time}
+    if args.port is not None:
+        results = [asyncio.run(run_load(args.host, args.port, args.clients, args.duration, options))]
+    else:
+        results = asyncio.run(scaling(args.workers, args.clients, args.duration, options, args.max_queue))
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text)
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
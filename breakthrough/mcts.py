@@ -0,0 +1,380 @@
+import math
+import random
+import time
+from array import array
+from typing import Optional
+
+from .bitboard import BitboardBreakthroughState
+from .rules import BOARD_SIZE
+from .state import (
+    MOVE_CAPTURE, MOVE_DST_SHIFT, MOVE_GOAL, MOVE_SQUARE_MASK, WIN_VALUE, BreakthroughAction, move_to_action,
+    new_move_buffer,
+)
+
+# ----- recherche arborescente Monte-Carlo (UCT) -----
+# chaque lot descend batch_size fois dans l'arbre (une visite est comptée dès la descente, ce qui écarte
+# les descentes suivantes du même chemin), puis évalue toutes les feuilles du lot en une fois :
+# parties aléatoires (rollout) ou évaluation statique (eval), vectorisées avec numpy quand il est installé
+# (plateau de taille BOARD_SIZE uniquement : les autres tailles sont évaluées une feuille à la fois)
+DEFAULT_EXPLORATION = 1.4
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_PLAYOUTS = 10000  # budget sans limite de temps ni de parties
+LEAF_EVALUATIONS = ("rollout", "eval")
+EVAL_SCALE = 0.003  # probabilité de gain des blancs = sigmoid(EVAL_SCALE * évaluation)
+MAX_WIN_RATE = 0.999  # borne du taux de gain converti en score
+NO_CHILD = -1
+
+# ----- arbre -----
+# un noeud par indice, colonnes dans des tableaux compacts ; les enfants d'un noeud sont contigus.
+# wins compte les gains du camp qui a joué le coup menant au noeud ; terminal : 1 ce camp a gagné
+# (l'adversaire n'a plus de coup), -1 il a perdu (l'adversaire atteint la dernière ligne au coup suivant)
+class _Tree:
+    def __init__(self):
+        self.parent = array("i", [NO_CHILD])
+        self.move = array("I", [0])
+        self.first_child = array("i", [NO_CHILD])
+        self.child_count = array("B", [0])
+        self.visits = array("L", [0])
+        self.wins = array("d", [0.0])
+        self.terminal = array("b", [0])
+
+    def __len__(self) -> int:
+        return len(self.move)
+
+    def add_children(self, node: int, moves) -> None:
+        count = len(moves)
+        self.first_child[node] = len(self.move)
+        self.child_count[node] = count
+        self.parent.extend([node] * count)
+        self.move.extend(moves)
+        self.first_child.extend([NO_CHILD] * count)
+        self.child_count.extend(bytes(count))
+        self.visits.extend([0] * count)
+        self.wins.extend([0.0] * count)
+        self.terminal.extend(bytes(count))
+
+    # coups de la racine : (coup, visites, gains)
+    def root_stats(self):
+        first = self.first_child[0]
+        if first == NO_CHILD:
+            return []
+        return [(self.move[child], self.visits[child], self.wins[child])
+                for child in range(first, first + self.child_count[0])]
+
+    # longueur de la variante des enfants les plus visités
+    def principal_depth(self) -> int:
+        node = 0
+        depth = 0
+        while self.first_child[node] != NO_CHILD:
+            first = self.first_child[node]
+            node = max(range(first, first + self.child_count[node]), key=self.visits.__getitem__)
+            if not self.visits[node]:
+                break
+            depth += 1
+        return depth
+
+# partie aléatoire jouée sur state puis annulée ; vainqueur "W" ou "B". Un coup gagnant est toujours joué
+# (generate_moves le place en premier), sinon une prise d'un pion adverse arrivé à un pas de la dernière
+# ligne s'il y en a, comme dans batch.random_playouts
+def _random_playout(state: BitboardBreakthroughState, rng: random.Random, buffer) -> str:
+    tables = state.tables
+    plies = 0
+    while True:
+        count = state.generate_moves(buffer)
+        if not count:
+            winner = "B" if state.current_player == "W" else "W"
+            break
+        if buffer[0] & MOVE_GOAL:
+            winner = state.current_player
+            break
+        threat_row = tables.goal_rows["B" if state.current_player == "W" else "W"]
+        # les prises sont générées juste après les coups gagnants
+        defenses = []
+        for index in range(count):
+            move = buffer[index]
+            if not move & MOVE_CAPTURE:
+                break
+            if tables.square_rows[(move >> MOVE_DST_SHIFT) & MOVE_SQUARE_MASK] == threat_row:
+                defenses.append(move)
+        move = rng.choice(defenses) if defenses else buffer[rng.randrange(count)]
+        state.apply_move(move)
+        plies += 1
+    for _ in range(plies):
+        state.undo_move()
+    return winner
+
+def _sigmoid(value: float) -> float:
+    if value < 0:
+        exponential = math.exp(value)
+        return exponential / (1 + exponential)
+    return 1 / (1 + math.exp(-value))
+
+# numpy est optionnel et long à importer : le module batch n'est chargé qu'à la création d'un searcher
+def _load_batch():
+    try:
+        from . import batch
+    except ImportError:  # numpy absent : les feuilles d'un lot sont évaluées une par une
+        return None
+    return batch
+
+# arbre complet d'un processus du pool (recherche parallèle à la racine) : statistiques des coups racine
+def _tree_task(task):
+    white, black, player, size, options, seed, time_limit, playout_limit = task
+    searcher = BreakthroughMCTSSearcher(seed=seed, **options)
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+    tree, playouts = searcher._grow_tree(white, black, player, size, deadline, playout_limit)
+    return tree.root_stats(), playouts, len(tree)
+
+class BreakthroughMCTSSearcher:
+    def __init__(self, time_limit: Optional[float] = None, playout_limit: Optional[int] = None,
+                 exploration: float = DEFAULT_EXPLORATION, batch_size: int = DEFAULT_BATCH_SIZE,
+                 leaf_evaluation: str = "rollout", workers: int = 1, seed: Optional[int] = None):
+        if leaf_evaluation not in LEAF_EVALUATIONS:
+            raise ValueError(f"évaluation des feuilles inconnue : {leaf_evaluation}")
+        self.time_limit = time_limit
+        self.playout_limit = playout_limit
+        self.exploration = exploration
+        self.batch_size = batch_size
+        self.leaf_evaluation = leaf_evaluation
+        # workers > 1 : un arbre indépendant par processus, statistiques des coups racine additionnées
+        self.workers = workers
+        self.seed = seed
+        self._pool = None
+        self._rng = random.Random(seed)
+        self._batch = _load_batch()
+        self._numpy_rng = self._batch.np.random.default_rng(seed) if self._batch is not None else None
+        # mêmes compteurs que BreakthroughMinMaxSearcher : nodes_explored compte les parties simulées
+        self.nodes_explored = 0
+        self.best_value = 0
+        self.completed_depth = 0
+        self.iteration_log = []
+        # parties, temps, parties par seconde et taille de l'arbre de la dernière recherche
+        self.search_stats = {}
+        self.stop_event = None
+        self.transposition_table = None
+        # états de travail : seules les occupations et le camp au trait servent aux coups ;
+        # recréés quand la taille du plateau change
+        self._scratch = BitboardBreakthroughState.from_bitboards(0, 0, "W")
+        self._playout_state = BitboardBreakthroughState.from_bitboards(0, 0, "W")
+        self._buffer = new_move_buffer()
+
+    def find_best_action(self, state, time_limit: Optional[float] = None,
+                         playout_limit: Optional[int] = None) -> Optional[BreakthroughAction]:
+        if time_limit is None:
+            time_limit = self.time_limit
+        if playout_limit is None:
+            playout_limit = self.playout_limit
+        if time_limit is None and playout_limit is None:
+            playout_limit = DEFAULT_PLAYOUTS
+        # les sorties anticipées ne laissent ni le score ni les statistiques de la recherche précédente
+        self.completed_depth = 0
+        self.iteration_log = []
+        self.search_stats = {}
+        if state.has_winner():
+            self.best_value = state.evaluate()
+            return None
+        player = state.current_player
+        sign = 1 if player == "W" else -1
+        buffer = self._buffer
+        count = state.generate_moves(buffer)
+        if not count:
+            self.best_value = -sign * WIN_VALUE
+            return None
+        size = state.size
+        if buffer[0] & MOVE_GOAL:
+            self.best_value = sign * WIN_VALUE
+            return move_to_action(buffer[0], size)
+        if count == 1:
+            # coup forcé, joué sans simulation : pas d'estimation
+            self.best_value = 0
+            return move_to_action(buffer[0], size)
+
+        white, black = state.bitboards()
+        start = time.perf_counter()
+        deadline = start + time_limit if time_limit is not None else None
+        if self.workers > 1:
+            stats, playouts, tree_nodes = self._search_parallel(white, black, player, size, time_limit,
+                                                                playout_limit)
+            depth = 1
+        else:
+            tree, playouts = self._grow_tree(white, black, player, size, deadline, playout_limit)
+            stats, tree_nodes, depth = tree.root_stats(), len(tree), tree.principal_depth()
+        seconds = time.perf_counter() - start
+        self.nodes_explored += playouts
+
+        # coup le plus visité ; son taux de gain, vu du camp au trait, est converti en score des blancs
+        move, visits, wins = max(stats, key=lambda entry: entry[1])
+        rate = min(MAX_WIN_RATE, max(1 - MAX_WIN_RATE, wins / visits if visits else 0.5))
+        self.best_value = sign * math.log(rate / (1 - rate)) / EVAL_SCALE
+        self.completed_depth = depth
+        self.search_stats = {
+            "playouts": playouts,
+            "seconds": seconds,
+            "playouts_per_second": playouts / seconds if seconds else 0.0,
+            "tree_nodes": tree_nodes,
+            "workers": self.workers,
+            "batch_size": self.batch_size,
+            "leaf_evaluation": self.leaf_evaluation,
+            "vectorized": self._batch is not None and size == BOARD_SIZE,
+            "win_rate": rate,
+        }
+        action = move_to_action(move, size)
+        self.iteration_log.append({
+            "depth": depth,
+            "nodes": playouts,
+            "seconds": seconds,
+            "move": (action.src_row, action.src_col, action.dst_row, action.dst_col),
+            "value": self.best_value,
+        })
+        return action
+
+    # ----- croissance de l'arbre -----
+    def _grow_tree(self, white: int, black: int, player: str, size: int, deadline: Optional[float],
+                   playout_limit: Optional[int]):
+        tree = _Tree()
+        if self._scratch.size != size:
+            self._scratch = BitboardBreakthroughState.from_bitboards(0, 0, "W", size)
+            self._playout_state = BitboardBreakthroughState.from_bitboards(0, 0, "W", size)
+        scratch = self._scratch
+        scratch.white, scratch.black, scratch.current_player = white, black, player
+        scratch._undo_stack.clear()
+        tree.visits[0] = 1
+        self._expand(tree, 0, scratch)
+        playouts = 0
+        while playout_limit is None or playouts < playout_limit:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if self.stop_event is not None and self.stop_event.is_set():
+                break
+            batch_size = self.batch_size if playout_limit is None else min(self.batch_size, playout_limit - playouts)
+            paths = []
+            rewards = []
+            leaves = []
+            for index in range(batch_size):
+                path, reward = self._descend(tree, scratch)
+                paths.append(path)
+                rewards.append(reward)
+                if reward is None:
+                    leaves.append((index, scratch.white, scratch.black, scratch.current_player))
+                for _ in range(len(path) - 1):
+                    scratch.undo_move()
+            if leaves:
+                for (index, _, _, _), reward in zip(leaves, self._evaluate_leaves(leaves)):
+                    rewards[index] = reward
+            wins = tree.wins
+            for path, reward in zip(paths, rewards):
+                # le gain du camp qui a joué un coup est la perte de celui qui a joué le précédent
+                for node in reversed(path):
+                    wins[node] += reward
+                    reward = 1.0 - reward
+            playouts += batch_size
+        return tree, playouts
+
+    # descente UCT depuis la racine ; s'arrête sur un noeud terminal (gain connu) ou sur une feuille
+    # jamais visitée, laissée jouée sur scratch pour l'évaluation (gain None)
+    def _descend(self, tree: _Tree, scratch: BitboardBreakthroughState):
+        node = 0
+        path = [0]
+        tree.visits[0] += 1
+        while True:
+            terminal = tree.terminal[node]
+            if terminal:
+                return path, 1.0 if terminal > 0 else 0.0
+            if tree.first_child[node] == NO_CHILD:
+                if tree.visits[node] == 1:
+                    return path, None
+                self._expand(tree, node, scratch)
+                continue
+            node = self._select_child(tree, node)
+            scratch.apply_move(tree.move[node])
+            tree.visits[node] += 1
+            path.append(node)
+
+    def _expand(self, tree: _Tree, node: int, scratch: BitboardBreakthroughState) -> None:
+        buffer = self._buffer
+        count = scratch.generate_moves(buffer)
+        if not count:
+            tree.terminal[node] = 1
+        elif buffer[0] & MOVE_GOAL:
+            tree.terminal[node] = -1
+        else:
+            # ordre aléatoire : les enfants jamais visités sont essayés dans cet ordre
+            moves = buffer[:count]
+            self._rng.shuffle(moves)
+            tree.add_children(node, moves)
+
+    def _select_child(self, tree: _Tree, node: int) -> int:
+        visits = tree.visits
+        wins = tree.wins
+        first = tree.first_child[node]
+        log_parent = math.log(visits[node])
+        exploration = self.exploration
+        best = first
+        best_score = -1.0
+        for child in range(first, first + tree.child_count[node]):
+            count = visits[child]
+            if not count:
+                return child
+            score = wins[child] / count + exploration * math.sqrt(log_parent / count)
+            if score > best_score:
+                best = child
+                best_score = score
+        return best
+
+    # gain (entre 0 et 1) du camp qui a joué le coup menant à chaque feuille (index, blancs, noirs, trait)
+    def _evaluate_leaves(self, leaves):
+        if self._batch is not None and self._playout_state.size == BOARD_SIZE:
+            batch = self._batch
+            np = batch.np
+            white = np.array([leaf[1] for leaf in leaves], dtype=np.uint64)
+            black = np.array([leaf[2] for leaf in leaves], dtype=np.uint64)
+            white_to_move = np.array([leaf[3] == "W" for leaf in leaves])
+            if self.leaf_evaluation == "rollout":
+                white_rates = (batch.random_playouts(white, black, white_to_move, self._numpy_rng) + 1) / 2
+            else:
+                white_rates = 1 / (1 + np.exp(-EVAL_SCALE * batch.evaluate_bitboards(white, black)))
+            white_rates = white_rates.tolist()
+        else:
+            state = self._playout_state
+            white_rates = []
+            for _, white, black, player in leaves:
+                state.white, state.black, state.current_player = white, black, player
+                if self.leaf_evaluation == "rollout":
+                    white_rates.append(1.0 if _random_playout(state, self._rng, self._buffer) == "W" else 0.0)
+                else:
+                    white_rates.append(_sigmoid(EVAL_SCALE * state.evaluate()))
+        # le camp qui vient de jouer est l'adversaire du camp au trait de la feuille
+        return [1.0 - rate if leaf[3] == "W" else rate for leaf, rate in zip(leaves, white_rates)]
+
+    # ----- parallélisme à la racine -----
+    def _get_pool(self):
+        if self._pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    # chaque processus développe son propre arbre avec tout le temps et une part des parties ;
+    # les visites et gains des coups racine sont additionnés
+    def _search_parallel(self, white: int, black: int, player: str, size: int, time_limit: Optional[float],
+                         playout_limit: Optional[int]):
+        options = {"exploration": self.exploration, "batch_size": self.batch_size,
+                   "leaf_evaluation": self.leaf_evaluation}
+        share = -(-playout_limit // self.workers) if playout_limit is not None else None
+        tasks = [(white, black, player, size, options, self._rng.getrandbits(32), time_limit, share)
+                 for _ in range(self.workers)]
+        merged = {}
+        playouts = 0
+        tree_nodes = 0
+        for stats, worker_playouts, worker_nodes in self._get_pool().map(_tree_task, tasks):
+            for move, visits, wins in stats:
+                entry = merged.setdefault(move, [0, 0.0])
+                entry[0] += visits
+                entry[1] += wins
+            playouts += worker_playouts
+            tree_nodes += worker_nodes
+        return [(move, visits, wins) for move, (visits, wins) in merged.items()], playouts, tree_nodes
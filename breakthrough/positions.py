@@ -0,0 +1,139 @@
+import mmap
+import os
+import struct
+from typing import Iterator, Optional, Tuple
+
+from .bitboard import BitboardBreakthroughState
+
+# ----- fichier binaire de positions -----
+# en-tête : signature, version, taille d'un enregistrement
+# enregistrement (24 octets, petit-boutiste) : occupation blanche et noire (plateau 8x8, bit row * 8 + col),
+# camp au trait (0 blanc, 1 noir), résultat de la partie (1 blanc gagne, -1 noir gagne, 0 nul ou inconnu),
+# deux octets de bourrage, score de la recherche du point de vue des blancs
+MAGIC = b"BTPS"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+RECORD = struct.Struct("<QQBbxxi")
+SIDES = ("W", "B")
+RESULTS = {"W": 1, "B": -1, None: 0}
+SCORE_LIMIT = (1 << 31) - 1
+NUMPY_DTYPE = [("white", "<u8"), ("black", "<u8"), ("side", "u1"), ("result", "i1"),
+               ("pad", "V2"), ("score", "<i4")]
+
+Record = Tuple[int, int, int, int, int]
+
+def _check_header(data: bytes, path: str) -> None:
+    magic, version, record_size = HEADER.unpack(data) if len(data) == HEADER.size else (None, None, None)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"fichier de positions invalide ou d'une autre version : {path}")
+
+def record_state(record: Record) -> BitboardBreakthroughState:
+    white, black, side, _, _ = record
+    return BitboardBreakthroughState.from_bitboards(white, black, SIDES[side])
+
+class PositionWriter:
+    # ajoute en fin de fichier ; les enregistrements sont écrits par paquets de buffer_records
+    def __init__(self, path: str, buffer_records: int = 4096):
+        self.path = path
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            self._file = open(path, "r+b")
+            try:
+                _check_header(self._file.read(HEADER.size), path)
+            except ValueError:
+                self._file.close()
+                raise
+            # un enregistrement incomplet (écriture interrompue) est coupé : sinon tous les suivants
+            # seraient décalés à la relecture
+            size = os.fstat(self._file.fileno()).st_size
+            self._file.truncate(HEADER.size + (size - HEADER.size) // RECORD.size * RECORD.size)
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self._buffer = bytearray()
+        self._buffer_bytes = buffer_records * RECORD.size
+        self.count = 0
+
+    def append(self, white: int, black: int, current_player: str, result: Optional[str] = None,
+               score: float = 0) -> None:
+        score = max(-SCORE_LIMIT, min(SCORE_LIMIT, round(score)))
+        self._buffer += RECORD.pack(white, black, SIDES.index(current_player), RESULTS[result], score)
+        self.count += 1
+        if len(self._buffer) >= self._buffer_bytes:
+            self.flush()
+
+    def append_state(self, state, result: Optional[str] = None, score: float = 0) -> None:
+        if not isinstance(state, BitboardBreakthroughState):
+            state = BitboardBreakthroughState(state.to_board(), state.current_player)
+        self.append(state.white, state.black, state.current_player, result, score)
+
+    def flush(self) -> None:
+        self._file.write(self._buffer)
+        self._buffer.clear()
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class PositionReader:
+    # projette le fichier en mémoire : seules les pages lues sont chargées ;
+    # un enregistrement est un tuple (white, black, side, result, score), voir RECORD
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER.size:
+            self._file.close()
+            raise ValueError(f"fichier de positions invalide ou d'une autre version : {path}")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        _check_header(self._map[:HEADER.size], path)
+        # un enregistrement incomplet en fin de fichier (écriture interrompue) est ignoré
+        self._count = (size - HEADER.size) // RECORD.size
+        self._view = memoryview(self._map)[HEADER.size:HEADER.size + self._count * RECORD.size]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Record:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("indice de position hors du fichier")
+        return RECORD.unpack_from(self._view, index * RECORD.size)
+
+    # décodage en C par struct.iter_unpack, un bloc de chunk_records à la fois
+    def __iter__(self) -> Iterator[Record]:
+        for chunk in self.chunks():
+            yield from RECORD.iter_unpack(chunk)
+
+    def chunks(self, chunk_records: int = 65536) -> Iterator[memoryview]:
+        step = chunk_records * RECORD.size
+        for start in range(0, len(self._view), step):
+            yield self._view[start:start + step]
+
+    # vue numpy sans copie (tableau structuré, champs de NUMPY_DTYPE) ; numpy est optionnel
+    def to_numpy(self):
+        import numpy
+
+        return numpy.frombuffer(self._view, dtype=numpy.dtype(NUMPY_DTYPE), count=self._count)
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._view.release()
+            self._map.close()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
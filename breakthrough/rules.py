@@ -0,0 +1,195 @@
+# ----- règles du jeu, sans dépendance à pygame -----
+# la taille du plateau est celle de la liste de lignes ; BOARD_SIZE est la taille par défaut (interface, fichiers)
+BOARD_SIZE = 8
+MIN_BOARD_SIZE = 5  # deux lignes de pions par camp et au moins une ligne vide entre eux
+MAX_BOARD_SIZE = 16  # les coups codés réservent 8 bits par case
+
+# ----- tables par taille de plateau -----
+# calculées une fois par taille (board_tables) et partagées par tous les états de cette taille :
+# la génération des coups et l'évaluation lisent ces tables au lieu de refaire les tests de bord.
+# Une case est repérée par square = row * size + col (bit square des occupations en bits)
+class BoardTables:
+    def __init__(self, size: int):
+        if not MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE:
+            raise ValueError(f"taille de plateau non prise en charge : {size}")
+        self.size = size
+        self.squares = size * size
+        self.square_rows = [square // size for square in range(self.squares)]
+        self.square_cols = [square % size for square in range(self.squares)]
+        self.directions = {"W": -1, "B": 1}
+        # ligne d'arrivée et ligne d'où un coup gagne
+        self.last_rows = {"W": 0, "B": size - 1}
+        self.goal_rows = {"W": 1, "B": size - 2}
+        # lignes dont les pions ont une ligne devant eux, dans l'ordre de lecture
+        self.source_rows = {"W": range(1, size), "B": range(size - 1)}
+        # colonnes diagonales voisines de chaque colonne (sans sortir du plateau)
+        self.diagonal_cols = [tuple(side for side in (col - 1, col + 1) if 0 <= side < size) for col in range(size)]
+
+        # par camp et par case : case devant (None sur la dernière ligne), cases en diagonale devant,
+        # cases des pions du même camp qui protègent la case (en diagonale derrière)
+        self.forward = {}
+        self.diagonals = {}
+        self.protectors = {}
+        self.advance = {}
+        self.almost_win = {}
+        for player, direction in self.directions.items():
+            forward, diagonals, protectors, advance, almost_win = [], [], [], [], []
+            for square in range(self.squares):
+                row, col = self.square_rows[square], self.square_cols[square]
+                ahead = row + direction
+                behind = row - direction
+                forward.append((ahead, col) if 0 <= ahead < size else None)
+                diagonals.append(tuple((ahead, side) for side in self.diagonal_cols[col]) if 0 <= ahead < size else ())
+                protectors.append(tuple((behind, side) for side in self.diagonal_cols[col])
+                                  if 0 <= behind < size else ())
+                advance.append(size - 1 - row if player == "W" else row)
+                almost_win.append(row == self.goal_rows[player])
+            self.forward[player] = forward
+            self.diagonals[player] = diagonals
+            self.protectors[player] = protectors
+            self.advance[player] = advance
+            self.almost_win[player] = almost_win
+        self.central = [2 <= col <= size - 3 for col in self.square_cols]
+        # case de gauche (paires de pions côte à côte), None sur la première colonne
+        self.left = [(row, col - 1) if col > 0 else None for row, col in zip(self.square_rows, self.square_cols)]
+        # cases dont l'évaluation dépend d'un coup, par coup (cache rempli à la demande)
+        self.affected = {}
+
+        # masques des occupations en bits
+        self.full_mask = (1 << self.squares) - 1
+        self.file_a = sum(1 << (row * size) for row in range(size))
+        self.file_h = self.file_a << (size - 1)
+        self.not_file_a = self.full_mask ^ self.file_a
+        self.not_file_h = self.full_mask ^ self.file_h
+        self.row_masks = [((1 << size) - 1) << (row * size) for row in range(size)]
+        self.central_mask = sum(1 << square for square in range(self.squares) if self.central[square])
+
+        # courses de pions imparables (voir runaway_race)
+        self.white_cones = [self._cone(square, range(self.square_rows[square])) for square in range(self.squares)]
+        self.black_cones = [self._cone(square, range(self.square_rows[square] + 1, size))
+                            for square in range(self.squares)]
+        self.white_files = [self._file(square, range(self.square_rows[square])) for square in range(self.squares)]
+        self.black_files = [self._file(square, range(self.square_rows[square] + 1, size))
+                            for square in range(self.squares)]
+
+    def _cone(self, square: int, rows) -> int:
+        row, col = self.square_rows[square], self.square_cols[square]
+        return sum(1 << (cone_row * self.size + cone_col) for cone_row in rows
+                   for cone_col in range(self.size) if abs(cone_col - col) <= abs(row - cone_row))
+
+    def _file(self, square: int, rows) -> int:
+        return sum(1 << (file_row * self.size + self.square_cols[square]) for file_row in rows)
+
+_TABLES = {}
+
+def board_tables(size: int = BOARD_SIZE) -> BoardTables:
+    tables = _TABLES.get(size)
+    if tables is None:
+        tables = _TABLES[size] = BoardTables(size)
+    return tables
+
+def init_board(size: int = BOARD_SIZE):
+    board_tables(size)
+    board = [[None for _ in range(size)] for _ in range(size)]
+    for row in range(2):
+        for col in range(size):
+            board[row][col] = "B"
+    for row in range(size-2, size):
+        for col in range(size):
+            board[row][col] = "W"
+    return board
+
+def get_valid_moves(board, row, col):
+    moves = []
+    piece = board[row][col]
+    if piece is None:
+        return moves
+
+    tables = board_tables(len(board))
+    square = row * tables.size + col
+    ahead = tables.forward[piece][square]
+    if ahead is not None:
+        if board[ahead[0]][ahead[1]] is None:
+            moves.append(ahead)
+        for new_row, new_col in tables.diagonals[piece][square]:
+            if board[new_row][new_col] != piece:
+                moves.append((new_row, new_col))
+    return moves
+
+def check_win(board):
+    last = len(board) - 1
+    for col in range(len(board)):
+        if board[0][col] == "W":
+            return "W"
+        if board[last][col] == "B":
+            return "B"
+    return None
+
+def has_moves(board, player):
+    for row in range(len(board)):
+        for col in range(len(board)):
+            if board[row][col] == player:
+                if get_valid_moves(board, row, col):
+                    return True
+    return False
+
+# représentation texte d'un plateau : lignes de haut en bas séparées par "/", "W", "B" ou "." par case ;
+# la taille est le nombre de lignes
+def board_to_string(board):
+    return "/".join("".join(piece or "." for piece in row) for row in board)
+
+def board_from_string(text):
+    rows = text.strip().split("/")
+    size = len(rows)
+    if not MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE or any(len(row) != size for row in rows):
+        raise ValueError(f"plateau invalide : {text!r}")
+    board = []
+    for row in rows:
+        if any(char not in "WB." for char in row):
+            raise ValueError(f"plateau invalide : {text!r}")
+        board.append([None if char == "." else char for char in row])
+    return board
+
+# ----- courses de pions imparables -----
+# sur les occupations en bits (bit row * size + col) : un pion blanc en (row, col) est imparable si
+# aucun pion noir ne se trouve dans le cône devant lui (les seuls qui puissent encore le prendre ou lui
+# barrer la route) et si sa colonne est libre de pions blancs devant lui ; il arrive alors en row coups
+def _distance(bits, rows, row_masks):
+    # coups nécessaires au pion le plus avancé, en ignorant les obstacles
+    for distance, row in enumerate(rows, 1):
+        if bits & row_masks[row]:
+            return distance
+    return len(row_masks)
+
+def _runaway_distance(own, opponent, rows, row_masks, cones, files, limit):
+    for distance, row in enumerate(rows, 1):
+        if distance > limit:
+            break
+        pawns = own & row_masks[row]
+        while pawns:
+            low = pawns & -pawns
+            sq = low.bit_length() - 1
+            if not opponent & cones[sq] and not own & files[sq]:
+                return distance
+            pawns ^= low
+    return None
+
+# vainqueur d'une course imparable et nombre de demi-coups jusqu'à la victoire, ou None ;
+# le camp ayant un pion imparable gagne s'il arrive avant le pion adverse le plus avancé
+def runaway_race(white: int, black: int, player: str, size: int = BOARD_SIZE):
+    tables = board_tables(size)
+    row_masks = tables.row_masks
+    white_rows = range(1, size)
+    black_rows = range(size - 2, -1, -1)
+    white_distance = _distance(white, white_rows, row_masks)
+    black_distance = _distance(black, black_rows, row_masks)
+    white_to_move = player == "W"
+    runaway = _runaway_distance(white, black, white_rows, row_masks, tables.white_cones, tables.white_files,
+                                black_distance if white_to_move else black_distance - 1)
+    if runaway is not None:
+        return "W", 2 * runaway - 1 if white_to_move else 2 * runaway
+    runaway = _runaway_distance(black, white, black_rows, row_masks, tables.black_cones, tables.black_files,
+                                white_distance - 1 if white_to_move else white_distance)
+    if runaway is not None:
+        return "B", 2 * runaway if white_to_move else 2 * runaway - 1
+    return None
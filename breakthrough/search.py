@@ -0,0 +1,722 @@
+import math
+import os
+import time
+from array import array
+from typing import List, Optional, Tuple
+
+from .bitboard import BitboardBreakthroughState
+from .state import (
+    MOVE_CAPTURE, MOVE_TACTICAL, WIN_VALUE, BreakthroughAction, BreakthroughState, action_to_move,
+    move_to_action, new_move_buffer,
+)
+from .weights import resolve_weights
+
+# budgets de recherche par niveau : temps en secondes et/ou nombre de noeuds
+MAX_SEARCH_DEPTH = 32
+DIFFICULTY_BUDGETS = {
+    "easy": {"time_limit": 0.25, "node_limit": 300},
+    "medium": {"time_limit": 1.0, "node_limit": 5000},
+    "hard": {"time_limit": 3.0, "node_limit": None},
+}
+
+# ----- table de transposition -----
+TT_EXACT = 0
+TT_LOWER = 1
+TT_UPPER = 2
+TT_ENTRY_BYTES = 96  # estimation de la place d'une entrée (emplacements des listes + entiers python)
+
+def action_key(action: BreakthroughAction) -> Tuple[int, int, int, int]:
+    return (action.src_row, action.src_col, action.dst_row, action.dst_col)
+
+class TranspositionTable:
+    def __init__(self, size_mb: float = 16):
+        entries = max(1, int(size_mb * 1024 * 1024) // TT_ENTRY_BYTES)
+        self.size = 1 << (entries.bit_length() - 1)
+        self.mask = self.size - 1
+        self.keys = [None] * self.size
+        self.depths = [0] * self.size
+        self.values = [0] * self.size
+        self.flags = [TT_EXACT] * self.size
+        # coups codés en entiers (voir state), 0 pour l'absence de coup
+        self.moves = array("I", bytes(4 * self.size))
+        self.ages = [0] * self.size
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def new_search(self) -> None:
+        # les entrées des recherches précédentes restent utilisables mais deviennent remplaçables
+        self.generation += 1
+
+    def probe(self, key: int):
+        self.probes += 1
+        index = key & self.mask
+        stored = self.keys[index]
+        if stored == key:
+            self.hits += 1
+            return self.depths[index], self.values[index], self.flags[index], self.moves[index] or None
+        if stored is not None:
+            self.collisions += 1
+        return None
+
+    # remplacement en préférant la profondeur : une entrée de la recherche en cours
+    # n'est écrasée que par un résultat au moins aussi profond
+    def store(self, key: int, depth: int, value: float, flag: int, move) -> None:
+        index = key & self.mask
+        if self.keys[index] is not None and self.ages[index] == self.generation and self.depths[index] > depth:
+            return
+        self.keys[index] = key
+        self.depths[index] = depth
+        self.values[index] = value
+        self.flags[index] = flag
+        self.moves[index] = move or 0
+        self.ages[index] = self.generation
+        self.stores += 1
+
+    def clear(self) -> None:
+        self.keys = [None] * self.size
+        self.moves = array("I", bytes(4 * self.size))
+        self.probes = self.hits = self.collisions = self.stores = 0
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "probes": self.probes,
+            "hits": self.hits,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+        }
+
+class SearchTimeout(Exception):
+    pass
+
+# modes de recherche : "minmax" (min_value/max_value) ou "negamax" (PVS + fenêtres d'aspiration)
+SEARCH_MODES = ("minmax", "negamax")
+ASPIRATION_WINDOW = 50
+KILLER_SLOTS = 2
+# historique des coups calmes, indexé par le coup codé (sans indicateurs), une table par camp
+HISTORY_SIZE = MOVE_CAPTURE
+# en dessous de cette profondeur, l'envoi des coups aux processus coûte plus que la recherche
+PARALLEL_MIN_DEPTH = 3
+# au-delà, un pion sans adversaire devant lui est trop rare pour payer la recherche de course
+RUNAWAY_MAX_PAWNS = 16
+
+class BreakthroughMinMaxSearcher:
+    def __init__(self, max_depth: int = 3, tt_size_mb: float = 16,
+                 time_limit: Optional[float] = None, node_limit: Optional[int] = None,
+                 search_mode: str = "minmax", workers: int = 1, instrumentation=None, weights=None,
+                 book=None, tablebase=None, runaway_detection: bool = True):
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"mode de recherche inconnu : {search_mode}")
+        self.search_mode = search_mode
+        self.tt_size_mb = tt_size_mb
+        # workers > 1 : les coups racine sont répartis sur un pool de processus
+        self.workers = workers
+        self.parallel_stats = {}
+        self._pool = None
+        self._shared_alpha = None
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.nodes_explored = 0
+        self.max_depth_reached = 0
+        # tt_size_mb = 0 désactive la table de transposition
+        self.transposition_table = TranspositionTable(tt_size_mb) if tt_size_mb > 0 else None
+        self.search_depth = max_depth
+        self.completed_depth = 0
+        self.best_value = 0
+        # une entrée par itération terminée : profondeur, noeuds et temps cumulés, coup, score
+        self.iteration_log = []
+        self._deadline = None
+        self._node_budget = None
+        self._killers = []
+        self._history = ([0] * HISTORY_SIZE, [0] * HISTORY_SIZE)
+        # un tampon de coups préalloué par demi-coup : la recherche ne crée pas d'objet par coup
+        self._move_buffers = []
+        # événement optionnel permettant d'interrompre la recherche depuis un autre thread
+        self.stop_event = None
+        # SearchInstrumentation optionnelle, branchée uniquement autour de find_best_action
+        self.instrumentation = instrumentation
+        # poids de l'évaluation : fichier, dict, ou fichier désigné par BREAKTHROUGH_WEIGHTS ;
+        # None garde les poids de l'état cherché (ceux du processus par défaut)
+        self.weights = resolve_weights(weights)
+        # bibliothèque d'ouvertures : fichier, OpeningBook, ou fichier désigné par BREAKTHROUGH_BOOK
+        # (importé ici : book est aussi lancé comme programme pour construire la bibliothèque)
+        from .book import open_book
+        from .endgame import open_tablebase
+        self.book = open_book(book)
+        # tables de finales (fichier, Tablebase, ou BREAKTHROUGH_TABLEBASE) et détection des pions imparables,
+        # consultées à la racine et aux noeuds intérieurs
+        self.tablebase = open_tablebase(tablebase)
+        self.runaway_detection = runaway_detection
+
+    # les poids sont portés par l'état : deux searchers (ou deux parties) d'un même processus
+    # gardent chacun les leurs
+    def _use_weights(self, state: BreakthroughState) -> None:
+        if self.weights is not None:
+            state.use_weights(self.weights)
+
+    def _reserve_move_buffers(self, depth: int) -> None:
+        while len(self._move_buffers) <= depth:
+            self._move_buffers.append(new_move_buffer())
+
+    # approfondissement itératif : profondeur 1, 2, 3... jusqu'à max_depth ou épuisement du budget,
+    # le meilleur coup de chaque itération est essayé en premier à la suivante
+    def find_best_action(self, state: BreakthroughState, time_limit: Optional[float] = None,
+                         node_limit: Optional[int] = None) -> Optional[BreakthroughAction]:
+        if self.instrumentation is None:
+            return self._find_best_action(state, time_limit, node_limit)
+        self.instrumentation.begin_search(self, state)
+        action = None
+        try:
+            action = self._find_best_action(state, time_limit, node_limit)
+        finally:
+            self.instrumentation.end_search(self, state, action)
+        return action
+
+    def _find_best_action(self, state: BreakthroughState, time_limit: Optional[float],
+                          node_limit: Optional[int]) -> Optional[BreakthroughAction]:
+        self._use_weights(state)
+        if time_limit is None:
+            time_limit = self.time_limit
+        if node_limit is None:
+            node_limit = self.node_limit
+        # les sorties anticipées ne laissent pas le score de la recherche précédente
+        self.completed_depth = 0
+        self.iteration_log = []
+        sign = 1 if state.current_player == "W" else -1
+        if state.has_winner():
+            self.best_value = state.evaluate()
+            return None
+        if self.book is not None:
+            entry = self.book.probe(state)
+            if entry is not None:
+                action, self.best_value = entry
+                return action
+        if self.tablebase is not None:
+            entry = self.tablebase.best_action(state)
+            if entry is not None:
+                action, self.best_value = entry
+                return action
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+
+        # une seule génération à la racine ; les coups gagnants sortent en premier
+        self._reserve_move_buffers(self.max_depth)
+        buffer = self._move_buffers[0]
+        moves = list(buffer[:state.generate_moves(buffer)])
+        if not moves:
+            # aucun coup : le camp au trait a perdu
+            self.best_value = -sign * WIN_VALUE
+            return None
+        for move in moves:
+            state.apply_move(move)
+            terminal = state.is_terminal()
+            state.undo_move()
+            if terminal:
+                self.best_value = sign * WIN_VALUE
+                return move_to_action(move, state.size)
+
+        if self.search_mode == "negamax":
+            # l'ordre vient des itérations précédentes, de la table et de l'historique
+            self._killers = [[None] * KILLER_SLOTS for _ in range(self.max_depth + 1)]
+            self._history = ([0] * HISTORY_SIZE, [0] * HISTORY_SIZE)
+        else:
+            moves.sort(key=lambda move: self.evaluate_move(state, move), reverse=True)
+
+        self._deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self._node_budget = self.nodes_explored + node_limit if node_limit is not None else None
+        if self.workers > 1:
+            self.parallel_stats = {"workers": self.workers, "nodes_per_worker": {}, "busy_time": 0.0}
+        start = time.perf_counter()
+        start_nodes = self.nodes_explored
+        best_move = None
+        try:
+            for depth in range(1, self.max_depth + 1):
+                try:
+                    if self.workers > 1 and depth >= PARALLEL_MIN_DEPTH:
+                        move, value = self._search_root_parallel(state, moves, depth)
+                    elif self.search_mode == "negamax":
+                        move, value = self._search_root_negamax(state, moves, depth)
+                    else:
+                        move, value = self._search_root(state, moves, depth)
+                except SearchTimeout:
+                    break
+                best_move = move
+                self.best_value = value
+                self.completed_depth = depth
+                self.iteration_log.append({
+                    "depth": depth,
+                    "nodes": self.nodes_explored - start_nodes,
+                    "seconds": time.perf_counter() - start,
+                    "move": action_key(move_to_action(move, state.size)),
+                    "value": value,
+                })
+                moves.remove(move)
+                moves.insert(0, move)
+                if abs(value) >= WIN_VALUE:
+                    break
+        finally:
+            self._deadline = None
+            self._node_budget = None
+        if self.workers > 1:
+            wall_time = time.perf_counter() - start
+            self.parallel_stats["wall_time"] = wall_time
+            # temps de calcul cumulé des workers / temps réel : gain estimé par rapport au séquentiel
+            self.parallel_stats["estimated_speedup"] = self.parallel_stats["busy_time"] / wall_time if wall_time else 0.0
+        # budget épuisé avant la fin de la première itération : meilleur coup selon l'ordonnancement
+        if best_move is None:
+            best_move = moves[0]
+        return move_to_action(best_move, state.size)
+
+    # coups racine codés en entiers ; renvoient le meilleur coup codé et son score
+    def _search_root(self, state: BreakthroughState, moves: List[int], depth: int):
+        self.search_depth = depth
+        best_move = None
+        if state.current_player == "W":
+            best_value = -math.inf
+        else:
+            best_value = math.inf
+        alpha = -math.inf
+        beta = math.inf
+
+        for move in moves:
+            state.apply_move(move)
+            try:
+                if state.current_player == "B":
+                    value = self.min_value(state, 1, alpha, beta)
+                else:
+                    value = self.max_value(state, 1, alpha, beta)
+            finally:
+                state.undo_move()
+            if state.current_player == "W":
+                if value > best_value:
+                    best_value = value
+                    best_move = move
+                alpha = max(alpha, value)
+            else:
+                if value < best_value:
+                    best_value = value
+                    best_move = move
+                beta = min(beta, value)
+        return best_move, best_value
+
+    # ----- recherche parallèle -----
+    # découpage à la racine : le premier coup fixe alpha, les autres sont répartis sur le pool
+    # et partagent le meilleur score connu via une valeur en mémoire partagée
+    def _get_pool(self):
+        if self._pool is None:
+            # importés ici pour garder l'import du moteur rapide quand le mode parallèle n'est pas utilisé
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            self._shared_alpha = multiprocessing.Value("d", -math.inf)
+            config = {"max_depth": self.max_depth, "tt_size_mb": self.tt_size_mb, "search_mode": self.search_mode,
+                      "weights": self.weights, "runaway_detection": self.runaway_detection,
+                      "tablebase": self.tablebase.path if self.tablebase is not None else None}
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_search_worker,
+                                             initargs=(config, self._shared_alpha))
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            self._shared_alpha = None
+
+    def _search_root_parallel(self, state: BreakthroughState, moves: List[int], depth: int):
+        pool = self._get_pool()
+        board = state.to_board()
+        player = state.current_player
+        sign = 1 if player == "W" else -1
+        deadline = None
+        if self._deadline is not None:
+            time_left = self._deadline - time.perf_counter()
+            if time_left <= 0:
+                raise SearchTimeout()
+            # horloge murale : comparable d'un processus à l'autre
+            deadline = time.time() + time_left
+        node_limit = None
+        if self._node_budget is not None:
+            remaining_nodes = self._node_budget - self.nodes_explored
+            if remaining_nodes <= 0:
+                raise SearchTimeout()
+            node_limit = max(1, remaining_nodes // self.workers)
+        with self._shared_alpha.get_lock():
+            self._shared_alpha.value = -math.inf
+
+        def submit(move, alpha):
+            return pool.submit(_search_worker_task, board, player, move, depth, alpha, deadline, node_limit)
+
+        values = [self._collect_worker_result(submit(moves[0], -math.inf).result())]
+        futures = [submit(move, values[0]) for move in moves[1:]]
+        values.extend(self._collect_worker_result(future.result()) for future in futures)
+
+        best_index = 0
+        for index, value in enumerate(values):
+            if value > values[best_index]:
+                best_index = index
+        return moves[best_index], sign * values[best_index]
+
+    def _collect_worker_result(self, result) -> float:
+        value, nodes, pid, elapsed = result
+        self.nodes_explored += nodes
+        nodes_per_worker = self.parallel_stats["nodes_per_worker"]
+        nodes_per_worker[pid] = nodes_per_worker.get(pid, 0) + nodes
+        self.parallel_stats["busy_time"] += elapsed
+        if value is None:
+            raise SearchTimeout()
+        return value
+
+    # valeur d'un coup racine du point de vue du joueur qui le joue, avec la borne basse alpha ;
+    # None si le budget est épuisé avant la fin
+    def search_root_move(self, state: BreakthroughState, action: BreakthroughAction, depth: int,
+                         alpha: float, time_limit: Optional[float] = None,
+                         node_limit: Optional[int] = None) -> Optional[float]:
+        self._use_weights(state)
+        self.search_depth = depth
+        if len(self._killers) <= depth:
+            self._killers = [[None] * KILLER_SLOTS for _ in range(depth + 1)]
+        self._reserve_move_buffers(depth)
+        self._deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self._node_budget = self.nodes_explored + node_limit if node_limit is not None else None
+        state.apply_move(action_to_move(action, state.size))
+        try:
+            if self.search_mode == "negamax":
+                return -self.negamax(state, depth - 1, -math.inf, -alpha, 1)
+            if state.current_player == "B":
+                return self.min_value(state, 1, alpha, math.inf)
+            return -self.max_value(state, 1, -math.inf, -alpha)
+        except SearchTimeout:
+            return None
+        finally:
+            state.undo_move()
+            self._deadline = None
+            self._node_budget = None
+
+    # fenêtre d'aspiration autour du score de l'itération précédente, élargie tant que
+    # la recherche sort de la fenêtre ; les scores renvoyés restent du point de vue de blanc
+    def _search_root_negamax(self, state: BreakthroughState, moves: List[int], depth: int):
+        self.search_depth = depth
+        sign = 1 if state.current_player == "W" else -1
+        if depth == 1 or self.completed_depth == 0:
+            move, value = self._negamax_root(state, moves, depth, -math.inf, math.inf)
+            return move, sign * value
+
+        previous = sign * self.best_value
+        delta = ASPIRATION_WINDOW
+        alpha, beta = previous - delta, previous + delta
+        while True:
+            move, value = self._negamax_root(state, moves, depth, alpha, beta)
+            if alpha < value < beta:
+                return move, sign * value
+            # élargie avant de recalculer la borne : sinon la même fenêtre serait cherchée deux fois
+            delta *= 4
+            if value <= alpha:
+                alpha = previous - delta if delta < WIN_VALUE else -math.inf
+            else:
+                beta = previous + delta if delta < WIN_VALUE else math.inf
+
+    def _negamax_root(self, state: BreakthroughState, moves: List[int], depth: int, alpha: float, beta: float):
+        best_move = None
+        best_value = -math.inf
+        for index, move in enumerate(moves):
+            state.apply_move(move)
+            try:
+                if index == 0:
+                    value = -self.negamax(state, depth - 1, -beta, -alpha, 1)
+                else:
+                    value = -self.negamax(state, depth - 1, -alpha - 1, -alpha, 1)
+                    if alpha < value < beta:
+                        value = -self.negamax(state, depth - 1, -beta, -alpha, 1)
+            finally:
+                state.undo_move()
+            if value > best_value:
+                best_value = value
+                best_move = move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+        return best_move, best_value
+
+    # negamax : la valeur est toujours du point de vue du joueur qui a le trait,
+    # seul le premier coup est cherché avec la fenêtre complète (PVS)
+    def negamax(self, state: BreakthroughState, depth: int, alpha: float, beta: float, ply: int) -> float:
+        self.nodes_explored += 1
+        self._check_budget()
+        self.max_depth_reached = max(self.max_depth_reached, ply)
+        sign = 1 if state.current_player == "W" else -1
+        if depth <= 0 or state.has_winner():
+            return sign * state.evaluate()
+        tt_value, tt_move = self._probe_table(state, depth, alpha, beta)
+        if tt_value is not None:
+            return tt_value
+        endgame_value = self._endgame_value(state, ply)
+        if endgame_value is not None:
+            return sign * endgame_value
+        alpha_orig = alpha
+        best_value = -math.inf
+        best_move = None
+        for move in self._negamax_moves(state, tt_move, ply):
+            state.apply_move(move)
+            try:
+                if best_move is None:
+                    value = -self.negamax(state, depth - 1, -beta, -alpha, ply + 1)
+                else:
+                    value = -self.negamax(state, depth - 1, -alpha - 1, -alpha, ply + 1)
+                    if alpha < value < beta:
+                        value = -self.negamax(state, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                state.undo_move()
+            if value > best_value:
+                best_value = value
+                best_move = move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                if not move & MOVE_TACTICAL:
+                    self._record_cutoff(state, move, depth, ply)
+                break
+        if best_move is None:
+            # aucun coup possible : position terminale
+            return sign * state.evaluate()
+        self._store_table(state, depth, best_value, alpha_orig, beta, best_move)
+        return best_value
+
+    # coups calmes ayant provoqué une coupure : coups tueurs de la profondeur et historique
+    def _record_cutoff(self, state: BreakthroughState, move: int, depth: int, ply: int) -> None:
+        killers = self._killers[ply]
+        if killers[0] != move:
+            killers.insert(0, move)
+            killers.pop()
+        self._history[0 if state.current_player == "W" else 1][move] += depth * depth
+
+    # coup de la table, puis coups gagnants et prises dans l'ordre du générateur,
+    # puis coups calmes triés (coups tueurs d'abord, ensuite historique)
+    def _negamax_moves(self, state: BreakthroughState, tt_move: Optional[int], ply: int):
+        if tt_move is not None:
+            if state.is_legal_move(tt_move):
+                yield tt_move
+            else:
+                tt_move = None
+        buffer = self._move_buffers[ply]
+        count = state.generate_moves(buffer)
+        history = self._history[0 if state.current_player == "W" else 1]
+        quiet_start = count
+        for index in range(count):
+            move = buffer[index]
+            if not move & MOVE_TACTICAL:
+                quiet_start = index
+                break
+            if move != tt_move:
+                yield move
+        if quiet_start == count:
+            return
+        quiet_moves = buffer[quiet_start:count]
+        killers = self._killers[ply]
+        for killer in killers:
+            if killer is not None and killer != tt_move and killer in quiet_moves:
+                yield killer
+        # tri stable : à historique égal, l'ordre du générateur est conservé
+        for move in sorted(quiet_moves, key=history.__getitem__, reverse=True):
+            if move != tt_move and move not in killers:
+                yield move
+
+    # valeur exacte d'une finale (table) ou d'une course gagnée d'avance, du point de vue des blancs ;
+    # les gains les plus rapides depuis la racine (ply demi-coups plus haut) valent le plus
+    def _endgame_value(self, state: BreakthroughState, ply: int) -> Optional[float]:
+        if self.tablebase is not None:
+            distance = self.tablebase.distance(state)
+            if distance is not None:
+                winner = state.current_player if distance > 0 else ("B" if state.current_player == "W" else "W")
+                plies = abs(distance) + ply
+                return WIN_VALUE - plies if winner == "W" else plies - WIN_VALUE
+        if self.runaway_detection and state.pawn_count() <= RUNAWAY_MAX_PAWNS:
+            race = state.runaway()
+            if race is not None:
+                winner, plies = race
+                return WIN_VALUE - plies - ply if winner == "W" else plies + ply - WIN_VALUE
+        return None
+
+    def _check_budget(self) -> None:
+        if self._node_budget is not None and self.nodes_explored >= self._node_budget:
+            raise SearchTimeout()
+        # l'horloge et la demande d'arrêt ne sont consultées que tous les 256 noeuds
+        if not self.nodes_explored & 255:
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                raise SearchTimeout()
+            if self.stop_event is not None and self.stop_event.is_set():
+                raise SearchTimeout()
+
+    def evaluate_action(self, state: BreakthroughState, action: BreakthroughAction) -> float:
+        return self.evaluate_move(state, action_to_move(action, state.size))
+
+    def evaluate_move(self, state: BreakthroughState, move: int) -> float:
+        state.apply_move(move)
+        value = state.evaluate()
+        state.undo_move()
+        return value
+
+    # renvoie la valeur stockée si elle suffit à conclure pour cette fenêtre, sinon None,
+    # ainsi que le meilleur coup connu pour l'ordonnancement
+    def _probe_table(self, state: BreakthroughState, remaining: int, alpha: float, beta: float):
+        if self.transposition_table is None:
+            return None, None
+        entry = self.transposition_table.probe(state.hash)
+        if entry is None:
+            return None, None
+        tt_depth, tt_value, tt_flag, tt_move = entry
+        if tt_depth >= remaining:
+            if tt_flag == TT_EXACT:
+                return tt_value, tt_move
+            if tt_flag == TT_LOWER and tt_value >= beta:
+                return tt_value, tt_move
+            if tt_flag == TT_UPPER and tt_value <= alpha:
+                return tt_value, tt_move
+        return None, tt_move
+
+    def _store_table(self, state: BreakthroughState, remaining: int, value: float,
+                     alpha: float, beta: float, best_move: Optional[int]) -> None:
+        if self.transposition_table is None:
+            return
+        if value <= alpha:
+            flag = TT_UPPER
+        elif value >= beta:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        self.transposition_table.store(state.hash, remaining, value, flag, best_move)
+
+    # le coup de la table est essayé avant de générer les autres
+    def _ordered_moves(self, state: BreakthroughState, tt_move: Optional[int], ply: int):
+        if tt_move is not None:
+            if state.is_legal_move(tt_move):
+                yield tt_move
+            else:
+                tt_move = None
+        buffer = self._move_buffers[ply]
+        for index in range(state.generate_moves(buffer)):
+            move = buffer[index]
+            if move != tt_move:
+                yield move
+
+    def min_value(self, state: BreakthroughState, depth: int, alpha: float, beta: float) -> float:
+        self.nodes_explored += 1
+        self._check_budget()
+        self.max_depth_reached = max(self.max_depth_reached, depth)
+        if depth >= self.search_depth or state.has_winner():
+            return state.evaluate()
+        remaining = self.search_depth - depth
+        tt_value, tt_move = self._probe_table(state, remaining, alpha, beta)
+        if tt_value is not None:
+            return tt_value
+        endgame_value = self._endgame_value(state, depth)
+        if endgame_value is not None:
+            return endgame_value
+        alpha_orig, beta_orig = alpha, beta
+        value = math.inf
+        best_move = None
+        for move in self._ordered_moves(state, tt_move, depth):
+            state.apply_move(move)
+            try:
+                child_value = self.max_value(state, depth + 1, alpha, beta)
+            finally:
+                state.undo_move()
+            if child_value < value:
+                value = child_value
+                best_move = move
+            beta = min(beta, value)
+            if beta <= alpha:
+                break
+        if best_move is None:
+            # aucun coup possible : position terminale
+            return state.evaluate()
+        self._store_table(state, remaining, value, alpha_orig, beta_orig, best_move)
+        return value
+
+    def max_value(self, state: BreakthroughState, depth: int, alpha: float, beta: float) -> float:
+        self.nodes_explored += 1
+        self._check_budget()
+        self.max_depth_reached = max(self.max_depth_reached, depth)
+        if depth >= self.search_depth or state.has_winner():
+            return state.evaluate()
+        remaining = self.search_depth - depth
+        tt_value, tt_move = self._probe_table(state, remaining, alpha, beta)
+        if tt_value is not None:
+            return tt_value
+        endgame_value = self._endgame_value(state, depth)
+        if endgame_value is not None:
+            return endgame_value
+        alpha_orig, beta_orig = alpha, beta
+        value = -math.inf
+        best_move = None
+        for move in self._ordered_moves(state, tt_move, depth):
+            state.apply_move(move)
+            try:
+                child_value = self.min_value(state, depth + 1, alpha, beta)
+            finally:
+                state.undo_move()
+            if child_value > value:
+                value = child_value
+                best_move = move
+            alpha = max(alpha, value)
+            if beta <= alpha:
+                break
+        if best_move is None:
+            # aucun coup possible : position terminale
+            return state.evaluate()
+        self._store_table(state, remaining, value, alpha_orig, beta_orig, best_move)
+        return value
+
+# ----- processus de recherche parallèle -----
+_worker_searcher = None
+_worker_alpha = None
+
+def _init_search_worker(config, shared_alpha):
+    global _worker_searcher, _worker_alpha
+    _worker_searcher = BreakthroughMinMaxSearcher(**config)
+    _worker_alpha = shared_alpha
+
+def _search_worker_task(board, player, move, depth, alpha, deadline, node_limit):
+    start = time.perf_counter()
+    with _worker_alpha.get_lock():
+        alpha = max(alpha, _worker_alpha.value)
+    time_limit = max(0.0, deadline - time.time()) if deadline is not None else None
+    state = BitboardBreakthroughState(board, player)
+    start_nodes = _worker_searcher.nodes_explored
+    value = _worker_searcher.search_root_move(state, move_to_action(move, state.size), depth, alpha, time_limit, node_limit)
+    if value is not None:
+        with _worker_alpha.get_lock():
+            if value > _worker_alpha.value:
+                _worker_alpha.value = value
+    return value, _worker_searcher.nodes_explored - start_nodes, os.getpid(), time.perf_counter() - start
+
+# compare une recherche à profondeur fixe en séquentiel et en parallèle sur la même position
+def measure_parallel_speedup(board, current_player: str, depth: int, workers: int,
+                             search_mode: str = "minmax") -> dict:
+    serial = BreakthroughMinMaxSearcher(max_depth=depth, search_mode=search_mode)
+    start = time.perf_counter()
+    serial_action = serial.find_best_action(BitboardBreakthroughState(board, current_player))
+    serial_time = time.perf_counter() - start
+
+    parallel = BreakthroughMinMaxSearcher(max_depth=depth, search_mode=search_mode, workers=workers)
+    try:
+        parallel._get_pool().submit(time.sleep, 0).result()  # démarrage des processus hors chronométrage
+        start = time.perf_counter()
+        parallel_action = parallel.find_best_action(BitboardBreakthroughState(board, current_player))
+        parallel_time = time.perf_counter() - start
+    finally:
+        parallel.close()
+
+    return {
+        "depth": depth,
+        "workers": workers,
+        "serial_time": serial_time,
+        "parallel_time": parallel_time,
+        "speedup": serial_time / parallel_time if parallel_time else 0.0,
+        "serial_nodes": serial.nodes_explored,
+        "parallel_nodes": parallel.nodes_explored,
+        "nodes_per_worker": parallel.parallel_stats.get("nodes_per_worker", {}),
+        "same_move": (serial_action and action_key(serial_action)) == (parallel_action and action_key(parallel_action)),
+    }
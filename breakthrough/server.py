@@ -0,0 +1,377 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+
+from .bitboard import BitboardBreakthroughState
+from .engine import action_to_text, text_to_action
+from .rules import board_from_string, board_to_string, check_win, init_board
+from .search import DIFFICULTY_BUDGETS, MAX_SEARCH_DEPTH, BreakthroughMinMaxSearcher, action_key
+from .state import BreakthroughAction
+
+# ----- serveur de parties humain contre IA -----
+# frontal asyncio : une requête JSON par ligne sur une connexion TCP, une réponse JSON par ligne
+#   {"op": "new", "difficulty": "medium", "human": "W"}      -> partie créée (état de la partie)
+#   {"op": "play", "game": 1, "move": "b2b3"}                 -> coup humain puis réponse de l'IA ;
+#                                                                sans "move" : l'IA joue (si c'est son tour)
+#   {"op": "state", "game": 1} / {"op": "close", "game": 1}
+#   {"op": "stats"}                                           -> file d'attente et latences
+# une partie n'a qu'une requête en cours ; les erreurs sont {"error": "..."}, {"error": "busy", ...}
+# quand la file est pleine (le client réessaie plus tard)
+#
+# les recherches passent par un ordonnanceur : file par partie servie à tour de rôle, au plus une
+# recherche par processus du pool en cours, budget de temps de chaque requête compté depuis son arrivée
+DEFAULT_PORT = 8765
+DEFAULT_MAX_QUEUE = 64
+MAX_SESSIONS = 1000
+MIN_SEARCH_TIME = 0.02  # temps laissé à une recherche dont la requête a attendu tout son budget
+RESULT_GRACE = 5.0  # au-delà du budget, la requête est abandonnée (processus bloqué)
+BUDGET_SLACK = 0.05  # dépassement toléré (échanges avec le processus, fin de l'itération en cours)
+LATENCY_WINDOW = 10000  # nombre de requêtes gardées pour les percentiles
+SERVER_TT_SIZE_MB = 8
+
+class ServerBusy(Exception):
+    pass
+
+def percentile(values, fraction: float) -> float:
+    # rang le plus proche, sur des valeurs triées
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))]
+
+def summarize_latencies(values) -> dict:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50": percentile(values, 0.5),
+        "p90": percentile(values, 0.9),
+        "p99": percentile(values, 0.99),
+        "max": values[-1] if values else 0.0,
+    }
+
+# ----- processus de recherche -----
+# un searcher par niveau et par processus, gardé d'une requête à l'autre (table de transposition chaude)
+_worker_searchers = {}
+
+def _warm_up() -> int:
+    return os.getpid()
+
+def _search_task(board: str, player: str, difficulty: str, time_limit: float):
+    searcher = _worker_searchers.get(difficulty)
+    if searcher is None:
+        budget = DIFFICULTY_BUDGETS[difficulty]
+        searcher = BreakthroughMinMaxSearcher(max_depth=MAX_SEARCH_DEPTH, tt_size_mb=SERVER_TT_SIZE_MB,
+                                              node_limit=budget["node_limit"])
+        _worker_searchers[difficulty] = searcher
+    start = time.perf_counter()
+    start_nodes = searcher.nodes_explored
+    action = searcher.find_best_action(BitboardBreakthroughState(board_from_string(board), player),
+                                       time_limit=time_limit)
+    return {
+        "move": action_key(action) if action is not None else None,
+        "score": searcher.best_value,
+        "depth": searcher.completed_depth,
+        "nodes": searcher.nodes_explored - start_nodes,
+        "search_seconds": time.perf_counter() - start,
+        "worker": os.getpid(),
+    }
+
+class _Job:
+    def __init__(self, session_id, board: str, player: str, difficulty: str, budget: float, future):
+        self.session_id = session_id
+        self.board = board
+        self.player = player
+        self.difficulty = difficulty
+        self.budget = budget
+        self.future = future
+        self.enqueued = time.perf_counter()
+
+class Scheduler:
+    def __init__(self, workers: int, max_queue: int = DEFAULT_MAX_QUEUE):
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        # partie -> file de ses requêtes ; la première partie servie repasse en fin de tour
+        self._queues = OrderedDict()
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.running = 0
+        self.served = 0
+        self.rejected = 0
+        self.over_budget = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.queue_waits = deque(maxlen=LATENCY_WINDOW)
+        self.search_times = deque(maxlen=LATENCY_WINDOW)
+
+    # démarre tous les processus avant les premières requêtes
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _warm_up) for _ in range(self.workers)))
+
+    def close(self) -> None:
+        self.pool.shutdown(cancel_futures=True)
+
+    async def search(self, session_id, board: str, player: str, difficulty: str, budget: float) -> dict:
+        if self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise ServerBusy()
+        job = _Job(session_id, board, player, difficulty, budget, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(session_id, deque()).append(job)
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        self._dispatch()
+        try:
+            return await asyncio.wait_for(asyncio.shield(job.future), budget + RESULT_GRACE)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            self._abandon(job)
+            raise
+
+    # requête abandonnée (délai dépassé ou client déconnecté) : retirée de la file si elle n'est pas
+    # encore partie, sa recherche ne prendrait un processus que pour personne
+    def _abandon(self, job: _Job) -> None:
+        job.future.cancel()
+        queue = self._queues.get(job.session_id)
+        if queue is not None and job in queue:
+            queue.remove(job)
+            self.queue_depth -= 1
+            if not queue:
+                del self._queues[job.session_id]
+
+    def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self.running < self.workers and self._queues:
+            session_id, queue = self._queues.popitem(last=False)
+            job = queue.popleft()
+            if queue:
+                self._queues[session_id] = queue
+            self.queue_depth -= 1
+            if job.future.done():
+                continue
+            self.running += 1
+            waited = time.perf_counter() - job.enqueued
+            self.queue_waits.append(waited)
+            # le temps passé dans la file est pris sur le budget de la requête
+            time_limit = max(MIN_SEARCH_TIME, job.budget - waited)
+            future = loop.run_in_executor(self.pool, _search_task, job.board, job.player, job.difficulty, time_limit)
+            future.add_done_callback(lambda done, job=job: self._finished(job, done))
+
+    def _finished(self, job: _Job, done) -> None:
+        self.running -= 1
+        latency = time.perf_counter() - job.enqueued
+        self.latencies.append(latency)
+        self.served += 1
+        if latency > job.budget + BUDGET_SLACK:
+            self.over_budget += 1
+        if not job.future.done():
+            if done.exception() is not None:
+                job.future.set_exception(done.exception())
+            else:
+                result = done.result()
+                self.search_times.append(result["search_seconds"])
+                job.future.set_result(result)
+        self._dispatch()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "running": self.running,
+            "served": self.served,
+            "rejected": self.rejected,
+            "over_budget": self.over_budget,
+            "latency": summarize_latencies(self.latencies),
+            "queue_wait": summarize_latencies(self.queue_waits),
+            "search_time": summarize_latencies(self.search_times),
+        }
+
+class GameSession:
+    def __init__(self, session_id: int, difficulty: str, human_player: str):
+        self.id = session_id
+        self.difficulty = difficulty
+        self.human_player = human_player
+        self.ai_player = "B" if human_player == "W" else "W"
+        self.state = BitboardBreakthroughState(init_board(), "W")
+        self.moves = []
+        self.busy = False
+
+    def winner(self) -> Optional[str]:
+        if self.state.has_winner():
+            return check_win(self.state.to_board())
+        if not self.state.has_actions():
+            return "B" if self.state.current_player == "W" else "W"
+        return None
+
+    def play(self, action: BreakthroughAction) -> None:
+        self.state.apply_action(action)
+        self.moves.append(action_to_text(action, self.state.size))
+
+    def undo(self) -> None:
+        self.state.undo_move()
+        self.moves.pop()
+
+    def snapshot(self) -> dict:
+        return {
+            "game": self.id,
+            "board": board_to_string(self.state.to_board()),
+            "player": self.state.current_player,
+            "human": self.human_player,
+            "difficulty": self.difficulty,
+            "moves": self.moves,
+            "winner": self.winner(),
+        }
+
+class GameServer:
+    def __init__(self, scheduler: Scheduler, max_time: Optional[float] = None):
+        self.scheduler = scheduler
+        # plafond optionnel du budget de temps d'une requête (secondes)
+        self.max_time = max_time
+        self.sessions = {}
+        self._ids = itertools.count(1)
+        self.connections = 0
+
+    def _budget(self, session: GameSession, request: dict) -> float:
+        budget = float(request.get("time", DIFFICULTY_BUDGETS[session.difficulty]["time_limit"]))
+        return min(budget, self.max_time) if self.max_time is not None else budget
+
+    def _session(self, request: dict) -> GameSession:
+        session = self.sessions.get(request.get("game"))
+        if session is None:
+            raise ValueError(f"partie inconnue : {request.get('game')}")
+        return session
+
+    async def handle(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "new":
+            if len(self.sessions) >= MAX_SESSIONS:
+                raise ValueError("trop de parties ouvertes")
+            difficulty = request.get("difficulty", "medium")
+            human = request.get("human", "W")
+            if difficulty not in DIFFICULTY_BUDGETS or human not in ("W", "B"):
+                raise ValueError("difficulty ou human invalide")
+            session = GameSession(next(self._ids), difficulty, human)
+            self.sessions[session.id] = session
+            return session.snapshot()
+        if op == "play":
+            return await self._play(self._session(request), request)
+        if op == "state":
+            return self._session(request).snapshot()
+        if op == "close":
+            self.sessions.pop(self._session(request).id)
+            return {"game": request["game"], "closed": True}
+        if op == "stats":
+            return {**self.scheduler.stats(), "sessions": len(self.sessions), "connections": self.connections}
+        raise ValueError(f"opération inconnue : {op}")
+
+    async def _play(self, session: GameSession, request: dict) -> dict:
+        if session.busy:
+            raise ValueError("une requête est déjà en cours pour cette partie")
+        session.busy = True
+        human_played = False
+        try:
+            if "move" in request:
+                if session.winner() is not None or session.state.current_player != session.human_player:
+                    raise ValueError("ce n'est pas au joueur humain de jouer")
+                action = text_to_action(request["move"], session.state.size)
+                if not session.state.is_legal(action):
+                    raise ValueError(f"coup illégal : {request['move']}")
+                session.play(action)
+                human_played = True
+            if session.winner() is not None or session.state.current_player != session.ai_player:
+                return session.snapshot()
+            start = time.perf_counter()
+            try:
+                result = await self.scheduler.search(session.id, board_to_string(session.state.to_board()),
+                                                     session.state.current_player, session.difficulty,
+                                                     self._budget(session, request))
+            except BaseException:
+                # busy, timeout ou connexion fermée : la partie revient à l'état d'avant la requête,
+                # que le client peut renvoyer telle quelle
+                if human_played:
+                    session.undo()
+                raise
+            ai_move = BreakthroughAction(*result["move"])
+            session.play(ai_move)
+            return {
+                **session.snapshot(),
+                "ai_move": action_to_text(ai_move, session.state.size),
+                "score": result["score"],
+                "depth": result["depth"],
+                "nodes": result["nodes"],
+                "latency": time.perf_counter() - start,
+            }
+        finally:
+            session.busy = False
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            # une requête à la fois par connexion : un client qui n'attend pas ses réponses
+            # est freiné par le tampon TCP
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    try:
+                        request = json.loads(line)
+                    except ValueError:
+                        raise ValueError("requête JSON invalide") from None
+                    response = await self.handle(request)
+                except ServerBusy:
+                    response = {"error": "busy", "queue_depth": self.scheduler.queue_depth}
+                except asyncio.TimeoutError:
+                    response = {"error": "timeout"}
+                except (ValueError, KeyError, TypeError) as error:
+                    response = {"error": str(error)}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+async def start_server(host: str, port: int, workers: int, max_queue: int = DEFAULT_MAX_QUEUE,
+                       max_time: Optional[float] = None):
+    scheduler = Scheduler(workers, max_queue)
+    await scheduler.start()
+    game_server = GameServer(scheduler, max_time)
+    server = await asyncio.start_server(game_server.handle_connection, host, port)
+    return game_server, server
+
+async def serve(host: str, port: int, workers: int, max_queue: int, max_time: Optional[float]) -> None:
+    game_server, server = await start_server(host, port, workers, max_queue, max_time)
+    address = server.sockets[0].getsockname()
+    print(f"serveur prêt sur {address[0]}:{address[1]}, {workers} processus", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        game_server.scheduler.close()
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serveur de parties humain contre IA (JSON par ligne sur TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+                        help="requêtes en attente au-delà desquelles le serveur répond busy")
+    parser.add_argument("--max-time", type=float, help="plafond du budget de temps d'une requête")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_queue, args.max_time))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
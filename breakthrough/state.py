@@ -0,0 +1,410 @@
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .rules import BOARD_SIZE, MAX_BOARD_SIZE, board_tables, check_win, get_valid_moves, runaway_race
+from .zobrist import ZOBRIST_BLACK_TO_MOVE, zobrist_hash, zobrist_keys
+
+# ----- poids de l'évaluation -----
+WIN_VALUE = 100000
+PIECE_VALUE = 100
+PIECE_ALMOST_WIN_VALUE = 1000
+ALMOST_WIN_VALUE = PIECE_ALMOST_WIN_VALUE * 0.8  # pion sur l'avant-dernière ligne
+ADVANCE_VALUE = 20
+CENTRAL_VALUE = 15
+PROTECTION_VALUE = 25
+MOBILITY_VALUE = 10
+PAIR_VALUE = 30
+COLUMN_CONTROL_VALUE = 40
+DEFENSE_VALUE = 20
+ATTACK_VALUE = 35
+# poids lus par les états (noms de weights.WEIGHT_NAMES) ; ce dict sert à tous les états qui n'ont pas
+# reçu leurs propres poids (use_weights), weights.set_weights le modifie pour tout le processus
+EVALUATION_WEIGHTS = {
+    "piece": PIECE_VALUE,
+    "advance": ADVANCE_VALUE,
+    "central": CENTRAL_VALUE,
+    "protection": PROTECTION_VALUE,
+    "mobility": MOBILITY_VALUE,
+    "attack": ATTACK_VALUE,
+    "pair": PAIR_VALUE,
+    "column_control": COLUMN_CONTROL_VALUE,
+    "almost_win": ALMOST_WIN_VALUE,
+    "defense": DEFENSE_VALUE,
+}
+
+# ----- class états du jeu-----
+
+@dataclass(slots=True)
+class BreakthroughAction:
+    src_row: int
+    src_col: int
+    dst_row: int
+    dst_col: int
+
+# ----- coups codés en entiers -----
+# dans la recherche, un coup est un entier (rangé dans des array("I") préalloués) :
+# case de départ (row * size + col, selon la taille du plateau de l'état), case d'arrivée décalée
+# de MOVE_DST_SHIFT bits, et deux indicateurs posés par la génération (prise, arrivée sur la dernière ligne).
+# BreakthroughAction n'est construit qu'aux frontières de l'API.
+MOVE_DST_SHIFT = (MAX_BOARD_SIZE * MAX_BOARD_SIZE - 1).bit_length()
+MOVE_SQUARE_MASK = (1 << MOVE_DST_SHIFT) - 1
+MOVE_CAPTURE = 1 << (2 * MOVE_DST_SHIFT)
+MOVE_GOAL = MOVE_CAPTURE << 1
+MOVE_TACTICAL = MOVE_CAPTURE | MOVE_GOAL
+MAX_MOVES = 3 * 2 * MAX_BOARD_SIZE  # au plus deux lignes de pions, trois coups chacun
+
+def new_move_buffer() -> array:
+    return array("I", [0] * MAX_MOVES)
+
+def move_to_action(move: int, size: int = BOARD_SIZE) -> BreakthroughAction:
+    src_row, src_col = divmod(move & MOVE_SQUARE_MASK, size)
+    dst_row, dst_col = divmod((move >> MOVE_DST_SHIFT) & MOVE_SQUARE_MASK, size)
+    return BreakthroughAction(src_row, src_col, dst_row, dst_col)
+
+# sans indicateurs : apply_move détermine lui-même la prise
+def action_to_move(action: BreakthroughAction, size: int = BOARD_SIZE) -> int:
+    return (action.src_row * size + action.src_col) | (action.dst_row * size + action.dst_col) << MOVE_DST_SHIFT
+
+# cases dont la contribution à l'évaluation peut changer quand un coup touche src et dst :
+# mobilité, prises, protection et paires ne dépendent que des voisins immédiats d'un pion
+def _affected_squares(tables, src: int, dst: int) -> List[Tuple[int, int]]:
+    key = src | dst << MOVE_DST_SHIFT
+    squares = tables.affected.get(key)
+    if squares is None:
+        size = tables.size
+        rows, cols = tables.square_rows, tables.square_cols
+        squares = sorted({
+            (row, col)
+            for center_row, center_col in ((rows[src], cols[src]), (rows[dst], cols[dst]))
+            for row in range(max(0, center_row - 1), min(size, center_row + 2))
+            for col in range(max(0, center_col - 1), min(size, center_col + 2))
+        })
+        tables.affected[key] = squares
+    return squares
+
+class BreakthroughState:
+    def __init__(self, board: List[List[Optional[str]]], current_player: str):
+        self.board = board
+        # taille lue sur le plateau ; tables et clés de Zobrist partagées par les états de cette taille
+        self.size = len(board)
+        self.tables = board_tables(self.size)
+        self._zobrist_keys = zobrist_keys(self.size)
+        self.current_player = current_player
+        self.hash = zobrist_hash(board, current_player)
+        # coups joués (avec l'indicateur de prise), dépilés par undo_move
+        self._undo_stack = []
+        self._quiet_buffer = new_move_buffer()
+        self.weights = EVALUATION_WEIGHTS
+        self._init_evaluation()
+
+    # poids propres à cet état (ceux d'un searcher) : les sommes incrémentales sont recalculées
+    def use_weights(self, weights: Dict[str, float]) -> None:
+        if weights == self.weights:
+            return
+        self.weights = weights
+        self._init_evaluation()
+
+    # totaux de l'évaluation tenus à jour par apply_action/undo_action,
+    # à rappeler si self.board est modifié directement
+    def _init_evaluation(self) -> None:
+        weights = self.weights
+        tables = self.tables
+        # part de _square_score qui ne dépend que de la case et des poids : pion, avance,
+        # avant-dernière ligne et centre
+        self._square_base = {
+            piece: [weights["piece"] + tables.advance[piece][square] * weights["advance"]
+                    + (weights["almost_win"] if tables.almost_win[piece][square] else 0)
+                    + (weights["central"] if tables.central[square] else 0)
+                    for square in range(self.size * self.size)]
+            for piece in ("W", "B")
+        }
+        self._pawns = {"W": 0, "B": 0}
+        # occupations en bits, pour runaway() sans parcourir le plateau
+        self._occupancy = {"W": 0, "B": 0}
+        self._column_counts = {"W": [0] * self.size, "B": [0] * self.size}
+        self._column_score = 0
+        self._partial_score = 0
+        self._eval_stack = []
+        for row in range(self.size):
+            for col in range(self.size):
+                piece = self.board[row][col]
+                if piece is not None:
+                    self._pawns[piece] += 1
+                    self._occupancy[piece] |= 1 << (row * self.size + col)
+                    self._add_to_column(piece, col, 1)
+                    self._partial_score += self._square_score(row, col)
+
+    def to_board(self) -> List[List[Optional[str]]]:
+        return [row[:] for row in self.board]
+
+    # coups des pions de la ligne row : quiet et capture sont les indicateurs des déplacements
+    # vers une case vide et des prises, None pour ne pas les produire ; ordre de get_valid_moves
+    def _row_moves(self, buffer, count: int, row: int, quiet: Optional[int], capture: Optional[int]) -> int:
+        player = self.current_player
+        tables = self.tables
+        if row not in tables.source_rows[player]:
+            return count
+        size = tables.size
+        new_row = row + tables.directions[player]
+        cells = self.board[row]
+        ahead = self.board[new_row]
+        diagonal_cols = tables.diagonal_cols
+        base = row * size
+        target_base = new_row * size
+        for col in range(size):
+            if cells[col] != player:
+                continue
+            src = base + col
+            if quiet is not None and ahead[col] is None:
+                buffer[count] = src | (target_base + col) << MOVE_DST_SHIFT | quiet
+                count += 1
+            for side in diagonal_cols[col]:
+                piece = ahead[side]
+                flag = quiet if piece is None else capture if piece != player else None
+                if flag is not None:
+                    buffer[count] = src | (target_base + side) << MOVE_DST_SHIFT | flag
+                    count += 1
+        return count
+
+    # prises d'abord, puis coups calmes, chacun dans l'ordre de lecture
+    def get_actions(self) -> List[BreakthroughAction]:
+        buffer = new_move_buffer()
+        count = 0
+        for row in range(self.size):
+            count = self._row_moves(buffer, count, row, None, MOVE_CAPTURE)
+        for row in range(self.size):
+            count = self._row_moves(buffer, count, row, 0, None)
+        return [move_to_action(move, self.size) for move in buffer[:count]]
+
+    # coups gagnants, puis prises, puis coups calmes, écrits dans buffer ; renvoie le nombre de coups.
+    # Un seul parcours du plateau : les coups calmes passent par un second tampon, recopié à la fin
+    def generate_moves(self, buffer) -> int:
+        board = self.board
+        player = self.current_player
+        tables = self.tables
+        size = tables.size
+        direction = tables.directions[player]
+        diagonal_cols = tables.diagonal_cols
+        goal_row = tables.goal_rows[player]
+        count = self._row_moves(buffer, 0, goal_row, MOVE_GOAL, MOVE_GOAL | MOVE_CAPTURE)
+        quiet_moves = self._quiet_buffer
+        quiet = 0
+        for row in tables.source_rows[player]:
+            if row == goal_row:
+                continue
+            cells = board[row]
+            ahead = board[row + direction]
+            base = row * size
+            target_base = (row + direction) * size
+            for col in range(size):
+                if cells[col] != player:
+                    continue
+                src = base + col
+                if ahead[col] is None:
+                    quiet_moves[quiet] = src | (target_base + col) << MOVE_DST_SHIFT
+                    quiet += 1
+                for side in diagonal_cols[col]:
+                    piece = ahead[side]
+                    if piece is None:
+                        quiet_moves[quiet] = src | (target_base + side) << MOVE_DST_SHIFT
+                        quiet += 1
+                    elif piece != player:
+                        buffer[count] = src | (target_base + side) << MOVE_DST_SHIFT | MOVE_CAPTURE
+                        count += 1
+        buffer[count:count + quiet] = quiet_moves[:quiet]
+        return count + quiet
+
+    def iter_actions(self):
+        buffer = new_move_buffer()
+        count = self.generate_moves(buffer)
+        for index in range(count):
+            yield move_to_action(buffer[index], self.size)
+
+    # même règle que get_valid_moves, sans construire de liste
+    def has_actions(self) -> bool:
+        board = self.board
+        player = self.current_player
+        tables = self.tables
+        direction = tables.directions[player]
+        diagonal_cols = tables.diagonal_cols
+        for row in tables.source_rows[player]:
+            cells = board[row]
+            ahead = board[row + direction]
+            for col in range(tables.size):
+                if cells[col] == player:
+                    if ahead[col] is None:
+                        return True
+                    for side in diagonal_cols[col]:
+                        if ahead[side] != player:
+                            return True
+        return False
+
+    def is_capture(self, action: BreakthroughAction) -> bool:
+        return self.board[action.dst_row][action.dst_col] is not None
+
+    def is_legal(self, action: BreakthroughAction) -> bool:
+        if not (0 <= action.src_row < self.size and 0 <= action.src_col < self.size):
+            return False
+        if self.board[action.src_row][action.src_col] != self.current_player:
+            return False
+        return (action.dst_row, action.dst_col) in get_valid_moves(self.board, action.src_row, action.src_col)
+
+    def is_legal_move(self, move: int) -> bool:
+        src = move & MOVE_SQUARE_MASK
+        dst = (move >> MOVE_DST_SHIFT) & MOVE_SQUARE_MASK
+        if src >= self.tables.squares or dst >= self.tables.squares:
+            return False
+        return self.is_legal(move_to_action(move, self.size))
+
+    def apply_action(self, action: BreakthroughAction) -> None:
+        self.apply_move(action_to_move(action, self.size))
+
+    # annule le dernier coup joué (pile d'annulation)
+    def undo_action(self, action: BreakthroughAction) -> None:
+        self.undo_move()
+
+    def apply_move(self, move: int) -> None:
+        src = move & MOVE_SQUARE_MASK
+        dst = (move >> MOVE_DST_SHIFT) & MOVE_SQUARE_MASK
+        tables = self.tables
+        rows, cols = tables.square_rows, tables.square_cols
+        src_row, src_col, dst_row, dst_col = rows[src], cols[src], rows[dst], cols[dst]
+        affected = _affected_squares(tables, src, dst)
+        self._eval_stack.append(self._partial_score)
+        before = 0
+        for row, col in affected:
+            before += self._square_score(row, col)
+
+        board = self.board
+        piece = board[src_row][src_col]
+        captured = board[dst_row][dst_col]
+        board[dst_row][dst_col] = piece
+        board[src_row][src_col] = None
+        self.current_player = "B" if self.current_player == "W" else "W"
+        self._update_hash(src, dst, piece, captured)
+
+        after = 0
+        for row, col in affected:
+            after += self._square_score(row, col)
+        self._partial_score += after - before
+        self._occupancy[piece] ^= (1 << src) | (1 << dst)
+        self._add_to_column(piece, src_col, -1)
+        self._add_to_column(piece, dst_col, 1)
+        if captured is not None:
+            self._pawns[captured] -= 1
+            self._occupancy[captured] ^= 1 << dst
+            self._add_to_column(captured, dst_col, -1)
+            self._undo_stack.append(move | MOVE_CAPTURE)
+        else:
+            self._undo_stack.append(move & ~MOVE_CAPTURE)
+
+    def undo_move(self) -> None:
+        move = self._undo_stack.pop()
+        src = move & MOVE_SQUARE_MASK
+        dst = (move >> MOVE_DST_SHIFT) & MOVE_SQUARE_MASK
+        rows, cols = self.tables.square_rows, self.tables.square_cols
+        src_row, src_col, dst_row, dst_col = rows[src], cols[src], rows[dst], cols[dst]
+        board = self.board
+        piece = board[dst_row][dst_col]
+        # la pièce prise est toujours du camp adverse
+        captured = ("B" if piece == "W" else "W") if move & MOVE_CAPTURE else None
+        board[src_row][src_col] = piece
+        board[dst_row][dst_col] = captured
+        self.current_player = "B" if self.current_player == "W" else "W"
+        self._update_hash(src, dst, piece, captured)
+
+        self._partial_score = self._eval_stack.pop()
+        self._occupancy[piece] ^= (1 << src) | (1 << dst)
+        self._add_to_column(piece, dst_col, -1)
+        self._add_to_column(piece, src_col, 1)
+        if captured is not None:
+            self._pawns[captured] += 1
+            self._occupancy[captured] ^= 1 << dst
+            self._add_to_column(captured, dst_col, 1)
+
+    # le xor est son propre inverse : même mise à jour pour jouer et annuler un coup
+    def _update_hash(self, src: int, dst: int, piece: str, captured: Optional[str]) -> None:
+        keys = self._zobrist_keys[piece]
+        self.hash ^= keys[src] ^ keys[dst] ^ ZOBRIST_BLACK_TO_MOVE
+        if captured is not None:
+            self.hash ^= self._zobrist_keys[captured][dst]
+
+    def _add_to_column(self, piece: str, col: int, delta: int) -> None:
+        counts = self._column_counts[piece]
+        was_occupied = counts[col] > 0
+        counts[col] += delta
+        if was_occupied != (counts[col] > 0):
+            sign = 1 if piece == "W" else -1
+            value = self.weights["column_control"]
+            self._column_score += sign * value if counts[col] > 0 else -sign * value
+
+
+
+# fonction pour evaluer l'état du jeu tiré de https://www.codeproject.com/Articles/37024/Simple-AI-for-the-Game-of-Breakthrough
+# tous les termes sauf le contrôle des colonnes et la défense sont portés par les pions,
+# _square_score donne la contribution du pion d'une case (positive pour blanc, négative pour noir)
+
+    def _square_score(self, row: int, col: int) -> float:
+        board = self.board
+        piece = board[row][col]
+        if piece is None:
+            return 0
+
+        tables = self.tables
+        weights = self.weights
+        square = row * tables.size + col
+        score = self._square_base[piece][square]
+
+        # mobilité et prises : mêmes coups que get_valid_moves
+        ahead = tables.forward[piece][square]
+        if ahead is not None:
+            if board[ahead[0]][ahead[1]] is None:
+                score += weights["mobility"]
+            for target_row, target_col in tables.diagonals[piece][square]:
+                target_piece = board[target_row][target_col]
+                if target_piece != piece:
+                    score += weights["mobility"]
+                    if target_piece is not None:
+                        score += weights["attack"]
+
+        for protector_row, protector_col in tables.protectors[piece][square]:
+            if board[protector_row][protector_col] == piece:
+                score += weights["protection"]
+
+        left = tables.left[square]
+        if left is not None and board[left[0]][left[1]] == piece:
+            score += weights["pair"]
+
+        return score if piece == "W" else -score
+
+    def evaluate(self) -> float:
+        if self.has_winner():
+            return WIN_VALUE if check_win(self.board) == "W" else -WIN_VALUE
+
+        score = self._partial_score + self._column_score
+        white_pawns = self._pawns["W"]
+        black_pawns = self._pawns["B"]
+        if white_pawns > black_pawns and black_pawns < 4:
+            score += self.weights["defense"] * (4 - black_pawns)
+        elif black_pawns > white_pawns and white_pawns < 4:
+            score -= self.weights["defense"] * (4 - white_pawns)
+
+        return score
+
+
+    def has_winner(self) -> bool:
+        return "W" in self.board[0] or "B" in self.board[self.size - 1]
+
+    def pawn_count(self) -> int:
+        return self._pawns["W"] + self._pawns["B"]
+
+    # occupations en bits (bit row * size + col), comme BitboardBreakthroughState
+    def bitboards(self):
+        return self._occupancy["W"], self._occupancy["B"]
+
+    def runaway(self):
+        return runaway_race(*self.bitboards(), self.current_player, self.size)
+
+    def is_terminal(self) -> bool:
+        return self.has_winner() or not self.has_actions()
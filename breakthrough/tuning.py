@@ -0,0 +1,135 @@
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+
+from .batch import extract_features, weight_vector, winners
+from .positions import PositionReader
+from .weights import DEFAULT_WEIGHTS, WEIGHT_NAMES, load_weights, save_weights
+
+# ----- réglage des poids de l'évaluation (méthode Texel) -----
+# les caractéristiques de chaque position sont extraites une seule fois ; la probabilité de victoire
+# des blancs est modélisée par sigmoid(scale * évaluation) et les poids sont ajustés par descente
+# de gradient sur la perte logistique, chaque époque étant un produit matriciel sur tout le lot
+CHUNK_RECORDS = 1 << 20
+SCALE_BOUNDS = (1e-5, 1e-1)
+EPSILON = 1e-12
+
+# positions de fichiers PositionWriter : caractéristiques (float32) et résultat vu des blancs
+# (1 victoire, 0 défaite, 0.5 nul ou inconnu) ; les positions déjà gagnées sont ignorées
+def load_dataset(paths, max_positions=None):
+    readers = [PositionReader(path) for path in paths]
+    try:
+        total = sum(len(reader) for reader in readers)
+        if max_positions is not None:
+            total = min(total, max_positions)
+        features = np.empty((total, len(WEIGHT_NAMES)), dtype=np.float32)
+        targets = np.empty(total, dtype=np.float32)
+        count = 0
+        for reader in readers:
+            records = reader.to_numpy()
+            chunk = None
+            for start in range(0, len(records), CHUNK_RECORDS):
+                if count >= total:
+                    break
+                chunk = records[start:start + min(CHUNK_RECORDS, total - count)]
+                # copies : pour un bloc d'un seul enregistrement, ascontiguousarray rendrait une vue
+                # sur la projection, qui empêcherait reader.close()
+                white = np.array(chunk["white"], copy=True)
+                black = np.array(chunk["black"], copy=True)
+                keep = winners(white, black) == 0
+                kept = int(keep.sum())
+                features[count:count + kept] = extract_features(white[keep], black[keep])
+                targets[count:count + kept] = (chunk["result"][keep] + 1) / 2
+                count += kept
+            # la vue numpy doit être libérée avant de fermer la projection du fichier
+            del records, chunk
+    finally:
+        for reader in readers:
+            reader.close()
+    return features[:count], targets[:count]
+
+# formes stables : log(1 + exp(x)) par logaddexp, sans dépassement pour les grandes évaluations
+def _sigmoid(values):
+    return np.exp(-np.logaddexp(0, -values))
+
+def logistic_loss(features, targets, weights, scale: float) -> float:
+    values = scale * (features @ weights).astype(np.float64)
+    return float(np.mean(targets * np.logaddexp(0, -values) + (1 - targets) * np.logaddexp(0, values)))
+
+# échelle reliant l'évaluation à la probabilité de victoire, cherchée avec les poids de départ
+# (recherche par section dorée sur le logarithme de l'échelle)
+def fit_scale(features, targets, weights, iterations: int = 40) -> float:
+    low, high = math.log(SCALE_BOUNDS[0]), math.log(SCALE_BOUNDS[1])
+    ratio = (math.sqrt(5) - 1) / 2
+    for _ in range(iterations):
+        left = high - ratio * (high - low)
+        right = low + ratio * (high - low)
+        if logistic_loss(features, targets, weights, math.exp(left)) <= \
+                logistic_loss(features, targets, weights, math.exp(right)):
+            high = right
+        else:
+            low = left
+    return math.exp((low + high) / 2)
+
+# descente de gradient avec un pas normalisé par caractéristique (approximation diagonale du hessien),
+# les caractéristiques ayant des ordres de grandeur très différents
+def tune(features, targets, weights, scale: float, epochs: int = 200, learning_rate: float = 0.5,
+         log_every: int = 0):
+    weights = np.asarray(weights, dtype=np.float32).copy()
+    curvature = (features.astype(np.float64) ** 2).mean(axis=0) * scale * scale / 4
+    history = []
+    for epoch in range(epochs):
+        errors = (_sigmoid(scale * (features @ weights).astype(np.float64)) - targets).astype(np.float32)
+        gradient = (features.T @ errors).astype(np.float64) * scale / len(targets)
+        weights -= (learning_rate * gradient / (curvature + EPSILON)).astype(np.float32)
+        if log_every and (epoch + 1) % log_every == 0:
+            loss = logistic_loss(features, targets, weights, scale)
+            history.append({"epoch": epoch + 1, "loss": loss})
+            print(f"époque {epoch + 1} : perte {loss:.6f}", file=sys.stderr)
+    return weights, history
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Réglage des poids de l'évaluation sur des positions de parties")
+    parser.add_argument("positions", nargs="+", help="fichiers de positions (arène --record)")
+    parser.add_argument("--output", default="weights.json", help="fichier de poids produit")
+    parser.add_argument("--start", help="fichier de poids de départ (poids par défaut sinon)")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--learning-rate", type=float, default=0.5)
+    parser.add_argument("--max-positions", type=int)
+    parser.add_argument("--log-every", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    features, targets = load_dataset(args.positions, args.max_positions)
+    load_time = time.perf_counter() - start
+    if not len(targets):
+        parser.error("aucune position exploitable")
+    initial = load_weights(args.start) if args.start else DEFAULT_WEIGHTS
+    initial_vector = weight_vector(initial).astype(np.float32)
+    scale = fit_scale(features, targets, initial_vector)
+    loss_before = logistic_loss(features, targets, initial_vector, scale)
+
+    start = time.perf_counter()
+    tuned, history = tune(features, targets, initial_vector, scale, args.epochs, args.learning_rate,
+                          args.log_every)
+    tune_time = time.perf_counter() - start
+    weights = {name: round(float(value), 2) for name, value in zip(WEIGHT_NAMES, tuned)}
+    info = {
+        "positions": len(targets),
+        "scale": scale,
+        "loss_before": loss_before,
+        "loss_after": logistic_loss(features, targets, tuned, scale),
+        "epochs": args.epochs,
+        "load_seconds": load_time,
+        "tune_seconds": tune_time,
+        "history": history,
+    }
+    save_weights(args.output, weights, info)
+    print(f"{len(targets)} positions, perte {loss_before:.6f} -> {info['loss_after']:.6f}, poids dans {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
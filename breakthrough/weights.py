@@ -0,0 +1,65 @@
+import json
+import os
+from typing import Dict, Optional
+
+from . import state
+
+# ----- poids de l'évaluation configurables -----
+# chaque poids multiplie une caractéristique de la position (différence blanc - noir), l'évaluation
+# est donc linéaire en les poids ; chaque état lit les siens (state.weights), ceux d'un searcher lui sont
+# donnés par use_weights, set_weights ne change que les poids par défaut du processus
+WEIGHT_CONSTANTS = {
+    "piece": "PIECE_VALUE",
+    "advance": "ADVANCE_VALUE",
+    "central": "CENTRAL_VALUE",
+    "protection": "PROTECTION_VALUE",
+    "mobility": "MOBILITY_VALUE",
+    "attack": "ATTACK_VALUE",
+    "pair": "PAIR_VALUE",
+    "column_control": "COLUMN_CONTROL_VALUE",
+    "almost_win": "ALMOST_WIN_VALUE",
+    "defense": "DEFENSE_VALUE",
+}
+WEIGHT_NAMES = tuple(WEIGHT_CONSTANTS)
+DEFAULT_WEIGHTS = {name: getattr(state, constant) for name, constant in WEIGHT_CONSTANTS.items()}
+# fichier de poids chargé par défaut par BreakthroughMinMaxSearcher (hérité par les processus du pool)
+WEIGHTS_ENV = "BREAKTHROUGH_WEIGHTS"
+
+def current_weights() -> Dict[str, float]:
+    return dict(state.EVALUATION_WEIGHTS)
+
+def set_weights(weights: Dict[str, float]) -> None:
+    # poids des états qui n'ont pas reçu les leurs ; les sommes incrémentales d'un BreakthroughState
+    # déjà construit sont à recalculer (_init_evaluation)
+    unknown = set(weights) - set(WEIGHT_CONSTANTS)
+    if unknown:
+        raise KeyError(", ".join(sorted(unknown)))
+    state.EVALUATION_WEIGHTS.update(weights)
+
+# les poids absents du fichier gardent leur valeur par défaut
+def load_weights(path: str) -> Dict[str, float]:
+    with open(path) as weights_file:
+        data = json.load(weights_file)
+    weights = data.get("weights", data)
+    unknown = set(weights) - set(WEIGHT_CONSTANTS)
+    if unknown:
+        raise ValueError(f"poids inconnus dans {path} : {', '.join(sorted(unknown))}")
+    return {**DEFAULT_WEIGHTS, **weights}
+
+def save_weights(path: str, weights: Dict[str, float], info: Optional[dict] = None) -> None:
+    data = {"weights": {name: weights[name] for name in WEIGHT_NAMES}}
+    if info:
+        data.update(info)
+    with open(path, "w") as weights_file:
+        json.dump(data, weights_file, indent=2)
+        weights_file.write("\n")
+
+def resolve_weights(weights) -> Optional[Dict[str, float]]:
+    # chemin de fichier, dict de poids, ou None : fichier désigné par BREAKTHROUGH_WEIGHTS s'il existe
+    if weights is None:
+        weights = os.environ.get(WEIGHTS_ENV) or None
+    if isinstance(weights, str):
+        return load_weights(weights)
+    if weights is not None:
+        return {**DEFAULT_WEIGHTS, **weights}
+    return None
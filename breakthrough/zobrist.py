@@ -0,0 +1,34 @@
+import random
+
+from .rules import BOARD_SIZE
+
+# ----- clés de Zobrist -----
+# tirées avec une graine fixe pour que les hash soient identiques d'un processus à l'autre
+_zobrist_rng = random.Random(0x5EED)
+ZOBRIST_KEYS = {
+    player: [_zobrist_rng.getrandbits(64) for _ in range(BOARD_SIZE * BOARD_SIZE)]
+    for player in ("W", "B")
+}
+ZOBRIST_BLACK_TO_MOVE = _zobrist_rng.getrandbits(64)
+
+# clés des autres tailles de plateau, une graine fixe par taille ; ZOBRIST_KEYS pour la taille par défaut
+_KEYS_BY_SIZE = {BOARD_SIZE: ZOBRIST_KEYS}
+
+def zobrist_keys(size: int):
+    keys = _KEYS_BY_SIZE.get(size)
+    if keys is None:
+        rng = random.Random(0x5EED + size)
+        keys = _KEYS_BY_SIZE[size] = {player: [rng.getrandbits(64) for _ in range(size * size)]
+                                      for player in ("W", "B")}
+    return keys
+
+def zobrist_hash(board, current_player):
+    size = len(board)
+    keys = zobrist_keys(size)
+    key = ZOBRIST_BLACK_TO_MOVE if current_player == "B" else 0
+    for row in range(size):
+        for col in range(size):
+            piece = board[row][col]
+            if piece is not None:
+                key ^= keys[piece][row * size + col]
+    return key
@@ -1,8 +1,10 @@
 import pygame
 import sys
-from minmaxEnhanced import main  # Import the main game function
+import time
+from minmaxEnhanced import ANIMATION_FPS, LoopStats, loop_mode, main  # Import the main game function
 
-def run_interface():
+def run_interface(loop=None):
+    loop = loop_mode(loop)
     pygame.init()
 
     WIDTH, HEIGHT = 800, 600
@@ -43,26 +45,44 @@ def run_interface():
 
     title_rect = title_img.get_rect(center=(WIDTH // 2, 100))
 
+    # menu statique : en mode "idle", dessiné une fois puis seulement quand la fenêtre est découverte,
+    # la boucle dort dans pygame.event.wait entre deux événements
+    clock = pygame.time.Clock()
+    loop_stats = LoopStats()
+    if loop == "idle":
+        pygame.event.set_blocked(pygame.MOUSEMOTION)
+    needs_redraw = True
+
     running = True
     while running:
-        for event in pygame.event.get():
+        events = pygame.event.get() if loop == "fixed" else loop_stats.wait()
+        for event in events:
             if event.type == pygame.QUIT:
+                print(loop_stats.report())
                 pygame.quit()
                 sys.exit()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                needs_redraw = True
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if button_rect_easy.collidepoint(event.pos):
-                    main(mode="AI", difficulty="easy")
+                    main(mode="AI", difficulty="easy", loop=loop)
                     running = False
                 elif button_rect_mid.collidepoint(event.pos):
-                    main(mode="AI", difficulty="medium")
+                    main(mode="AI", difficulty="medium", loop=loop)
                     running = False
                 elif button_rect_hard.collidepoint(event.pos):
-                    main(mode="AI", difficulty="hard")
+                    main(mode="AI", difficulty="hard", loop=loop)
                     running = False
                 elif button_rect_human_vs_human.collidepoint(event.pos):
-                    main(mode="HumanVsHuman")
+                    main(mode="HumanVsHuman", loop=loop)
                     running = False
 
+        if loop == "fixed":
+            clock.tick(ANIMATION_FPS)
+        elif not needs_redraw:
+            continue
+        needs_redraw = False
+        start = time.perf_counter()
         screen.blit(background, (0, 0))
         screen.blit(title_img, title_rect)
         screen.blit(img_left, (50, HEIGHT // 2 - 120))
@@ -73,6 +93,7 @@ def run_interface():
         screen.blit(button_human_vs_human, button_rect_human_vs_human.topleft)
 
         pygame.display.flip()
+        loop_stats.frame(time.perf_counter() - start)
 
 if __name__ == "__main__":
     run_interface()
@@ -1,14 +1,18 @@
+import os
 import pygame
 import sys
-import random
-import math
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
-import random
 import time
-import datetime
+from collections import deque
+
+# le moteur (règles, états, recherche) vit dans le paquet breakthrough, sans pygame ;
+# ces noms restent importables depuis minmaxEnhanced
+from breakthrough import (
+    BOARD_SIZE, DIFFICULTY_BUDGETS, MAX_SEARCH_DEPTH, BackgroundSearcher, BitboardBreakthroughState,
+    BreakthroughAction, BreakthroughMinMaxSearcher, BreakthroughState, TranspositionTable, check_win,
+    get_valid_moves, has_moves, init_board, measure_parallel_speedup, zobrist_hash,
+)
+
 # ----- Constante pour config -----
-BOARD_SIZE = 8
 SQUARE_SIZE = 125
 WIDTH = BOARD_SIZE * SQUARE_SIZE
 HEIGHT = BOARD_SIZE * SQUARE_SIZE
@@ -22,100 +26,130 @@ GREEN = (0, 200, 0)
 RED = (200, 0, 0)
 
 DIFFICULTY = 1
+# bibliothèque d'ouvertures (python3 -m breakthrough.book) et tables de finales
+# (python3 -m breakthrough.endgame), utilisées si présentes sauf en facile
+OPENING_BOOK = "opening_book.bin"
+ENDGAME_TABLES = "endgame.bin"
+
+# boucle "idle" : la fenêtre dort dans pygame.event.wait tant que rien ne bouge (délai seulement pendant
+# les animations et la réflexion de l'IA) et ne redessine qu'après un changement ;
+# "fixed" : ancienne boucle à 60 images par seconde. Choix par argument ou variable BREAKTHROUGH_LOOP
+LOOP_MODES = ("idle", "fixed")
+LOOP_ENV = "BREAKTHROUGH_LOOP"
+ANIMATION_FPS = 60  # plafond pendant les explosions et la cascade de fin
+AI_POLL_MS = 25  # relevé du coup de l'IA pendant sa réflexion
 
 # ----- class pour les explos-----
 class Explosion:
+    DURATION = 30
+    MAX_SCALE_FACTOR = 1.6
+
     explosion_img_default = None  
     explosion_img_alternative = None  
+    # images de chaque étape de l'animation, mises à l'échelle une seule fois au chargement
+    explosion_frames_default = None
+    explosion_frames_alternative = None
+    # compteurs pour vérifier que draw ne fait plus que des blits
+    frames_built = 0
+    draw_calls = 0
 
     def __init__(self, x, y, use_alternative=False):
         self.use_alternative = use_alternative
         if use_alternative:
             if Explosion.explosion_img_alternative is None:
-                try:
-                    loaded_img = pygame.image.load("explosion2.png").convert_alpha()
-                    new_width = loaded_img.get_width() // 6
-                    new_height = loaded_img.get_height() // 6
-                    Explosion.explosion_img_alternative = pygame.transform.scale(loaded_img, (new_width, new_height))
-                except pygame.error:
-                    print("Erreur : Impossible de charger 'explosion2.png'.")
-                    sys.exit()
+                Explosion.explosion_img_alternative = Explosion._load_image("explosion2.png")
+                Explosion.explosion_frames_alternative = Explosion._build_frames(Explosion.explosion_img_alternative)
         else:
             if Explosion.explosion_img_default is None:
-                try:
-                    loaded_img = pygame.image.load("explosion.png").convert_alpha()
-                    new_width = loaded_img.get_width() // 6
-                    new_height = loaded_img.get_height() // 6
-                    Explosion.explosion_img_default = pygame.transform.scale(loaded_img, (new_width, new_height))
-                except pygame.error:
-                    print("Erreur : Impossible de charger 'explosion.png'.")
-                    sys.exit()
+                Explosion.explosion_img_default = Explosion._load_image("explosion.png")
+                Explosion.explosion_frames_default = Explosion._build_frames(Explosion.explosion_img_default)
         self.x = x
         self.y = y
-        self.duration = 30 
+        self.duration = Explosion.DURATION
         self.current_frame = 0
 
+    @staticmethod
+    def _load_image(path):
+        try:
+            loaded_img = pygame.image.load(path).convert_alpha()
+        except pygame.error:
+            print(f"Erreur : Impossible de charger '{path}'.")
+            sys.exit()
+        new_width = loaded_img.get_width() // 6
+        new_height = loaded_img.get_height() // 6
+        return pygame.transform.scale(loaded_img, (new_width, new_height))
+
+    @staticmethod
+    def _build_frames(base_img):
+        frames = []
+        for frame in range(Explosion.DURATION + 1):
+            scale_factor = 1 + (frame / Explosion.DURATION) * (Explosion.MAX_SCALE_FACTOR - 1)
+            new_width = int(base_img.get_width() * scale_factor)
+            new_height = int(base_img.get_height() * scale_factor)
+            frames.append(pygame.transform.scale(base_img, (new_width, new_height)))
+        Explosion.frames_built += len(frames)
+        return frames
+
     def update(self):
         self.current_frame += 1
 
     def draw(self, screen):
-        max_scale_factor = 1.6
-        scale_factor = 1 + (self.current_frame / self.duration) * (max_scale_factor - 1)
         if self.use_alternative:
-            base_img = Explosion.explosion_img_alternative
+            frames = Explosion.explosion_frames_alternative
         else:
-            base_img = Explosion.explosion_img_default
-        new_width = int(base_img.get_width() * scale_factor)
-        new_height = int(base_img.get_height() * scale_factor)
-        explosion_surface = pygame.transform.scale(base_img, (new_width, new_height))
+            frames = Explosion.explosion_frames_default
+        explosion_surface = frames[min(self.current_frame, len(frames) - 1)]
         rect = explosion_surface.get_rect(center=(self.x, self.y))
         screen.blit(explosion_surface, rect)
-
-# ----- fonc qui vérifient info de la partie et dessine plateau -----
-def init_board():
-    board = [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
-    for row in range(2):
-        for col in range(BOARD_SIZE):
-            board[row][col] = "B"
-    for row in range(BOARD_SIZE-2, BOARD_SIZE):
-        for col in range(BOARD_SIZE):
-            board[row][col] = "W"
-    return board
-
-def get_valid_moves(board, row, col):
-    moves = []
-    piece = board[row][col]
-    if piece is None:
-        return moves
-
-    direction = -1 if piece == "W" else 1
-    new_row = row + direction
-    if 0 <= new_row < BOARD_SIZE:
-        if board[new_row][col] is None:
-            moves.append((new_row, col))
-        new_col = col - 1
-        if new_col >= 0:
-            if board[new_row][new_col] is None or board[new_row][new_col] != piece:
-                moves.append((new_row, new_col))
-        new_col = col + 1
-        if new_col < BOARD_SIZE:
-            if board[new_row][new_col] is None or board[new_row][new_col] != piece:
-                moves.append((new_row, new_col))
-    return moves
+        Explosion.draw_calls += 1
+        return rect
+
+# temps moyen d'une image (en ms) selon le nombre d'explosions actives,
+# doit rester proportionnel au nombre de blits et non aux mises à l'échelle
+def benchmark_explosions(screen, counts=(1, 8, 32, 64), frames=Explosion.DURATION):
+    results = {}
+    for count in counts:
+        explosions = [Explosion((i * 37) % WIDTH, (i * 53) % HEIGHT, use_alternative=bool(i % 2))
+                      for i in range(count)]
+        frames_built = Explosion.frames_built
+        start = time.perf_counter()
+        for _ in range(frames):
+            for explosion in explosions:
+                explosion.draw(screen)
+                explosion.update()
+        elapsed = time.perf_counter() - start
+        results[count] = {
+            "ms_per_frame": elapsed * 1000 / frames,
+            "ms_per_explosion": elapsed * 1000 / (frames * count),
+            "frames_built_during_run": Explosion.frames_built - frames_built,
+        }
+    return results
+
+# ----- dessin du plateau -----
+# textures des cases chargées et mises à l'échelle une seule fois
+_square_textures = None
+
+def load_square_textures():
+    global _square_textures
+    if _square_textures is None:
+        try:
+            texture1 = pygame.image.load("case1.png").convert()
+            texture2 = pygame.image.load("case2.png").convert()
+        except pygame.error:
+            print("Erreur : Impossible de charger 'case1.png' ou 'case2.png'.")
+            sys.exit()
+        _square_textures = (pygame.transform.scale(texture1, (SQUARE_SIZE, SQUARE_SIZE)),
+                            pygame.transform.scale(texture2, (SQUARE_SIZE, SQUARE_SIZE)))
+    return _square_textures
 
 def draw_board(screen, board, selected, valid_moves, white_img, black_img):
-    try:
-        texture1 = pygame.image.load("case1.png").convert()
-        texture2 = pygame.image.load("case2.png").convert()
-    except pygame.error:
-        print("Erreur : Impossible de charger 'case1.png' ou 'case2.png'.")
-        sys.exit()
+    texture1, texture2 = load_square_textures()
 
     for row in range(BOARD_SIZE):
         for col in range(BOARD_SIZE):
             texture = texture1 if (row + col) % 2 == 0 else texture2
             rect = pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
-            screen.blit(pygame.transform.scale(texture, (SQUARE_SIZE, SQUARE_SIZE)), rect)
+            screen.blit(texture, rect)
 
             # Removed blue and green borders for selected pieces and valid moves
             piece = board[row][col]
@@ -125,274 +159,169 @@ def draw_board(screen, board, selected, valid_moves, white_img, black_img):
                                                       row * SQUARE_SIZE + SQUARE_SIZE // 2))
                 screen.blit(pawn_img, pawn_rect)
 
-def check_win(board):
-    for col in range(BOARD_SIZE):
-        if board[0][col] == "W":
-            return "W"
-        if board[BOARD_SIZE-1][col] == "B":
-            return "B"
-    return None
-    
-def has_moves(board, player):
-    for row in range(BOARD_SIZE):
-        for col in range(BOARD_SIZE):
-            if board[row][col] == player:
-                if get_valid_moves(board, row, col):
-                    return True
-    return False
-
-# ----- class états du jeu-----
-
-@dataclass
-class BreakthroughAction:
-    src_row: int
-    src_col: int
-    dst_row: int
-    dst_col: int
-    captured: Optional[str] = None
-
-class BreakthroughState:
-    def __init__(self, board: List[List[Optional[str]]], current_player: str):
-        self.board = board
-        self.current_player = current_player
-
-    def get_actions(self) -> List[BreakthroughAction]:
-        actions = []
+# ne redessine que ce qui a changé depuis l'image précédente : le damier est précomposé
+# dans une seule surface et l'écran est mis à jour avec pygame.display.update(rects)
+class BoardRenderer:
+    def __init__(self, screen, white_img, black_img):
+        self.screen = screen
+        self.white_img = white_img
+        self.black_img = black_img
+        texture1, texture2 = load_square_textures()
+        self.background = pygame.Surface((WIDTH, HEIGHT)).convert()
         for row in range(BOARD_SIZE):
             for col in range(BOARD_SIZE):
-                if self.board[row][col] == self.current_player:
-                    for move in get_valid_moves(self.board, row, col):
-                        is_capture = self.board[move[0]][move[1]] is not None
-                        actions.append((is_capture, BreakthroughAction(row, col, move[0], move[1])))
-
-        actions.sort(key=lambda x: x[0], reverse=True)
-        return [action for _, action in actions]
-
-    def apply_action(self, action: BreakthroughAction) -> None:
-        piece = self.board[action.src_row][action.src_col]
-        action.captured = self.board[action.dst_row][action.dst_col]
-        self.board[action.dst_row][action.dst_col] = piece
-        self.board[action.src_row][action.src_col] = None
-        self.current_player = "B" if self.current_player == "W" else "W"
-
-    def undo_action(self, action: BreakthroughAction) -> None:
-        piece = self.board[action.dst_row][action.dst_col]
-        self.board[action.src_row][action.src_col] = piece
-        self.board[action.dst_row][action.dst_col] = action.captured
-        self.current_player = "B" if self.current_player == "W" else "W"
-
-
-
-# fonction pour evaluer l'état du jeu tiré de https://www.codeproject.com/Articles/37024/Simple-AI-for-the-Game-of-Breakthrough
-
-    def evaluate(self) -> float:
-        score = 0
-        white_pawns = 0
-        black_pawns = 0
-        white_advanced = 0
-        black_advanced = 0
-        white_protected = 0
-        black_protected = 0
-        white_mobility = 0
-        black_mobility = 0
-        white_central = 0
-        black_central = 0
-
-        WIN_VALUE = 100000
-        PIECE_VALUE = 100
-        PIECE_ALMOST_WIN_VALUE = 1000
-        ADVANCE_VALUE = 20
-        CENTRAL_VALUE = 15
-        PROTECTION_VALUE = 25
-        MOBILITY_VALUE = 10
-        PAIR_VALUE = 30
-        COLUMN_CONTROL_VALUE = 40
-        DEFENSE_VALUE = 20
-        ATTACK_VALUE = 35
-
-        for col in range(BOARD_SIZE):
-            if self.board[0][col] == "W":
-                return WIN_VALUE
-            if self.board[BOARD_SIZE-1][col] == "B":
-                return -WIN_VALUE
-
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                piece = self.board[row][col]
-                if piece is None:
-                    continue
-
-                if piece == "W":
-                    white_pawns += 1
-                    advance_score = (BOARD_SIZE - 1 - row) * ADVANCE_VALUE
-                    white_advanced += advance_score
-                    
-                    if 2 <= col <= BOARD_SIZE-3:
-                        white_central += CENTRAL_VALUE
-                else:
-                    black_pawns += 1
-                    advance_score = row * ADVANCE_VALUE
-                    black_advanced += advance_score
-                    
-                    if 2 <= col <= BOARD_SIZE-3:
-                        black_central += CENTRAL_VALUE
-
-                valid_moves = get_valid_moves(self.board, row, col)
-                if piece == "W":
-                    white_mobility += len(valid_moves) * MOBILITY_VALUE
-                else:
-                    black_mobility += len(valid_moves) * MOBILITY_VALUE
-
-                protection = 0
-                direction = -1 if piece == "W" else 1
-                protected_row = row - direction
-                if 0 <= protected_row < BOARD_SIZE:
-                    for dc in [-1, 1]:
-                        protected_col = col + dc
-                        if 0 <= protected_col < BOARD_SIZE:
-                            if self.board[protected_row][protected_col] == piece:
-                                protection += PROTECTION_VALUE
-                                if piece == "W":
-                                    white_protected += PROTECTION_VALUE
-                                else:
-                                    black_protected += PROTECTION_VALUE
-
-                for move in valid_moves:
-                    target_piece = self.board[move[0]][move[1]]
-                    if target_piece is not None and target_piece != piece:
-                        if piece == "W":
-                            score += ATTACK_VALUE
-                        else:
-                            score -= ATTACK_VALUE
-
-        for col in range(BOARD_SIZE):
-            white_in_column = any(self.board[row][col] == "W" for row in range(BOARD_SIZE))
-            black_in_column = any(self.board[row][col] == "B" for row in range(BOARD_SIZE))
-            
-            if white_in_column:
-                score += COLUMN_CONTROL_VALUE
-            if black_in_column:
-                score -= COLUMN_CONTROL_VALUE
-
+                texture = texture1 if (row + col) % 2 == 0 else texture2
+                self.background.blit(texture, (col * SQUARE_SIZE, row * SQUARE_SIZE))
+        self._drawn = None
+        self._explosion_rects = []
+        self._overlays = []
+
+    def invalidate(self) -> None:
+        self._drawn = None
+
+    def _draw_square(self, board, row: int, col: int):
+        rect = pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+        self.screen.blit(self.background, rect, rect)
+        piece = board[row][col]
+        if piece is not None:
+            pawn_img = self.white_img if piece == "W" else self.black_img
+            self.screen.blit(pawn_img, pawn_img.get_rect(center=rect.center))
+        return rect
+
+    # cases (row, col) recouvertes par une zone de l'écran
+    def _squares_under(self, area):
+        area = area.clip(self.screen.get_rect())
+        if area.width <= 0 or area.height <= 0:
+            return []
+        return [(row, col)
+                for row in range(area.top // SQUARE_SIZE, (area.bottom - 1) // SQUARE_SIZE + 1)
+                for col in range(area.left // SQUARE_SIZE, (area.right - 1) // SQUARE_SIZE + 1)]
+
+    # overlays : liste de (surface, rect) fixes affichés par-dessus le plateau (ex. message de fin)
+    def render(self, board, explosions=(), overlays=()) -> list:
+        if self._drawn is None:
+            self.screen.blit(self.background, (0, 0))
             for row in range(BOARD_SIZE):
-                if self.board[row][col] == "W" and col > 0 and self.board[row][col-1] == "W":
-                    score += PAIR_VALUE
-                if self.board[row][col] == "B" and col > 0 and self.board[row][col-1] == "B":
-                    score -= PAIR_VALUE
-
-        for col in range(BOARD_SIZE):
-            if self.board[1][col] == "W":
-                score += PIECE_ALMOST_WIN_VALUE * 0.8
-            if self.board[BOARD_SIZE-2][col] == "B":
-                score -= PIECE_ALMOST_WIN_VALUE * 0.8
-
-        score += (white_pawns - black_pawns) * PIECE_VALUE
-        score += white_advanced - black_advanced
-        score += white_protected - black_protected
-        score += white_mobility - black_mobility
-        score += white_central - black_central
-
-        if white_pawns > black_pawns and black_pawns < 4:
-            score += DEFENSE_VALUE * (4 - black_pawns)
-        elif black_pawns > white_pawns and white_pawns < 4:
-            score -= DEFENSE_VALUE * (4 - white_pawns)
-
-        return score
-
-
-    def is_terminal(self) -> bool:
-        for col in range(BOARD_SIZE):
-            if self.board[0][col] == "W" or self.board[BOARD_SIZE-1][col] == "B":
-                return True
-        if not self.get_actions():
-            return True
-        return False
-
-class BreakthroughMinMaxSearcher:
-    def __init__(self, max_depth: int = 3):
-        self.max_depth = max_depth
-        self.nodes_explored = 0
-        self.max_depth_reached = 0
-
-    def find_best_action(self, state: BreakthroughState) -> Optional[BreakthroughAction]:
-        if state.is_terminal():
-            return None
-
-        for action in state.get_actions():
-            state.apply_action(action)
-            if state.is_terminal():  
-                state.undo_action(action)
-                return action
-            state.undo_action(action)
-
-        actions = state.get_actions()
-        if not actions:
-            return None
-        best_action = None
-        if state.current_player == "W":
-            best_value = -math.inf
+                for col in range(BOARD_SIZE):
+                    if board[row][col] is not None:
+                        self._draw_square(board, row, col)
+            dirty = [self.screen.get_rect()]
         else:
-            best_value = math.inf
-        alpha = -math.inf
-        beta = math.inf
-
-        actions.sort(key=lambda action: self.evaluate_action(state, action), reverse=True)
-
-        for action in actions:
-            state.apply_action(action)
-            if state.current_player == "B":  
-                value = self.min_value(state, 1, alpha, beta)
-                if value > best_value:
-                    best_value = value
-                    best_action = action
-                alpha = max(alpha, value)
-            else:  
-                value = self.max_value(state, 1, alpha, beta)
-                if value < best_value:
-                    best_value = value
-                    best_action = action
-                beta = min(beta, value)
-            state.undo_action(action)
-        return best_action
-
-    def evaluate_action(self, state: BreakthroughState, action: BreakthroughAction) -> float:
-        state.apply_action(action)
-        value = state.evaluate()
-        state.undo_action(action)
-        return value
-
-    def min_value(self, state: BreakthroughState, depth: int, alpha: float, beta: float) -> float:
-        self.nodes_explored += 1
-        self.max_depth_reached = max(self.max_depth_reached, depth)
-        if state.is_terminal() or depth >= self.max_depth:
-            return state.evaluate()
-        value = math.inf
-        for action in state.get_actions():
-            state.apply_action(action)
-            value = min(value, self.max_value(state, depth + 1, alpha, beta))
-            state.undo_action(action)
-            beta = min(beta, value)
-            if beta <= alpha:
-                break
-        return value
-
-    def max_value(self, state: BreakthroughState, depth: int, alpha: float, beta: float) -> float:
-        self.nodes_explored += 1
-        self.max_depth_reached = max(self.max_depth_reached, depth)
-        if state.is_terminal() or depth >= self.max_depth:
-            return state.evaluate()
-        value = -math.inf
-        for action in state.get_actions():
-            state.apply_action(action)
-            value = max(value, self.min_value(state, depth + 1, alpha, beta))
-            state.undo_action(action)
-            alpha = max(alpha, value)
-            if beta <= alpha:
-                break
-        return value
+            dirty_squares = {(row, col) for row in range(BOARD_SIZE) for col in range(BOARD_SIZE)
+                             if board[row][col] != self._drawn[row][col]}
+            # zones occupées par les explosions et overlays de l'image précédente
+            for rect in self._explosion_rects:
+                dirty_squares.update(self._squares_under(rect))
+            for overlay in self._overlays:
+                if overlay not in overlays:
+                    dirty_squares.update(self._squares_under(overlay[1]))
+            dirty = [self._draw_square(board, row, col) for row, col in dirty_squares]
+        self._drawn = [row[:] for row in board]
+
+        self._explosion_rects = []
+        for explosion in explosions:
+            rect = explosion.draw(self.screen)
+            self._explosion_rects.append(rect)
+            dirty.append(rect)
+
+        for overlay in overlays:
+            surface, rect = overlay
+            if overlay not in self._overlays or rect.collidelist(dirty) != -1:
+                self.screen.blit(surface, rect)
+                dirty.append(rect)
+        self._overlays = list(overlays)
+
+        if dirty:
+            pygame.display.update(dirty)
+        return dirty
+
+# ----- statistiques de la boucle -----
+# temps de rendu des images, réveils, temps passé à dormir dans pygame.event.wait et charge CPU :
+# celle du thread de l'interface seul et celle du processus entier (recherche de l'IA comprise)
+class LoopStats:
+    RECENT_FRAMES = 1000  # images gardées pour le 95e centile
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.start_thread_cpu = time.thread_time()
+        self.frames = 0
+        self.frame_time = 0.0
+        self.max_frame_time = 0.0
+        self.recent = deque(maxlen=LoopStats.RECENT_FRAMES)
+        self.wakeups = 0
+        self.idle_time = 0.0
+
+    # attend le prochain événement (timeout en ms, None pour attendre sans limite), puis vide la file
+    def wait(self, timeout=None):
+        start = time.perf_counter()
+        event = pygame.event.wait() if timeout is None else pygame.event.wait(timeout)
+        self.idle_time += time.perf_counter() - start
+        self.wakeups += 1
+        events = [] if event.type == pygame.NOEVENT else [event]
+        events.extend(pygame.event.get())
+        return events
+
+    def frame(self, seconds):
+        self.frames += 1
+        self.frame_time += seconds
+        self.max_frame_time = max(self.max_frame_time, seconds)
+        self.recent.append(seconds)
+
+    # rendu du plateau ; seules les images qui ont effectivement mis l'écran à jour sont comptées
+    def render(self, renderer, board, explosions=(), overlays=()):
+        start = time.perf_counter()
+        dirty = renderer.render(board, explosions, overlays)
+        if dirty:
+            self.frame(time.perf_counter() - start)
+        return dirty
+
+    def summary(self):
+        wall = time.perf_counter() - self.start
+        recent = sorted(self.recent)
+        return {
+            "seconds": wall,
+            "frames": self.frames,
+            "fps": self.frames / wall if wall else 0.0,
+            "frame_ms_avg": self.frame_time * 1000 / self.frames if self.frames else 0.0,
+            "frame_ms_p95": recent[int(0.95 * (len(recent) - 1))] * 1000 if recent else 0.0,
+            "frame_ms_max": self.max_frame_time * 1000,
+            "wakeups": self.wakeups,
+            "idle_percent": 100 * self.idle_time / wall if wall else 0.0,
+            "ui_cpu_percent": 100 * (time.thread_time() - self.start_thread_cpu) / wall if wall else 0.0,
+            "cpu_percent": 100 * (time.process_time() - self.start_cpu) / wall if wall else 0.0,
+        }
+
+    def report(self):
+        stats = self.summary()
+        return (f"{stats['frames']} images en {stats['seconds']:.1f} s ({stats['fps']:.1f}/s), "
+                f"rendu moyen {stats['frame_ms_avg']:.2f} ms, p95 {stats['frame_ms_p95']:.2f} ms, "
+                f"max {stats['frame_ms_max']:.2f} ms, {stats['wakeups']} réveils, "
+                f"sommeil {stats['idle_percent']:.0f} %, CPU interface {stats['ui_cpu_percent']:.1f} %, "
+                f"processus {stats['cpu_percent']:.1f} %")
+
+def loop_mode(loop=None):
+    loop = loop or os.environ.get(LOOP_ENV) or "idle"
+    if loop not in LOOP_MODES:
+        raise ValueError(f"mode de boucle inconnu : {loop}")
+    return loop
+
+def advance_explosions(explosions):
+    for explosion in explosions[:]:
+        explosion.update()
+        if explosion.current_frame > explosion.duration:
+            explosions.remove(explosion)
+
+# joue les explosions en cours jusqu'à leur fin, à ANIMATION_FPS images par seconde au plus
+def play_explosions(renderer, board, explosions, clock, loop_stats):
+    while explosions:
+        loop_stats.render(renderer, board, explosions)
+        advance_explosions(explosions)
+        clock.tick(ANIMATION_FPS)
 
 # ----- boucle de jeu -----
-def main(mode="AI", difficulty="medium"):
+def main(mode="AI", difficulty="medium", loop=None):
+    loop = loop_mode(loop)
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Breakthrough avec Minimax")
@@ -423,15 +352,44 @@ def main(mode="AI", difficulty="medium"):
     cascade_explosion_alternative = False 
 
     font = pygame.font.SysFont(None, 48)
-
-    searcher = BreakthroughMinMaxSearcher(max_depth={"easy": 1, "medium": 2, "hard": 4}[difficulty])
+    renderer = BoardRenderer(screen, white_pawn_img, black_pawn_img)
+    end_message = None
+
+    book = OPENING_BOOK if difficulty != "easy" and os.path.exists(OPENING_BOOK) else None
+    tablebase = ENDGAME_TABLES if difficulty != "easy" and os.path.exists(ENDGAME_TABLES) else None
+    searcher = BreakthroughMinMaxSearcher(max_depth=MAX_SEARCH_DEPTH, book=book, tablebase=tablebase,
+                                          **DIFFICULTY_BUDGETS[difficulty])
+    ai_player = BackgroundSearcher(searcher) if mode == "AI" else None
+    ai_thinking = False
+
+    loop_stats = LoopStats()
+    if loop == "idle":
+        # la position de la souris n'est lue qu'au clic : ses mouvements ne doivent pas réveiller la boucle
+        pygame.event.set_blocked(pygame.MOUSEMOTION)
+    needs_redraw = True
 
     while True:
-        for event in pygame.event.get():
+        # explosions ou cascade de fin en cours : une image par tour, cadence limitée par clock.tick ;
+        # pas de sommeil non plus tant qu'une image reste à dessiner
+        animating = bool(explosions) or (game_over and (not cascade_started or bool(cascade_list)))
+        if loop == "fixed" or animating or needs_redraw:
+            events = pygame.event.get()
+        else:
+            events = loop_stats.wait(AI_POLL_MS if ai_thinking else None)
+
+        for event in events:
             if event.type == pygame.QUIT:
+                if ai_player is not None:
+                    ai_player.stop()
+                print(loop_stats.report())
                 pygame.quit()
                 sys.exit()
 
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                # fenêtre découverte : tout est à redessiner
+                renderer.invalidate()
+                needs_redraw = True
+
             if current_player == "W" and not game_over and event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_x, mouse_y = pygame.mouse.get_pos()
                 col = mouse_x // SQUARE_SIZE
@@ -457,18 +415,8 @@ def main(mode="AI", difficulty="medium"):
                         if winner is not None or not has_moves(board, current_player):
                             game_over = True
 
-                        while explosions:
-                            draw_board(screen, board, selected, valid_moves, white_pawn_img, black_pawn_img)
-                            for explosion in explosions[:]:
-                                explosion.update()
-                                explosion.draw(screen)
-                                if explosion.current_frame > explosion.duration:
-                                    explosions.remove(explosion)
-                            pygame.display.flip()
-                            clock.tick(60)
-
-                        draw_board(screen, board, selected, valid_moves, white_pawn_img, black_pawn_img)
-                        pygame.display.flip()
+                        play_explosions(renderer, board, explosions, clock, loop_stats)
+                        needs_redraw = True
                     else:
                         if board[row][col] == current_player:
                             selected = (row, col)
@@ -477,79 +425,70 @@ def main(mode="AI", difficulty="medium"):
                             selected = None
                             valid_moves = []
 
-        if mode == "AI" and current_player == "B" and not game_over:
-
-
-            pygame.time.wait(random.randint(1000, 1500))
-            state = BreakthroughState(board, current_player)
-            best_action = searcher.find_best_action(state)
-            if best_action:
-                if board[best_action.dst_row][best_action.dst_col] is not None:
-                    explosion_x = best_action.dst_col * SQUARE_SIZE + SQUARE_SIZE // 2
-                    explosion_y = best_action.dst_row * SQUARE_SIZE + SQUARE_SIZE // 2
+            elif mode != "AI" and current_player == "B" and not game_over and event.type == pygame.MOUSEBUTTONDOWN:
+                mouse_x, mouse_y = pygame.mouse.get_pos()
+                col = mouse_x // SQUARE_SIZE
+                row = mouse_y // SQUARE_SIZE
 
-                    explosions.append(Explosion(explosion_x, explosion_y, use_alternative=True))
-                board[best_action.dst_row][best_action.dst_col] = board[best_action.src_row][best_action.src_col]
-                board[best_action.src_row][best_action.src_col] = None
-                current_player = "W"
-                winner = check_win(board)
+                if selected is None:
+                    if board[row][col] == current_player:
+                        selected = (row, col)
+                        valid_moves = get_valid_moves(board, row, col)
+                else:
+                    if (row, col) in valid_moves:
+                        src_row, src_col = selected
+                        if board[row][col] is not None:
+                            explosion_x = col * SQUARE_SIZE + SQUARE_SIZE // 2
+                            explosion_y = row * SQUARE_SIZE + SQUARE_SIZE // 2
 
-                if winner is not None or not has_moves(board, current_player):
-                    game_over = True
-            else:
-                game_over = True
-                winner = "W"
+                            explosions.append(Explosion(explosion_x, explosion_y, use_alternative=True))
+                        board[row][col] = board[src_row][src_col]
+                        board[src_row][src_col] = None
+                        current_player = "B" if current_player == "W" else "W"
+                        selected = None
+                        valid_moves = []
 
+                        winner = check_win(board)
+                        if winner is not None or not has_moves(board, current_player):
+                            game_over = True
 
-        elif current_player == "B" and not game_over and event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_x, mouse_y = pygame.mouse.get_pos()
-            col = mouse_x // SQUARE_SIZE
-            row = mouse_y // SQUARE_SIZE
+                        play_explosions(renderer, board, explosions, clock, loop_stats)
+                        needs_redraw = True
+                    else:
+                        if board[row][col] == current_player:
+                            selected = (row, col)
+                            valid_moves = get_valid_moves(board, row, col)
+                        else:
+                            selected = None
+                            valid_moves = []
 
-            if selected is None:
-                if board[row][col] == current_player:
-                    selected = (row, col)
-                    valid_moves = get_valid_moves(board, row, col)
-            else:
-                if (row, col) in valid_moves:
-                    src_row, src_col = selected
-                    if board[row][col] is not None:
-                        explosion_x = col * SQUARE_SIZE + SQUARE_SIZE // 2
-                        explosion_y = row * SQUARE_SIZE + SQUARE_SIZE // 2
+        if mode == "AI" and current_player == "B" and not game_over:
+            # la recherche tourne en arrière-plan, la boucle continue d'afficher en attendant
+            if not ai_thinking:
+                ai_player.request_move(board, current_player)
+                ai_thinking = True
+            done, best_action = ai_player.poll()
+            if done:
+                ai_thinking = False
+                needs_redraw = True
+                if best_action:
+                    if board[best_action.dst_row][best_action.dst_col] is not None:
+                        explosion_x = best_action.dst_col * SQUARE_SIZE + SQUARE_SIZE // 2
+                        explosion_y = best_action.dst_row * SQUARE_SIZE + SQUARE_SIZE // 2
 
                         explosions.append(Explosion(explosion_x, explosion_y, use_alternative=True))
-                    board[row][col] = board[src_row][src_col]
-                    board[src_row][src_col] = None
-                    current_player = "B" if current_player == "W" else "W"
-                    selected = None
-                    valid_moves = []
-
-        
+                    board[best_action.dst_row][best_action.dst_col] = board[best_action.src_row][best_action.src_col]
+                    board[best_action.src_row][best_action.src_col] = None
+                    current_player = "W"
                     winner = check_win(board)
+
                     if winner is not None or not has_moves(board, current_player):
                         game_over = True
-
-                    while explosions:
-
-                        draw_board(screen, board, selected, valid_moves, white_pawn_img, black_pawn_img)
-                        for explosion in explosions[:]:
-                            explosion.update()
-                            explosion.draw(screen)
-                            if explosion.current_frame > explosion.duration:
-                                explosions.remove(explosion)
-                        pygame.display.flip()
-                        clock.tick(60)
-
-                    draw_board(screen, board, selected, valid_moves, white_pawn_img, black_pawn_img)
-                    pygame.display.flip()
-                else:
-                    if board[row][col] == current_player:
-                        selected = (row, col)
-                        valid_moves = get_valid_moves(board, row, col)
                     else:
-                        selected = None
-                        valid_moves = []
-
+                        ai_player.start_pondering(board, current_player)
+                else:
+                    game_over = True
+                    winner = "W"
 
         if game_over:
             if not cascade_started:
@@ -579,24 +518,27 @@ def main(mode="AI", difficulty="medium"):
                     board[row][col] = None
                     explosion_cascade_timer = explosion_delay
 
-        draw_board(screen, board, selected, valid_moves, white_pawn_img, black_pawn_img)
-
-        for explosion in explosions[:]:
-            explosion.update()
-            explosion.draw(screen)
-            if explosion.current_frame > explosion.duration:
-                explosions.remove(explosion)
-
-
-
+        overlays = []
         if game_over and not cascade_list:
-            msg = f"{winner} gagne!" if winner is not None else "Match nul!"
-            text = font.render(msg, True, RED)
-            text_rect = text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-            screen.blit(text, text_rect)
-
-        pygame.display.flip()
-        clock.tick(60)
+            if end_message is None:
+                msg = f"{winner} gagne!" if winner is not None else "Match nul!"
+                text = font.render(msg, True, RED)
+                end_message = (text, text.get_rect(center=(WIDTH // 2, HEIGHT // 2)))
+                needs_redraw = True
+            overlays.append(end_message)
+
+        # boucle "idle" : pas de rendu tant que rien n'a changé
+        if loop == "fixed" or needs_redraw or explosions:
+            loop_stats.render(renderer, board, explosions, overlays)
+            needs_redraw = False
+
+        if explosions:
+            # la dernière image d'une explosion terminée est effacée au tour suivant
+            needs_redraw = True
+        advance_explosions(explosions)
+
+        if loop == "fixed" or animating:
+            clock.tick(ANIMATION_FPS)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,19 @@
+from breakthrough.positions import HEADER, RECORD, PositionReader, PositionWriter
+
+
+def test_append_after_torn_record(tmp_path):
+    path = str(tmp_path / "positions.bin")
+    with PositionWriter(path) as writer:
+        writer.append(1, 2, "W", "W", 10)
+        writer.append(3, 4, "B", "B", -20)
+    # écriture interrompue au milieu d'un enregistrement
+    with open(path, "ab") as torn:
+        torn.write(RECORD.pack(5, 6, 0, 0, 30)[:10])
+
+    with PositionWriter(path) as writer:
+        writer.append(7, 8, "B", None, 40)
+
+    with PositionReader(path) as reader:
+        assert list(reader) == [(1, 2, 0, 1, 10), (3, 4, 1, -1, -20), (7, 8, 1, 0, 40)]
+    with open(path, "rb") as data:
+        assert len(data.read()) == HEADER.size + 3 * RECORD.size
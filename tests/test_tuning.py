@@ -0,0 +1,18 @@
+import pytest
+
+from breakthrough.bitboard import BitboardBreakthroughState
+from breakthrough.positions import PositionWriter
+from breakthrough.rules import init_board
+
+np = pytest.importorskip("numpy")
+tuning = pytest.importorskip("breakthrough.tuning")
+
+
+def test_load_single_record_dataset(tmp_path):
+    path = str(tmp_path / "positions.bin")
+    with PositionWriter(path) as writer:
+        writer.append_state(BitboardBreakthroughState(init_board(), "W"), "W", 0)
+
+    features, targets = tuning.load_dataset([path])
+    assert features.shape == (1, len(tuning.WEIGHT_NAMES))
+    assert targets.tolist() == [1.0]